@@ -1,11 +1,2879 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-from PIL import Image, ImageTk
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+import numpy as np
+from functools import lru_cache
+from contextlib import contextmanager, nullcontext
+from collections import OrderedDict, deque
+import hashlib
+import html
+import argparse
+import cProfile
+import glob
+import io
+import json
+import mmap
+import queue
+import struct
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import os
+import platform
+import pstats
+import subprocess
+import sys
 import threading
 import time
-import random
-import math
+
+try:
+    import cv2  # Optional: only needed for webcam capture
+except ImportError:
+    cv2 = None
+
+# ASCII characters from darkest to lightest
+DEFAULT_ASCII_CHARS = "@%#*+=-:. "
+ALT_ASCII_CHARS = [
+    "█▓▒░·",           # Block style
+    "●◐◑◒◓○",         # Circle style  
+    "♠♣♥♦·",          # Card suits
+    "▀▄█░·",          # Half blocks
+    "≡≣≢≡·",          # Line style
+    "※○◦°·"           # Star style
+]
+
+# Resampling quality: "final" resizes with LANCZOS, "preview" favours speed
+RESAMPLING_QUALITIES = ("final", "preview")
+
+# Directional characters for edges, indexed by edge_directions()
+EDGE_CHARS = "|/-\\"
+EDGE_CODES = np.array([ord(char) for char in EDGE_CHARS], dtype='<u4')
+
+# Monospace fonts tried, in order, when measuring glyph density
+GLYPH_FONTS = ("consola.ttf", "DejaVuSansMono.ttf", "Menlo.ttc", "cour.ttf")
+GLYPH_DENSITY_FILE = "glyph_density.json"
+
+# Procedural animation effects
+PROCEDURAL_EFFECTS = ("wave", "flicker", "cycle", "glitch", "rain", "morph")
+
+# Still images above this many pixels are converted strip by strip
+TILED_PIXEL_THRESHOLD = 64_000_000
+
+# Input formats picked up when converting directories
+SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.tif')
+
+
+def map_pixel_to_ascii(pixel_value, ascii_chars, black_as_space=False):
+    """Convert a pixel brightness value to ASCII character"""
+    if black_as_space:
+        # If black as space is enabled, very dark pixels become spaces
+        if pixel_value < 25:  # Very dark pixels (threshold can be adjusted)
+            return " "
+        # Use remaining characters for other brightness levels
+        chars = ascii_chars[1:]  # Skip the @ character
+        index = int((pixel_value - 25) * (len(chars) - 1) / (255 - 25))
+        index = max(0, min(index, len(chars) - 1))
+        return chars[index]
+    else:
+        # Standard conversion
+        index = int(pixel_value * (len(ascii_chars) - 1) / 255)
+        return ascii_chars[index]
+
+
+@lru_cache(maxsize=32)
+def build_ascii_lut(ascii_chars, black_as_space=False):
+    """Precompute the character code point for each of the 256 brightness levels"""
+    return np.array(
+        [ord(map_pixel_to_ascii(value, ascii_chars, black_as_space)) for value in range(256)],
+        dtype='<u4'
+    )
+
+
+@lru_cache(maxsize=32)
+def build_index_lut(ascii_chars, black_as_space=False, edges=False):
+    """Precompute a compact charset and each brightness level's index into it
+    
+    With edges the charset ends with EDGE_CHARS, for edge_index_values().
+    """
+    chars = [map_pixel_to_ascii(value, ascii_chars, black_as_space) for value in range(256)]
+    charset = "".join(dict.fromkeys(chars))
+    positions = {char: i for i, char in enumerate(charset)}
+    if edges:
+        charset += EDGE_CHARS
+    return charset, np.array([positions[char] for char in chars], dtype=np.uint8)
+
+
+def edge_index_values(charset):
+    """Indices of EDGE_CHARS in a charset built with build_index_lut(..., edges=True)"""
+    return np.arange(len(charset) - len(EDGE_CHARS), len(charset), dtype=np.uint8)
+
+
+def edge_directions(pixels, threshold=0.35):
+    """Vectorized Sobel pass over a grayscale cell grid
+    
+    Returns, per cell, the index into EDGE_CHARS of the edge running through
+    it, or -1 where the normalized gradient magnitude is below threshold.
+    """
+    padded = np.pad(np.asarray(pixels, dtype=np.float32), 1, mode='edge')
+    
+    # Separable kernels: smooth across the axis, difference along it
+    smoothed_rows = padded[:-2] + 2 * padded[1:-1] + padded[2:]
+    gx = smoothed_rows[:, 2:] - smoothed_rows[:, :-2]
+    smoothed_cols = padded[:, :-2] + 2 * padded[:, 1:-1] + padded[:, 2:]
+    gy = (smoothed_cols[2:] - smoothed_cols[:-2]) * 0.5  # Cells are about twice as tall as wide
+    
+    strong = np.hypot(gx, gy) >= threshold * 1020  # 1020: largest possible Sobel response
+    
+    # The edge runs across the gradient: a horizontal gradient gives '|', a
+    # vertical one '-', and the diagonals '/' and '\' (image y points down)
+    angle = np.arctan2(gy, gx) % np.pi
+    directions = ((angle + np.pi / 8) // (np.pi / 4)).astype(np.int8) % 4
+    return np.where(strong, directions, np.int8(-1))
+
+
+def overlay_edges(pixels, mapped, edges):
+    """Replace mapped values with edge characters; edges is (threshold, values for EDGE_CHARS)"""
+    threshold, values = edges
+    directions = edge_directions(pixels, threshold)
+    return np.where(directions >= 0, values[directions], mapped).astype(mapped.dtype)
+
+
+def load_glyph_font(size=32):
+    """First available monospace TrueType font, falling back to PIL's built-in font"""
+    for name in GLYPH_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()  # Pillow < 10.1 has no sized default font
+
+
+def measure_glyph_density(char, font, size=32):
+    """Fraction of a character cell covered by ink when the glyph is rasterized"""
+    canvas = Image.new('L', (size * 2, size * 2), 0)
+    ImageDraw.Draw(canvas).text((size // 2, size // 2), char, fill=255, font=font)
+    return float(np.asarray(canvas, dtype=np.float32).sum()) / (255.0 * size * size)
+
+
+_glyph_density_tables = {}
+_glyph_density_lock = threading.Lock()
+
+
+def glyph_densities(chars, cache_dir=None, size=32):
+    """Measured ink coverage of each character, cached in memory and in cache_dir"""
+    font = load_glyph_font(size)
+    font_key = f"{getattr(font, 'path', 'default')}@{size}"
+    path = os.path.join(cache_dir, GLYPH_DENSITY_FILE) if cache_dir else None
+    
+    with _glyph_density_lock:
+        table = _glyph_density_tables.get(font_key)
+        if table is None:
+            table = {}
+            if path and os.path.exists(path):
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        table = json.load(f).get(font_key, {})
+                except (OSError, ValueError):
+                    pass  # Unreadable cache; measure again
+            _glyph_density_tables[font_key] = table
+        
+        missing = [char for char in dict.fromkeys(chars) if char not in table]
+        for char in missing:
+            table[char] = measure_glyph_density(char, font, size)
+        
+        if missing and path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                stored = {}
+                if os.path.exists(path):
+                    with open(path, encoding='utf-8') as f:
+                        stored = json.load(f)
+                stored[font_key] = table
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    json.dump(stored, f, ensure_ascii=False)
+                os.replace(path + ".tmp", path)
+            except (OSError, ValueError):
+                pass  # The table still works from memory
+        
+        return [table[char] for char in chars]
+
+
+def density_ramp(chars, cache_dir=None):
+    """chars reordered from most to least ink, the order brightness mapping expects"""
+    densities = glyph_densities(chars, cache_dir)
+    order = sorted(range(len(chars)), key=lambda i: -densities[i])
+    return "".join(chars[i] for i in order)
+
+
+def charset_codes(charset):
+    """Code points of a charset, for use with indices_to_ascii"""
+    return np.array([ord(char) for char in charset], dtype='<u4')
+
+
+def codepoints_to_ascii(codepoints):
+    """Turn a 2D array of character code points into text, one row per line"""
+    height, width = codepoints.shape
+    
+    # One extra column per row holds the newline, so the whole grid decodes in one go
+    grid = np.empty((height, width + 1), dtype='<u4')
+    grid[:, :width] = codepoints
+    grid[:, width] = ord('\n')
+    return grid.tobytes().decode('utf-32-le')[:-1]
+
+
+def indices_to_ascii(indices, codes):
+    """Turn a 2D array of lookup indices into text, one row per line"""
+    return codepoints_to_ascii(codes[indices])
+
+
+def gray_to_ascii(gray_image, lut):
+    """Map a grayscale image to ASCII text in bulk through a lookup table"""
+    return indices_to_ascii(np.asarray(gray_image, dtype=np.uint8), lut)
+
+
+def resize_to_gray(frame, width, fast=False):
+    """Resize a frame to the target character width and convert it to grayscale
+    
+    fast trades quality for speed for interactive previews: grayscale first,
+    shrink by an integer factor with reduce(), then a cheap bilinear pass.
+    """
+    # Calculate height maintaining aspect ratio
+    aspect_ratio = frame.height / frame.width
+    height = int(width * aspect_ratio * 0.5)  # 0.5 to account for character height/width ratio
+    
+    if fast:
+        return _fast_resize(frame.convert('L'), width, height)
+    
+    resized_image = frame.resize((width, height), Image.Resampling.LANCZOS)
+    return resized_image.convert('L')
+
+
+def resize_to_color(frame, width, fast=False):
+    """(grayscale, RGB) versions of a frame resized like resize_to_gray
+    
+    The grayscale image is exactly what resize_to_gray returns, so colored
+    output has the same characters as the monochrome path.
+    """
+    aspect_ratio = frame.height / frame.width
+    height = int(width * aspect_ratio * 0.5)
+    
+    if fast:
+        return _fast_resize(frame.convert('L'), width, height), _fast_resize(frame.convert('RGB'), width, height)
+    
+    resized_image = frame.resize((width, height), Image.Resampling.LANCZOS)
+    return resized_image.convert('L'), resized_image.convert('RGB')
+
+
+def _fast_resize(image, width, height):
+    """Shrink by an integer factor with reduce(), then a cheap bilinear pass"""
+    factor = min(image.width // (width * 2), image.height // max(1, height * 2))
+    if factor > 1:
+        image = image.reduce(factor)
+    return image.resize((width, height), Image.Resampling.BILINEAR)
+
+
+def open_preview_source(image_path, max_width=2048):
+    """Open an image as grayscale at no more than about max_width pixels wide
+    
+    JPEGs are decoded at reduced scale through draft mode; other formats are
+    shrunk by an integer factor after decoding.
+    """
+    image = Image.open(image_path)
+    image.draft('L', (max_width, max(1, int(max_width * image.height / image.width))))
+    gray_image = image.convert('L')
+    factor = gray_image.width // max_width
+    if factor > 1:
+        gray_image = gray_image.reduce(factor)
+    return gray_image
+
+
+_BOMB_LIMIT_LOCK = threading.Lock()
+
+
+@contextmanager
+def _bomb_check_lifted():
+    """Lift Pillow's decompression-bomb limit around a header-only Image.open
+    
+    Image.MAX_IMAGE_PIXELS is global, so keep the block to opening (which
+    parses the header and decodes nothing) and check the size before any
+    decoding. The lock stops overlapping uses from restoring the wrong value.
+    """
+    with _BOMB_LIMIT_LOCK:
+        limit = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = limit
+
+
+def check_decompression_bomb(size):
+    """Raise DecompressionBombError for sizes Pillow's own check rejects"""
+    if Image.MAX_IMAGE_PIXELS is not None and size[0] * size[1] > 2 * Image.MAX_IMAGE_PIXELS:
+        raise Image.DecompressionBombError(
+            f"Image size ({size[0] * size[1]} pixels) exceeds limit of {2 * Image.MAX_IMAGE_PIXELS} pixels, "
+            "and it cannot be converted in strips"
+        )
+
+
+def open_large_image(image_path):
+    """Image.open that admits images past Pillow's decompression-bomb limit only if they can be read in strips
+    
+    Everything Image.open accepts opens as usual. An oversized image is let
+    through only when GrayStripReader can stream it (one raw tile, or a JPEG
+    whose 1/8 draft is within the limit); anything else, e.g. a huge PNG,
+    still raises DecompressionBombError. Pillow's global limit is never
+    changed, so other threads keep their checks.
+    """
+    try:
+        return Image.open(image_path)
+    except Image.DecompressionBombError:
+        with _bomb_check_lifted():
+            image = Image.open(image_path)
+        if GrayStripReader.can_stream(image):
+            return image
+        image.close()
+        raise
+
+
+def is_large_image(image):
+    """Whether a still image is big enough to be converted in strips"""
+    return image.width * image.height > TILED_PIXEL_THRESHOLD
+
+
+class GrayStripReader:
+    """Reads an image as grayscale horizontal strips, decoding as little as the format allows
+    
+    Uncompressed rasters (uncompressed TIFF, BMP, PPM/PGM) are read strip by
+    strip straight from the file at the offset and stride of their raw tile, so at most
+    max_strip_bytes of source data is decoded at a time. JPEGs are decoded at
+    reduced scale through draft mode, no smaller than min_width pixels wide.
+    Other formats (PNG, compressed TIFF) have to be decoded whole and are then
+    cut into strips.
+    """
+    
+    def __init__(self, image_path, min_width=0, max_strip_bytes=1 << 24):
+        self.image_path = image_path
+        self.max_strip_bytes = max_strip_bytes
+        self._image = open_large_image(image_path)
+        self._raw = self._raw_layout(self._image)
+        
+        if self._raw is not None:
+            self.method = "strips"
+            self.size = self._image.size
+            self._image.close()
+            self._image = None
+        else:
+            width, height = self._image.size
+            self.method = "draft" if self._image.draft('L', (min_width, max(1, min_width * height // width))) else "whole"
+            self.size = self._image.size
+            try:
+                check_decompression_bomb(self.size)  # Decoded in full from here on
+            except Image.DecompressionBombError:
+                self._image.close()
+                raise
+    
+    @classmethod
+    def can_stream(cls, image):
+        """Whether an opened image can be read without decoding its full-resolution bitmap"""
+        if cls._raw_layout(image) is not None:
+            return True
+        if image.format == 'JPEG':
+            try:
+                check_decompression_bomb((image.width // 8, image.height // 8))
+                return True
+            except Image.DecompressionBombError:
+                return False
+        return False
+    
+    @staticmethod
+    def _raw_layout(image):
+        """(offset, mode, rawmode, stride, orientation) when the whole image is one raw tile, else None"""
+        if len(image.tile) != 1:
+            return None
+        tile = image.tile[0]
+        codec, extents, offset, args = tile
+        if codec != 'raw' or tuple(extents) != (0, 0) + image.size:
+            return None
+        
+        if isinstance(args, str):
+            args = (args,)
+        rawmode = args[0]
+        stride = args[1] if len(args) > 1 else 0
+        orientation = args[2] if len(args) > 2 else 1
+        if not stride:
+            if rawmode != image.mode:
+                return None  # Row size cannot be derived safely
+            stride = len(Image.new(image.mode, (image.width, 1)).tobytes())
+        return offset, image.mode, rawmode, stride, orientation
+    
+    def _read_rows(self, top, bottom):
+        """Decode source rows [top, bottom) of a raw image as grayscale"""
+        offset, mode, rawmode, stride, orientation = self._raw
+        width, height = self.size
+        rows = bottom - top
+        first = height - bottom if orientation < 0 else top  # Bottom-up files store the last row first
+        
+        with open(self.image_path, 'rb') as f:
+            f.seek(offset + first * stride)
+            data = f.read(rows * stride)
+        strip = Image.frombuffer(mode, (width, rows), data, 'raw', rawmode, stride, orientation)
+        return np.asarray(strip.convert('L'))
+    
+    def __iter__(self):
+        """Yield (top row, uint8 array) strips covering the image from top to bottom"""
+        width, height = self.size
+        if self._raw is not None:
+            rows = max(1, self.max_strip_bytes // self._raw[3])
+            for top in range(0, height, rows):
+                yield top, self._read_rows(top, min(height, top + rows))
+            return
+        
+        try:
+            self._image.load()
+            bytes_per_row = max(1, len(Image.new(self._image.mode, (width, 1)).tobytes()))
+            rows = max(1, self.max_strip_bytes // bytes_per_row)
+            for top in range(0, height, rows):
+                strip = self._image.crop((0, top, width, min(height, top + rows)))
+                yield top, np.asarray(strip.convert('L'))
+        finally:
+            self._image.close()
+
+
+def convert_tiled(image_path, width, lut, edge_threshold=None, max_strip_bytes=1 << 24):
+    """Convert a very large image strip by strip, with memory bounded by the strip size
+    
+    Every character cell is the mean of the source pixels it covers (a box
+    filter), summed strip by strip, so the full-resolution image is never held
+    in memory for the formats GrayStripReader can read in strips.
+    """
+    reader = GrayStripReader(image_path, min_width=width * 4, max_strip_bytes=max_strip_bytes)
+    source_width, source_height = reader.size
+    height = max(1, int(width * (source_height / source_width) * 0.5))
+    if width > source_width or height > source_height:
+        raise ValueError("Tiled conversion needs a source larger than the output")
+    
+    # Source column and row ranges covered by each character cell
+    column_starts = np.arange(width) * source_width // width
+    column_counts = np.diff(np.append(column_starts, source_width))
+    row_of = (np.arange(source_height) * height // source_height).astype(np.intp)
+    row_counts = np.bincount(row_of, minlength=height)
+    
+    # reduceat widens its whole input, so strips are summed a few MB at a time
+    block_rows = max(1, (1 << 22) // (4 * source_width))
+    sums = np.zeros((height, width), dtype=np.float64)
+    for top, strip in reader:
+        for start in range(0, len(strip), block_rows):
+            block = strip[start:start + block_rows]
+            column_sums = np.add.reduceat(block, column_starts, axis=1, dtype=np.uint32)
+            rows = row_of[top + start:top + start + len(block)]
+            starts = np.flatnonzero(np.diff(rows, prepend=-1))
+            sums[rows[starts]] += np.add.reduceat(column_sums, starts, axis=0, dtype=np.float64)
+    
+    pixels = np.rint(sums / (row_counts[:, None] * column_counts[None, :])).astype(np.uint8)
+    codepoints = lut[pixels]
+    if edge_threshold is not None:
+        codepoints = overlay_edges(pixels, codepoints, (edge_threshold, EDGE_CODES))
+    return codepoints_to_ascii(codepoints)
+
+
+def gray_to_codepoints(gray_image, lut, edge_threshold=None):
+    """Map a resized grayscale image to code points, with the edge pass if a threshold is given"""
+    pixels = np.asarray(gray_image, dtype=np.uint8)
+    if edge_threshold is None:
+        return lut[pixels]
+    return overlay_edges(pixels, lut[pixels], (edge_threshold, EDGE_CODES))
+
+
+def _untimed(name):
+    """Stand-in for StageTimer.stage when no timer is attached"""
+    return nullcontext()
+
+
+def frame_to_ascii(frame, width, lut, fast=False, edge_threshold=None, timer=None):
+    """Resize a frame to the target width and map it to ASCII text
+    
+    timer, if given, is a StageTimer the resize, map and join stages are timed into.
+    """
+    stage = timer.stage if timer is not None else _untimed
+    with stage("resize"):
+        gray_image = resize_to_gray(frame, width, fast)
+    with stage("map"):
+        codepoints = gray_to_codepoints(gray_image, lut, edge_threshold)
+    with stage("join"):
+        return codepoints_to_ascii(codepoints)
+
+
+def frame_to_indices(frame, width, index_lut, edges=None, timer=None):
+    """Resize a frame to the target width and map it to charset indices"""
+    stage = timer.stage if timer is not None else _untimed
+    with stage("resize"):
+        pixels = np.asarray(resize_to_gray(frame, width), dtype=np.uint8)
+    with stage("map"):
+        if edges is None:
+            return index_lut[pixels]
+        return overlay_edges(pixels, index_lut[pixels], edges)
+
+
+class FrameStore:
+    """Compact, array-backed store for the frames of an ASCII animation
+    
+    Frames are kept as uint8 indices into a small charset table. Keyframes are
+    packed into one contiguous frames x height x width array, and a frame that
+    differs from the latest keyframe in only a few cells is stored as a delta
+    (changed positions plus their new indices). Text is built only on access.
+    """
+    
+    def __init__(self, charset, delta_threshold=0.15):
+        self.charset = charset
+        self.delta_threshold = delta_threshold
+        self.shape = None
+        self._codes = charset_codes(charset)
+        self._keyframes = None
+        self._keyframe_count = 0
+        self._frames = []  # (keyframe slot, delta positions or None, delta values or None)
+    
+    def __len__(self):
+        return len(self._frames)
+    
+    def __iter__(self):
+        for index in range(len(self._frames)):
+            yield self[index]
+    
+    def __getitem__(self, index):
+        return indices_to_ascii(self.get_indices(index), self._codes)
+    
+    @property
+    def nbytes(self):
+        """Bytes held by keyframes and deltas"""
+        total = self._keyframe_count * (self.shape[0] * self.shape[1] if self.shape else 0)
+        for _, positions, values in self._frames:
+            if positions is not None:
+                total += positions.nbytes + values.nbytes
+        return total
+    
+    def append(self, indices):
+        """Add a frame given as a 2D array of charset indices"""
+        indices = np.ascontiguousarray(indices, dtype=np.uint8)
+        if self.shape is None:
+            self.shape = indices.shape
+            self._keyframes = np.empty((8,) + self.shape, dtype=np.uint8)
+        elif indices.shape != self.shape:
+            raise ValueError("All frames must have the same dimensions")
+        
+        flat = indices.reshape(-1)
+        if self._keyframe_count:
+            key = self._keyframe_count - 1
+            changed = np.flatnonzero(self._keyframes[key].reshape(-1) != flat)
+            if len(changed) <= self.delta_threshold * flat.size:
+                self._frames.append((key, changed.astype(np.uint32), flat[changed]))
+                return
+        
+        if self._keyframe_count == len(self._keyframes):
+            grown = np.empty((len(self._keyframes) * 2,) + self.shape, dtype=np.uint8)
+            grown[:self._keyframe_count] = self._keyframes[:self._keyframe_count]
+            self._keyframes = grown
+        self._keyframes[self._keyframe_count] = indices
+        self._frames.append((self._keyframe_count, None, None))
+        self._keyframe_count += 1
+    
+    def get_indices(self, index):
+        """Return a frame as a read-only 2D array of charset indices"""
+        key, positions, values = self._frames[index]
+        frame = self._keyframes[key]
+        if positions is not None:
+            frame = frame.copy()
+            frame.reshape(-1)[positions] = values
+        frame.flags.writeable = False
+        return frame
+    
+    def trim(self):
+        """Release spare keyframe capacity once all frames are added"""
+        if self._keyframes is not None and len(self._keyframes) > self._keyframe_count:
+            self._keyframes = self._keyframes[:self._keyframe_count].copy()
+    
+    def to_arrays(self):
+        """Flatten the store into a dict of arrays, e.g. for np.savez"""
+        table, positions, values = [], [], []
+        for key, delta_positions, delta_values in self._frames:
+            if delta_positions is None:
+                table.append((key, -1))
+            else:
+                table.append((key, len(delta_positions)))
+                positions.append(delta_positions)
+                values.append(delta_values)
+        shape = self.shape or (0, 0)
+        keyframes = self._keyframes[:self._keyframe_count] if self._keyframes is not None else np.empty((0,) + shape, dtype=np.uint8)
+        return {
+            'charset': np.array(self.charset),
+            'keyframes': keyframes,
+            'table': np.array(table, dtype=np.int64).reshape(-1, 2),
+            'positions': np.concatenate(positions) if positions else np.empty(0, dtype=np.uint32),
+            'values': np.concatenate(values) if values else np.empty(0, dtype=np.uint8),
+        }
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild a store from the arrays produced by to_arrays"""
+        store = cls(str(arrays['charset']))
+        keyframes = np.ascontiguousarray(arrays['keyframes'], dtype=np.uint8)
+        if len(keyframes):
+            store.shape = keyframes.shape[1:]
+            store._keyframes = keyframes
+            store._keyframe_count = len(keyframes)
+        
+        offset = 0
+        positions, values = arrays['positions'], arrays['values']
+        for key, length in arrays['table']:
+            if length < 0:
+                store._frames.append((int(key), None, None))
+            else:
+                store._frames.append((int(key), positions[offset:offset + length], values[offset:offset + length]))
+                offset += length
+        return store
+
+
+def fingerprint_image(image, image_path=None):
+    """Content hash of a source image
+    
+    Still images hash their decoded pixels. Animated and very large images
+    hash the file contents instead, so a cache lookup does not have to decode
+    every frame or the whole bitmap.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    if (getattr(image, 'is_animated', False) or is_large_image(image)) and image_path:
+        with open(image_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        digest.update(f"{image.mode}:{image.size}".encode())
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """Conversion results keyed on source content and conversion settings
+    
+    Keeps the most recent `max_entries` results in memory. When `cache_dir`
+    is set, results are also written there as .npz files and read back on a
+    memory miss, so they survive across sessions. The disk tier is trimmed
+    the same way: entries older than `max_age_days` go first, then the least
+    recently used until the files fit in `max_disk_bytes`.
+    """
+    
+    def __init__(self, max_entries=16, cache_dir=None, max_disk_bytes=256 * 1024 * 1024, max_age_days=30):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_days = max_age_days
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(fingerprint, **params):
+        """Combine a source fingerprint with every parameter that affects the output"""
+        settings = ";".join(f"{name}={params[name]!r}" for name in sorted(params))
+        return hashlib.blake2b(f"{fingerprint}|{settings}".encode(), digest_size=20).hexdigest()
+    
+    def get(self, key):
+        """Return a cached result (text, ColorArt, or (FrameStore, durations)), or None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+        
+        value = self._load(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, value)
+        return value
+    
+    def put(self, key, value):
+        """Store a result in memory and, if enabled, on disk"""
+        with self._lock:
+            self._remember(key, value)
+        self._save(key, value)
+    
+    def clear(self):
+        """Drop the in-memory tier"""
+        with self._lock:
+            self._entries.clear()
+    
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+    
+    def _save(self, key, value):
+        if not self.cache_dir:
+            return
+        if isinstance(value, str):
+            arrays = {'text': np.array(value)}
+        elif isinstance(value, ColorArt):
+            arrays = {'text': np.array(value.text), 'colors': value.colors, 'palette': value.palette}
+        else:
+            frames, durations = value
+            arrays = frames.to_arrays()
+            arrays['durations'] = np.array(durations, dtype=np.int64)
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self._path(key) + ".tmp"
+            with open(temp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            return  # The disk tier is best effort
+        self._prune()
+    
+    def _prune(self):
+        """Evict expired entries, then the least recently used, until under the size cap"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as listing:
+                for entry in listing:
+                    # The directory also holds other files (e.g. glyph densities)
+                    if entry.name.endswith(".npz") and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        expiry = time.time() - self.max_age_days * 86400
+        for mtime, size, path in entries:
+            if mtime >= expiry and total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+    
+    def _load(self, key):
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+        try:
+            # A hit marks the entry as recently used for _prune
+            os.utime(self._path(key))
+            with np.load(self._path(key)) as arrays:
+                if 'colors' in arrays:
+                    return ColorArt(str(arrays['text']), arrays['colors'], arrays['palette'])
+                if 'text' in arrays:
+                    return str(arrays['text'])
+                arrays = {name: arrays[name] for name in arrays.files}
+        except (OSError, ValueError, KeyError):
+            return None
+        return FrameStore.from_arrays(arrays), [int(d) for d in arrays['durations']]
+
+
+class ConversionCancelled(Exception):
+    """Raised when a progress callback asks to stop a running conversion"""
+
+
+def _convert_gif_frames(image, indices, width, index_lut, edges=None, timer=None):
+    """Yield (index, duration, charset indices) for the given frames of an open GIF"""
+    stage = timer.stage if timer is not None else _untimed
+    for index in indices:
+        with stage("decode"):
+            image.seek(index)
+            frame = image.copy()
+        
+        # Get frame duration (in milliseconds)
+        duration = image.info.get('duration', 100)
+        yield index, duration, frame_to_indices(frame, width, index_lut, edges, timer)
+
+
+def _convert_gif_chunk(image_path, start, stop, width, ascii_chars, black_as_space, edge_threshold=None):
+    """Worker: decode and convert a contiguous run of GIF frames"""
+    charset, index_lut = build_index_lut(ascii_chars, black_as_space, edge_threshold is not None)
+    edges = None if edge_threshold is None else (edge_threshold, edge_index_values(charset))
+    with Image.open(image_path) as image:
+        return list(_convert_gif_frames(image, range(start, stop), width, index_lut, edges))
+
+
+def convert_gif_parallel(image_path, width, ascii_chars, black_as_space=False, jobs=None, progress=None,
+                         edge_threshold=None):
+    """Convert every frame of a GIF across a process pool, keeping frame order
+    
+    progress(done, total) is called as frames complete; returning False cancels
+    the conversion with ConversionCancelled. Returns (FrameStore, durations).
+    """
+    with Image.open(image_path) as image:
+        frame_count = getattr(image, 'n_frames', 1)
+    
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    charset, index_lut = build_index_lut(ascii_chars, black_as_space, edge_threshold is not None)
+    edges = None if edge_threshold is None else (edge_threshold, edge_index_values(charset))
+    frames = FrameStore(charset)
+    durations = [100] * frame_count
+    
+    def report(done):
+        if progress is not None and progress(done, frame_count) is False:
+            raise ConversionCancelled()
+    
+    if jobs == 1 or frame_count < 2:
+        # Not worth spinning up worker processes; convert in-line frame by frame
+        with Image.open(image_path) as image:
+            for done, (index, duration, indices) in enumerate(
+                    _convert_gif_frames(image, range(frame_count), width, index_lut, edges), start=1):
+                frames.append(indices)
+                durations[index] = duration
+                report(done)
+        frames.trim()
+        return frames, durations
+    
+    # GIF frames decode sequentially, so each worker takes a contiguous run;
+    # a few runs per core keeps the cores busy and progress moving
+    chunk_count = min(frame_count, jobs * 4)
+    bounds = [frame_count * i // chunk_count for i in range(chunk_count + 1)]
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_convert_gif_chunk, image_path, start, stop, width, ascii_chars, black_as_space,
+                            edge_threshold)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        # Runs finish out of order; frames are added to the store in order
+        # as soon as the next one is available
+        pending = {}
+        done = 0
+        try:
+            for future in as_completed(futures):
+                for index, duration, indices in future.result():
+                    pending[index] = indices
+                    durations[index] = duration
+                    done += 1
+                while len(frames) in pending:
+                    frames.append(pending.pop(len(frames)))
+                report(done)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    
+    frames.trim()
+    return frames, durations
+
+
+class LazyGifFrames:
+    """Sequence of ASCII frames converted on demand from an animated GIF
+    
+    Frames are converted the first time they are requested and a background
+    thread converts the next `lookahead` frames ahead of playback. At most
+    `cache_size` converted frames are kept, least recently used first out.
+    """
+    
+    def __init__(self, image_path, width, charset, index_lut, lookahead=16, cache_size=64, edges=None):
+        self.image_path = image_path
+        self.width = width
+        self.charset = charset
+        self.index_lut = index_lut
+        self.edges = edges
+        self._codes = charset_codes(charset)
+        self.lookahead = lookahead
+        self.cache_size = max(cache_size, lookahead + 1)
+        
+        self._image = Image.open(image_path)
+        self._frame_count = getattr(self._image, 'n_frames', 1)
+        self._decode_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._closed = False
+        
+        # Durations are filled in as frames get decoded
+        self.durations = [100] * self._frame_count
+        
+        self._wanted = 0
+        self._wanted_event = threading.Event()
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+        self._prefetch_thread.start()
+    
+    def __len__(self):
+        return self._frame_count
+    
+    def __iter__(self):
+        for index in range(self._frame_count):
+            yield self[index]
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._frame_count
+        if not 0 <= index < self._frame_count:
+            raise IndexError("frame index out of range")
+        
+        indices = self._cached(index)
+        if indices is None:
+            indices = self._convert(index)
+            self._store(index, indices)
+        
+        # Let the prefetch thread work ahead of the frame just shown
+        self._wanted = (index + 1) % self._frame_count
+        self._wanted_event.set()
+        return indices_to_ascii(indices, self._codes)
+    
+    def close(self):
+        """Stop prefetching and release the image file"""
+        self._closed = True
+        self._wanted_event.set()
+        with self._decode_lock:
+            self._image.close()
+        with self._cache_lock:
+            self._cache.clear()
+    
+    def _cached(self, index):
+        with self._cache_lock:
+            indices = self._cache.get(index)
+            if indices is not None:
+                self._cache.move_to_end(index)
+            return indices
+    
+    def _store(self, index, indices):
+        with self._cache_lock:
+            self._cache[index] = indices
+            self._cache.move_to_end(index)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def get_indices(self, index):
+        """Return a frame as a 2D array of charset indices"""
+        indices = self._cached(index)
+        if indices is None:
+            indices = self._convert(index)
+            self._store(index, indices)
+        return indices
+    
+    def _convert(self, index):
+        with self._decode_lock:
+            self._image.seek(index)
+            frame = self._image.copy()
+            self.durations[index] = self._image.info.get('duration', 100)
+        return frame_to_indices(frame, self.width, self.index_lut, self.edges)
+    
+    def _prefetch_loop(self):
+        """Background thread converting the frames right after the one on screen"""
+        while True:
+            self._wanted_event.wait()
+            self._wanted_event.clear()
+            start = self._wanted
+            
+            for offset in range(min(self.lookahead, self._frame_count)):
+                if self._closed or self._wanted != start:
+                    break  # Closed, or playback jumped elsewhere
+                index = (start + offset) % self._frame_count
+                if self._cached(index) is None:
+                    try:
+                        self._store(index, self._convert(index))
+                    except (ValueError, EOFError):
+                        break  # Image closed underneath us
+            
+            if self._closed:
+                return
+
+
+def build_color_palette(levels=4):
+    """RGB palette of levels**3 evenly spaced colors"""
+    steps = np.linspace(0, 255, levels).round().astype(np.uint8)
+    red, green, blue = np.meshgrid(steps, steps, steps, indexing='ij')
+    return np.stack([red.ravel(), green.ravel(), blue.ravel()], axis=1)
+
+
+class ColorArt:
+    """ASCII art with a palette color per character, kept as runs of equal color
+    
+    Spaces take the color of the character before them, so they never split
+    a run. runs[y] holds (start, stop, palette index) for line y, and every
+    renderer emits one color change per run rather than per character.
+    """
+    
+    def __init__(self, text, colors, palette):
+        self.text = text
+        self.colors = colors
+        self.palette = palette
+        self.hex_colors = ['#%02X%02X%02X' % tuple(int(c) for c in rgb) for rgb in palette]
+        
+        codes = np.frombuffer(text.replace('\n', '').encode('utf-32-le'), dtype='<u4').reshape(colors.shape)
+        columns = np.where(codes != ord(' '), np.arange(colors.shape[1]), 0)
+        filled = np.take_along_axis(colors, np.maximum.accumulate(columns, axis=1), axis=1)
+        
+        self.runs = []
+        for row in filled:
+            starts = np.concatenate(([0], np.flatnonzero(row[1:] != row[:-1]) + 1))
+            stops = np.concatenate((starts[1:], [len(row)]))
+            self.runs.append([(int(a), int(b), int(row[a])) for a, b in zip(starts, stops)])
+    
+    @classmethod
+    def from_frame(cls, frame, width, lut, levels=4, fast=False, edge_threshold=None):
+        """Convert a frame to ASCII text plus its colors quantized to levels**3 colors
+        
+        fast and edge_threshold mean what they do for frame_to_ascii, so the
+        characters are identical to the monochrome path.
+        """
+        gray_image, rgb_image = resize_to_color(frame, width, fast)
+        text = codepoints_to_ascii(gray_to_codepoints(gray_image, lut, edge_threshold))
+        
+        rgb = np.asarray(rgb_image, dtype=np.uint16)
+        quantized = (rgb * (levels - 1) + 127) // 255
+        colors = (quantized[..., 0] * levels + quantized[..., 1]) * levels + quantized[..., 2]
+        return cls(text, colors, build_color_palette(levels))
+    
+    @property
+    def run_count(self):
+        return sum(len(line_runs) for line_runs in self.runs)
+    
+    def _spans(self, text=None):
+        """Yield (chars, palette index) per run and (newline, None) between lines"""
+        lines = (self.text if text is None else text).split('\n')
+        for y, (line, line_runs) in enumerate(zip(lines, self.runs)):
+            if y:
+                yield '\n', None
+            for start, stop, color in line_runs:
+                yield line[start:stop], color
+    
+    def tk_insert_args(self, tag_pool, text=None):
+        """Arguments for Text.insert that add every run with its color tag in one call"""
+        args = []
+        for chars, color in self._spans(text):
+            args += [chars, () if color is None else tag_pool.tag(self.hex_colors[color])]
+        return args
+    
+    def to_ansi(self, text=None):
+        """Text with 24-bit ANSI color escapes, one per run"""
+        parts = []
+        for chars, color in self._spans(text):
+            if color is None:
+                parts.append("\x1b[0m\n")
+            else:
+                red, green, blue = (int(c) for c in self.palette[color])
+                parts.append(f"\x1b[38;2;{red};{green};{blue}m{chars}")
+        parts.append("\x1b[0m\n")
+        return "".join(parts)
+    
+    def to_html(self, text=None, background='#1E1E1E'):
+        """Standalone HTML page with one span per run"""
+        parts = [f'<!DOCTYPE html>\n<html><body style="background:{background}">\n'
+                 f'<pre style="font-family:Consolas,monospace;font-size:8pt;line-height:1">']
+        for chars, color in self._spans(text):
+            if color is None:
+                parts.append('\n')
+            else:
+                parts.append(f'<span style="color:{self.hex_colors[color]}">{html.escape(chars)}</span>')
+        parts.append('</pre>\n</body></html>\n')
+        return "".join(parts)
+
+
+class ProceduralEffects:
+    """Vectorized procedural animation effects over static ASCII art
+    
+    The base art is kept as a 2D array of code points. Each frame draws one
+    random mask over the grid with NumPy's generator and fills the selected
+    cells from precomputed replacement tables, instead of walking every
+    character in Python.
+    """
+    
+    GLITCH_CHARS = "!@#$%^&*"
+    RAIN_CHARS = ".,':;"
+    
+    def __init__(self, base_ascii, ascii_chars=DEFAULT_ASCII_CHARS, alt_ascii_chars=ALT_ASCII_CHARS, seed=None):
+        self.base_ascii = base_ascii
+        self.rng = np.random.default_rng(seed)
+        
+        lines = base_ascii.split('\n')
+        self._line_lengths = [len(line) for line in lines]
+        width = max(self._line_lengths)
+        self._ragged = any(length != width for length in self._line_lengths)
+        
+        padded = "".join(line.ljust(width) for line in lines)
+        self.grid = np.frombuffer(padded.encode('utf-32-le'), dtype='<u4').reshape(len(lines), width)
+        self.ink = self.grid != ord(' ')
+        
+        # Replacement tables: every alternative set padded into one 2D array
+        self.alt_sets = [np.array([ord(c) for c in chars], dtype='<u4') for chars in alt_ascii_chars]
+        longest = max(len(chars) for chars in self.alt_sets)
+        self.alt_table = np.zeros((len(self.alt_sets), longest), dtype='<u4')
+        for i, chars in enumerate(self.alt_sets):
+            self.alt_table[i, :len(chars)] = chars
+        self.alt_lengths = np.array([len(chars) for chars in self.alt_sets])
+        self.glitch_chars = np.array([ord(c) for c in self.GLITCH_CHARS + ascii_chars], dtype='<u4')
+        self.glitch_split = len(self.GLITCH_CHARS)
+        self.rain_chars = np.array([ord(c) for c in self.RAIN_CHARS], dtype='<u4')
+        
+        # Column phases for the wave; sin of (x + frame) * 0.2 per frame
+        self.column_phase = np.arange(width) * 0.2
+    
+    def render(self, effect, intensity, frame):
+        """Text of one animation frame"""
+        return self._to_text(self.render_grid(effect, intensity, frame))
+    
+    def render_grid(self, effect, intensity, frame):
+        """Code point grid of one animation frame"""
+        grid = self.grid.copy()
+        height, width = grid.shape
+        
+        if effect == "wave":
+            # Wave effect - columns on a wave crest switch to block characters
+            chars = self.alt_sets[0]
+            wave_offset = np.sin(self.column_phase + frame * 0.2) * intensity
+            crest = wave_offset > 0.3
+            column_chars = chars[np.minimum(len(chars) - 1, (wave_offset * len(chars)).astype(int).clip(0))]
+            mask = self.ink & crest
+            grid[mask] = np.broadcast_to(column_chars, grid.shape)[mask]
+        
+        elif effect == "flicker":
+            # Flicker effect - random cells from a random alternative set
+            mask = self._random_mask(intensity * 0.3)
+            count = int(mask.sum())
+            sets = self.rng.integers(0, len(self.alt_sets), count)
+            picks = (self.rng.random(count) * self.alt_lengths[sets]).astype(int)
+            grid[mask] = self.alt_table[sets, picks]
+        
+        elif effect == "cycle":
+            # Cycle through different character sets
+            grid = self._fill_from_set(grid, (frame // 10) % len(self.alt_sets), intensity)
+        
+        elif effect == "glitch":
+            # Glitch effect - random corruption, half symbols and half ramp characters
+            mask = self._random_mask(intensity * 0.2)
+            count = int(mask.sum())
+            symbols = self.rng.random(count) < 0.5
+            picks = np.where(
+                symbols,
+                self.rng.integers(0, self.glitch_split, count),
+                self.rng.integers(self.glitch_split, len(self.glitch_chars), count)
+            )
+            grid[mask] = self.glitch_chars[picks]
+        
+        elif effect == "rain":
+            # Rain effect - falling drops anywhere on the grid
+            drops = int(height * width * intensity * 0.1)
+            if drops and width:
+                xs = self.rng.integers(0, width, drops)
+                ys = (frame + self.rng.integers(0, 21, drops)) % height
+                grid[ys, xs] = self.rain_chars[self.rng.integers(0, len(self.rain_chars), drops)]
+        
+        elif effect == "morph":
+            # Morph effect - gradually change character mapping
+            morph_stage = (frame % 100) / 100.0
+            set_index = int(morph_stage * len(self.alt_sets)) % len(self.alt_sets)
+            grid = self._fill_from_set(grid, set_index, intensity * morph_stage)
+        
+        return grid
+    
+    def _random_mask(self, probability):
+        return self.ink & (self.rng.random(self.grid.shape) < probability)
+    
+    def _fill_from_set(self, grid, set_index, probability):
+        mask = self._random_mask(probability)
+        chars = self.alt_sets[set_index]
+        grid[mask] = chars[self.rng.integers(0, len(chars), int(mask.sum()))]
+        return grid
+    
+    def _to_text(self, grid):
+        if not self._ragged:
+            return codepoints_to_ascii(grid)
+        # Trim the padding back off lines that were shorter than the widest
+        rows = codepoints_to_ascii(grid).split('\n')
+        return '\n'.join(row[:length] for row, length in zip(rows, self._line_lengths))
+
+
+class ProceduralLoop:
+    """Pre-rendered, seekable loop of one procedural effect
+    
+    Frame k draws its randomness from a generator seeded with (seed, k), so it
+    depends only on the settings and k: frames can be rendered in any order,
+    replayed exactly and re-rendered on demand. render_all() fills a
+    FrameStore in the background; frames not rendered yet are produced on
+    access. Behaves like the other frame sequences (len, indexing, charset,
+    get_indices), so it can be played, saved and exported the same way.
+    """
+    
+    def __init__(self, base_ascii, effect, intensity, frame_count=120, seed=0,
+                 ascii_chars=DEFAULT_ASCII_CHARS, alt_ascii_chars=ALT_ASCII_CHARS):
+        self.key = (base_ascii, effect, intensity, seed)
+        self.effect = effect
+        self.intensity = intensity
+        self.frame_count = frame_count
+        self.seed = seed
+        self._effects = ProceduralEffects(base_ascii, ascii_chars, alt_ascii_chars)
+        
+        # Every character an effect can produce, as one charset for the FrameStore
+        effects = self._effects
+        codes = np.unique(np.concatenate([
+            effects.grid.ravel(), effects.alt_table[effects.alt_table != 0],
+            effects.glitch_chars, effects.rain_chars
+        ]))
+        if len(codes) > 256:
+            raise ValueError("Too many distinct characters for a pre-rendered loop")
+        self._codes = codes.astype('<u4')
+        self.charset = "".join(chr(code) for code in codes)
+        
+        self.frames = FrameStore(self.charset)
+        self._lock = threading.Lock()
+        self._cancelled = False
+    
+    def __len__(self):
+        return self.frame_count
+    
+    def __iter__(self):
+        for number in range(self.frame_count):
+            yield self[number]
+    
+    def __getitem__(self, number):
+        return self._effects._to_text(self._codes[self.get_indices(number)])
+    
+    @property
+    def rendered(self):
+        return len(self.frames)
+    
+    @property
+    def complete(self):
+        return len(self.frames) == self.frame_count
+    
+    def _render(self, number):
+        """Charset indices of frame number, computed from scratch"""
+        with self._lock:
+            self._effects.rng = np.random.default_rng((self.seed, number))
+            grid = self._effects.render_grid(self.effect, self.intensity, number)
+        return np.searchsorted(self._codes, grid).astype(np.uint8)
+    
+    def get_indices(self, number):
+        """Return a frame as a 2D array of charset indices"""
+        if number < 0:
+            number += self.frame_count
+        if not 0 <= number < self.frame_count:
+            raise IndexError("frame index out of range")
+        if number < len(self.frames):
+            return self.frames.get_indices(number)
+        return self._render(number)
+    
+    def render_all(self, progress=None):
+        """Render every remaining frame into the store; progress(done, total) may return False to stop"""
+        while len(self.frames) < self.frame_count and not self._cancelled:
+            self.frames.append(self._render(len(self.frames)))
+            if progress is not None and progress(len(self.frames), self.frame_count) is False:
+                break
+        self.frames.trim()
+    
+    def cancel(self):
+        self._cancelled = True
+
+
+class ASCIIEngine:
+    """GUI-free ASCII conversion core, shared by the Tk app and the command line"""
+    
+    def __init__(self, width=80, black_as_space=False, ascii_chars=DEFAULT_ASCII_CHARS, alt_ascii_chars=ALT_ASCII_CHARS,
+                 quality="final", edge_threshold=None):
+        if width <= 0:
+            raise ValueError("Width must be positive")
+        if quality not in RESAMPLING_QUALITIES:
+            raise ValueError(f"Unknown quality: {quality}")
+        self.width = width
+        self.quality = quality
+        self.black_as_space = black_as_space
+        self.ascii_chars = ascii_chars
+        self.alt_ascii_chars = list(alt_ascii_chars)
+        self.edge_threshold = edge_threshold  # None disables the Sobel edge pass
+        self.profiler = None  # A StageTimer to time each conversion stage into
+        self._effects = None
+    
+    def output_size(self, image):
+        """Character grid (width, height) an image converts to"""
+        return self.width, int(self.width * (image.height / image.width) * 0.5)
+    
+    def pixel_to_ascii(self, pixel_value):
+        """Convert a pixel brightness value to ASCII character"""
+        return map_pixel_to_ascii(pixel_value, self.ascii_chars, self.black_as_space)
+    
+    def convert_frame_to_ascii(self, frame):
+        """Convert a single frame to ASCII art"""
+        with self._stage("decode"):
+            frame.load()
+        return self._loaded_frame_to_ascii(frame)
+    
+    def _loaded_frame_to_ascii(self, frame):
+        lut = build_ascii_lut(self.ascii_chars, self.black_as_space)
+        return frame_to_ascii(frame, self.width, lut, fast=self.quality == "preview",
+                              edge_threshold=self.edge_threshold, timer=self.profiler)
+    
+    def _stage(self, name):
+        """Context manager timing a stage into the profiler, if one is attached"""
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+    
+    def convert_frame_to_color(self, frame, levels=4):
+        """Convert a single frame to ColorArt with a levels**3 color palette"""
+        lut = build_ascii_lut(self.ascii_chars, self.black_as_space)
+        return ColorArt.from_frame(frame, self.width, lut, levels, fast=self.quality == "preview",
+                                   edge_threshold=self.edge_threshold)
+    
+    def convert_file_to_ascii(self, image_path):
+        """Convert a still image file; preview quality decodes it at reduced size
+        
+        Very large images are converted in strips with bounded memory.
+        """
+        with open_large_image(image_path) as image:
+            large = is_large_image(image)
+        if large:
+            return self.convert_file_tiled(image_path)
+        if self.quality == "preview":
+            with self._stage("decode"):
+                frame = open_preview_source(image_path, max_width=self.width * 4)
+                frame.load()
+            return self._loaded_frame_to_ascii(frame)
+        with Image.open(image_path) as image:
+            return self.convert_frame_to_ascii(image)
+    
+    def convert_file_tiled(self, image_path, max_strip_bytes=1 << 24):
+        """Convert a still image strip by strip (box-filtered), whatever its size"""
+        lut = build_ascii_lut(self.ascii_chars, self.black_as_space)
+        with self._stage("tiled"):
+            return convert_tiled(image_path, self.width, lut, self.edge_threshold, max_strip_bytes)
+    
+    def convert_animated_to_ascii(self, image_path, jobs=None, progress=None):
+        """Convert every frame of an animated GIF; returns (FrameStore, durations)"""
+        return convert_gif_parallel(image_path, self.width, self.ascii_chars, self.black_as_space,
+                                    jobs=jobs, progress=progress, edge_threshold=self.edge_threshold)
+    
+    def open_frame_stream(self, image_path, lookahead=16, cache_size=64):
+        """Lazily converted frames of an animated GIF"""
+        edged = self.edge_threshold is not None
+        charset, index_lut = build_index_lut(self.ascii_chars, self.black_as_space, edged)
+        edges = (self.edge_threshold, edge_index_values(charset)) if edged else None
+        return LazyGifFrames(image_path, self.width, charset, index_lut,
+                             lookahead=lookahead, cache_size=cache_size, edges=edges)
+    
+    def generate_procedural_frame(self, base_ascii, effect, intensity, frame):
+        """Generate a procedural animation frame from static ASCII art
+        
+        intensity ranges from 0 to 1; frame is the animation tick.
+        """
+        if not base_ascii:
+            return base_ascii
+        
+        # Splitting the art into a character grid is done once per base image
+        if self._effects is None or self._effects.base_ascii != base_ascii:
+            self._effects = ProceduralEffects(base_ascii, self.ascii_chars, self.alt_ascii_chars)
+        return self._effects.render(effect, intensity, frame)
+
+
+def archive_format(path):
+    """Frame export format implied by a file name"""
+    name = path.lower()
+    if name.endswith('.zip'):
+        return 'zip'
+    if name.endswith(('.tar.gz', '.tgz')):
+        return 'tar.gz'
+    if name.endswith('.frames'):
+        return 'frames'
+    return 'txt'
+
+
+class FrameArchiveWriter:
+    """Streams ASCII frames into one output on a background writer thread
+    
+    Formats, chosen from the file name: .zip (one deflated .txt per frame),
+    .tar.gz, .frames (all frames back to back followed by an offset table,
+    see IndexedFrameFile) or .txt (the old one-file-per-frame layout, next to
+    the chosen path). write() hands frames over through a bounded queue, so
+    producing text and disk I/O overlap.
+    """
+    
+    FRAMES_MAGIC = b"ASCFRM01"
+    
+    def __init__(self, path, base_name="frame", queue_size=64, buffer_size=1 << 20):
+        self.path = path
+        self.base_name = base_name
+        self.format = archive_format(path)
+        self.buffer_size = buffer_size
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.elapsed = 0.0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._start = None
+        self._drained = False
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+    
+    @property
+    def fps(self):
+        """Frames written per second"""
+        return self.frames_written / self.elapsed if self.elapsed > 0 else 0.0
+    
+    def start(self):
+        self._start = time.perf_counter()
+        self._thread.start()
+    
+    def write(self, text):
+        """Queue one frame; blocks while the writer is a full queue behind"""
+        if self.error is not None:
+            raise self.error
+        self._queue.put(text)
+    
+    def close(self):
+        """Flush the remaining frames and finish the file"""
+        if self._start is None:  # Never started: nothing was written
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self._start
+        if self.error is not None:
+            raise self.error
+    
+    def _frame_name(self, index):
+        return f"{self.base_name}_frame_{index + 1:03d}.txt"
+    
+    def _frames(self):
+        index = 0
+        while True:
+            text = self._queue.get()
+            if text is None:
+                self._drained = True
+                return
+            data = text.encode('utf-8')
+            yield index, data
+            self.frames_written += 1
+            self.bytes_written += len(data)
+            index += 1
+    
+    def _run(self):
+        try:
+            if self.format == 'zip':
+                with zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for index, data in self._frames():
+                        archive.writestr(self._frame_name(index), data)
+            
+            elif self.format == 'tar.gz':
+                with open(self.path, 'wb', buffering=self.buffer_size) as raw, \
+                        tarfile.open(fileobj=raw, mode='w:gz') as archive:
+                    for index, data in self._frames():
+                        info = tarfile.TarInfo(self._frame_name(index))
+                        info.size = len(data)
+                        info.mtime = int(time.time())
+                        archive.addfile(info, io.BytesIO(data))
+            
+            elif self.format == 'frames':
+                with open(self.path, 'wb', buffering=self.buffer_size) as f:
+                    f.write(self.FRAMES_MAGIC)
+                    offsets = [f.tell()]
+                    for _, data in self._frames():
+                        f.write(data)
+                        offsets.append(offsets[-1] + len(data))
+                    index_offset = offsets[-1]
+                    f.write(np.array(offsets, dtype='<u8').tobytes())
+                    f.write(struct.pack('<QQ', len(offsets) - 1, index_offset))
+            
+            else:
+                folder = os.path.dirname(self.path) or "."
+                for index, data in self._frames():
+                    with open(os.path.join(folder, self._frame_name(index)), 'wb') as f:
+                        f.write(data)
+        
+        except Exception as e:
+            self.error = e
+            # Keep draining so a producer blocked on the queue is released
+            while not self._drained:
+                self._drained = self._queue.get() is None
+
+
+class IndexedFrameFile:
+    """Random access to the frames of a .frames file written by FrameArchiveWriter"""
+    
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if self._file.read(len(FrameArchiveWriter.FRAMES_MAGIC)) != FrameArchiveWriter.FRAMES_MAGIC:
+            self._file.close()
+            raise ValueError(f"Not an indexed frames file: {path}")
+        self._file.seek(-16, os.SEEK_END)
+        count, index_offset = struct.unpack('<QQ', self._file.read(16))
+        self._file.seek(index_offset)
+        self.offsets = np.frombuffer(self._file.read(8 * (count + 1)), dtype='<u8')
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("frame index out of range")
+        start, stop = int(self.offsets[index]), int(self.offsets[index + 1])
+        self._file.seek(start)
+        return self._file.read(stop - start).decode('utf-8')
+    
+    def close(self):
+        self._file.close()
+
+
+# Binary ASCII animation (.asca) layout, all little-endian:
+#   header     magic, version, reserved, width, height, frame count, charset byte length
+#   charset    UTF-8, padded to a multiple of 8 bytes
+#   durations  uint32 milliseconds per frame
+#   index      per frame: payload offset, base keyframe number, delta entry count
+#   payloads   keyframes as height*width uint8 charset indices; deltas as
+#              uint32 positions followed by uint8 indices, applied to their keyframe
+ANIMATION_MAGIC = b"ASCIIANM"
+ANIMATION_VERSION = 1
+ANIMATION_HEADER = struct.Struct('<8sHHIIII')
+ANIMATION_INDEX_DTYPE = np.dtype([('offset', '<u8'), ('base', '<u4'), ('count', '<u4')])
+
+
+def write_animation(path, frames, durations, delta_threshold=0.15):
+    """Write frames (anything with charset, len() and get_indices()) as an .asca file"""
+    frame_count = len(frames)
+    height, width = frames.get_indices(0).shape if frame_count else (0, 0)
+    charset = frames.charset.encode('utf-8')
+    charset += b"\0" * (-len(charset) % 8)
+    
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(ANIMATION_HEADER.pack(ANIMATION_MAGIC, ANIMATION_VERSION, 0, width, height,
+                                      frame_count, len(frames.charset.encode('utf-8'))))
+        f.write(charset)
+        
+        # Durations and index are filled in once every frame has been written
+        tables_offset = f.tell()
+        index = np.zeros(frame_count, dtype=ANIMATION_INDEX_DTYPE)
+        f.write(b"\0" * (4 * frame_count + index.nbytes))
+        
+        keyframe, keyframe_number = None, 0
+        for number in range(frame_count):
+            flat = np.ascontiguousarray(frames.get_indices(number), dtype=np.uint8).reshape(-1)
+            index[number]['offset'] = f.tell()
+            if keyframe is not None:
+                changed = np.flatnonzero(keyframe != flat)
+                if len(changed) <= delta_threshold * flat.size:
+                    f.write(changed.astype('<u4').tobytes())
+                    f.write(flat[changed].tobytes())
+                    index[number]['base'] = keyframe_number
+                    index[number]['count'] = len(changed)
+                    continue
+            f.write(flat.tobytes())
+            keyframe, keyframe_number = flat, number
+            index[number]['base'] = number
+        
+        f.seek(tables_offset)
+        f.write(np.array(durations[:frame_count], dtype='<u4').tobytes())
+        f.write(index.tobytes())
+
+
+class MappedAnimation:
+    """Read-only, memory-mapped .asca animation with O(1) access to any frame
+    
+    Opening only parses the header; frame payloads are read from the mapping
+    when a frame is requested.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, _, width, height, frame_count, charset_length = ANIMATION_HEADER.unpack_from(self._map, 0)
+            if magic != ANIMATION_MAGIC or version != ANIMATION_VERSION:
+                raise ValueError(f"Not a supported ASCII animation file: {path}")
+        except Exception:
+            self._file.close()
+            raise
+        
+        self.shape = (height, width)
+        offset = ANIMATION_HEADER.size
+        self.charset = self._map[offset:offset + charset_length].decode('utf-8')
+        self._codes = charset_codes(self.charset)
+        
+        offset += charset_length + (-charset_length % 8)
+        self.durations = np.frombuffer(self._map, dtype='<u4', count=frame_count, offset=offset).tolist()
+        offset += 4 * frame_count
+        self._index = np.frombuffer(self._map, dtype=ANIMATION_INDEX_DTYPE, count=frame_count, offset=offset)
+    
+    def __len__(self):
+        return len(self._index)
+    
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+    
+    def __getitem__(self, number):
+        return indices_to_ascii(self.get_indices(number), self._codes)
+    
+    def get_indices(self, number):
+        """Return a frame as a 2D array of charset indices"""
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("frame index out of range")
+        
+        offset, base, count = (int(value) for value in self._index[number])
+        size = self.shape[0] * self.shape[1]
+        if base == number:
+            return np.frombuffer(self._map, dtype=np.uint8, count=size, offset=offset).reshape(self.shape)
+        
+        frame = np.frombuffer(self._map, dtype=np.uint8, count=size, offset=int(self._index[base]['offset'])).copy()
+        positions = np.frombuffer(self._map, dtype='<u4', count=count, offset=offset)
+        frame[positions] = np.frombuffer(self._map, dtype=np.uint8, count=count, offset=offset + 4 * count)
+        return frame.reshape(self.shape)
+    
+    def close(self):
+        """Release the mapping; frames already handed out keep it alive until dropped"""
+        self._index = np.empty(0, dtype=ANIMATION_INDEX_DTYPE)
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Closed by the garbage collector once the last view goes away
+        self._file.close()
+
+
+def export_frames(frames, path, base_name="frame", progress=None):
+    """Write every frame to path through a FrameArchiveWriter; returns the writer
+    
+    progress(done, total) is called after each frame is queued.
+    """
+    with FrameArchiveWriter(path, base_name) as writer:
+        for done, frame in enumerate(frames, start=1):
+            writer.write(frame)
+            if progress is not None:
+                progress(done, len(frames))
+    return writer
+
+
+def collect_input_paths(patterns):
+    """Expand files, directories and glob patterns into a sorted list of image paths"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, _, filenames in os.walk(pattern):
+                for filename in filenames:
+                    if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                        paths.add(os.path.join(dirpath, filename))
+        elif os.path.isfile(pattern):
+            paths.add(pattern)
+        else:
+            for match in glob.glob(pattern, recursive=True):
+                if os.path.isfile(match) and match.lower().endswith(SUPPORTED_EXTENSIONS):
+                    paths.add(match)
+    return sorted(paths)
+
+
+def _convert_file_job(image_path, output_dir, width, black_as_space, quality="final", color=None, archive=None,
+                      ascii_chars=DEFAULT_ASCII_CHARS, edge_threshold=None):
+    """Worker: convert one image or GIF and write its text output; returns the frame count"""
+    engine = ASCIIEngine(width, black_as_space, ascii_chars, quality=quality, edge_threshold=edge_threshold)
+    base_name = os.path.splitext(os.path.basename(image_path))[0]
+    
+    with open_large_image(image_path) as image:
+        animated = getattr(image, "is_animated", False)
+        large = is_large_image(image)
+    if animated:
+        frames, durations = engine.convert_animated_to_ascii(image_path, jobs=1)
+        if archive == 'asca':
+            write_animation(os.path.join(output_dir, f"{base_name}.asca"), frames, durations)
+            return len(frames)
+        if archive:
+            export_frames(frames, os.path.join(output_dir, f"{base_name}.{archive}"), base_name)
+            return len(frames)
+    elif color and not large:  # Large images are converted in strips, without color
+        with Image.open(image_path) as image:
+            color_art = engine.convert_frame_to_color(image)
+        content = color_art.to_html() if color == "html" else color_art.to_ansi()
+        with open(os.path.join(output_dir, f"{base_name}.{'html' if color == 'html' else 'ans'}"), 'w', encoding='utf-8') as f:
+            f.write(content)
+        return 1
+    else:
+        frames = [engine.convert_file_to_ascii(image_path)]
+    
+    if len(frames) == 1:
+        with open(os.path.join(output_dir, f"{base_name}.txt"), 'w', encoding='utf-8') as f:
+            f.write(frames[0])
+    else:
+        for i, frame in enumerate(frames):
+            with open(os.path.join(output_dir, f"{base_name}_frame_{i+1:03d}.txt"), 'w', encoding='utf-8') as f:
+                f.write(frame)
+    return len(frames)
+
+
+def run_batch(patterns, output_dir, width=80, black_as_space=False, jobs=None, quality="final", color=None,
+              archive=None, ascii_chars=DEFAULT_ASCII_CHARS, edge_threshold=None):
+    """Convert every matching image across a process pool and print a throughput summary
+    
+    Returns the number of files that failed.
+    """
+    paths = collect_input_paths(patterns)
+    if not paths:
+        print("No supported images found")
+        return 0
+    
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    
+    start = time.perf_counter()
+    converted = frames = failures = 0
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(_convert_file_job, path, output_dir, width, black_as_space, quality, color, archive,
+                            ascii_chars, edge_threshold): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                frame_count = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {path}: {e}")
+            else:
+                converted += 1
+                frames += frame_count
+                print(f"✅ {path} ({frame_count} frame{'s' if frame_count != 1 else ''})")
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nConverted {converted}/{len(paths)} images ({frames} frames) in {elapsed:.2f} s "
+          f"with {jobs} job{'s' if jobs != 1 else ''}: "
+          f"{converted / elapsed:.2f} images/s, {frames / elapsed:.2f} frames/s")
+    if failures:
+        print(f"{failures} file{'s' if failures != 1 else ''} failed")
+    return failures
+
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.webm', '.m4v')
+STREAM_STAGES = ("decode", "queue", "convert", "latency")
+
+
+class SyntheticVideoSource:
+    """Endless (or frame_count long) scrolling gradient-and-noise video, for tests and benchmarks"""
+    
+    paced = True
+    
+    def __init__(self, size=(640, 360), fps=30.0, frame_count=None, seed=0):
+        self.size = size
+        self.fps = fps
+        self.frame_count = frame_count
+        width, height = size
+        self._texture = np.asarray(make_synthetic_image((width * 2, height), seed).convert('L'))
+    
+    def frames(self):
+        width = self.size[0]
+        step = max(1, width // 120)
+        number = 0
+        while self.frame_count is None or number < self.frame_count:
+            offset = (number * step) % width
+            yield Image.fromarray(np.ascontiguousarray(self._texture[:, offset:offset + width]), 'L')
+            number += 1
+    
+    def close(self):
+        pass
+
+
+def parse_frame_rate(rate, default=30.0):
+    """Frames per second from an ffprobe rate such as "30000/1001"; default if unknown ("0/0", "N/A")"""
+    numerator, _, denominator = rate.strip().partition('/')
+    try:
+        fps = float(numerator) / float(denominator or 1)
+    except (ValueError, ZeroDivisionError):
+        return default
+    return fps if 0 < fps < float('inf') else default
+
+
+class VideoFileSource:
+    """Grayscale frames of a video file, decoded by an ffmpeg subprocess
+    
+    ffmpeg does the colour conversion and downscaling to at most max_width
+    pixels, so only small grayscale frames cross the pipe.
+    """
+    
+    paced = True
+    
+    def __init__(self, path, max_width=960, ffmpeg="ffmpeg", ffprobe="ffprobe"):
+        self.path = path
+        self.ffmpeg = ffmpeg
+        self._process = None
+        
+        probe = subprocess.run(
+            [ffprobe, '-v', 'error', '-select_streams', 'v:0',
+             '-show_entries', 'stream=width,height,r_frame_rate', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, check=True
+        )
+        width, height, rate = probe.stdout.strip().splitlines()[0].split(',')[:3]
+        width, height = int(width), int(height)
+        self.fps = parse_frame_rate(rate)
+        
+        if width > max_width:
+            height = max(2, round(height * max_width / width / 2) * 2)
+            width = max_width
+        self.size = (width, height)
+    
+    def frames(self):
+        width, height = self.size
+        self._process = subprocess.Popen(
+            [self.ffmpeg, '-v', 'error', '-i', self.path, '-vf', f'scale={width}:{height}',
+             '-pix_fmt', 'gray', '-f', 'rawvideo', '-'],
+            stdout=subprocess.PIPE, stdin=subprocess.DEVNULL
+        )
+        frame_bytes = width * height
+        try:
+            while True:
+                data = self._process.stdout.read(frame_bytes)
+                if len(data) < frame_bytes:
+                    break
+                yield Image.frombuffer('L', self.size, data, 'raw', 'L', 0, 1)
+        finally:
+            self.close()
+    
+    def close(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+
+
+class WebcamSource:
+    """Grayscale frames from a camera through OpenCV (optional dependency)"""
+    
+    paced = False  # The camera delivers frames at its own rate
+    
+    def __init__(self, device=0):
+        if cv2 is None:
+            raise RuntimeError("Webcam capture requires OpenCV (pip install opencv-python)")
+        self._capture = cv2.VideoCapture(device)
+        if not self._capture.isOpened():
+            raise RuntimeError(f"Could not open camera {device}")
+        self.fps = self._capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.size = (int(self._capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                     int(self._capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    
+    def frames(self):
+        while self._capture.isOpened():
+            ok, frame = self._capture.read()
+            if not ok:
+                break
+            yield Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 'L')
+    
+    def close(self):
+        self._capture.release()
+
+
+def open_video_source(spec, max_width=960):
+    """Video source for a file path, 'webcam' / 'webcam:N' or 'synthetic'"""
+    if spec == 'synthetic':
+        return SyntheticVideoSource()
+    if spec == 'webcam' or spec.startswith('webcam:'):
+        return WebcamSource(int(spec.partition(':')[2] or 0))
+    return VideoFileSource(spec, max_width)
+
+
+class VideoStream:
+    """Real-time video to ASCII pipeline: source -> bounded queue -> converter pool -> renderer
+    
+    A capture thread reads the source (paced to its frame rate) into a bounded
+    queue, evicting the oldest frame when converters fall behind. Converter
+    threads turn frames into text and publish only the newest result. The
+    renderer calls poll() once per display tick; superseded results, and
+    results older than one frame interval while a newer frame is in flight,
+    are dropped so what is shown stays within a frame of the source.
+    """
+    
+    def __init__(self, source, engine, workers=2, queue_size=4, history=120):
+        self.source = source
+        self.engine = engine
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.frame_interval = 1.0 / source.fps
+        
+        self.frames_captured = 0
+        self.frames_converted = 0
+        self.frames_displayed = 0
+        self.dropped_queue = 0
+        self.dropped_stale = 0
+        self.error = None
+        
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._source_done = False
+        self._latest = None  # (sequence, captured_at, text), not yet displayed
+        self._latest_sequence = -1
+        self._captured_sequence = -1
+        self._timings = StageTimer(history)
+        self._displayed_at = deque(maxlen=history)
+        self._threads = []
+    
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+    
+    @property
+    def finished(self):
+        """True once the source is exhausted and every frame was converted or dropped"""
+        return (not any(thread.is_alive() for thread in self._threads)
+                and self._latest is None)
+    
+    @property
+    def fps(self):
+        """Displayed frames per second over the recent history"""
+        if len(self._displayed_at) < 2:
+            return 0.0
+        return (len(self._displayed_at) - 1) / max(self._displayed_at[-1] - self._displayed_at[0], 1e-9)
+    
+    def start(self):
+        self._threads = [threading.Thread(target=self._capture, daemon=True)]
+        self._threads += [threading.Thread(target=self._convert, daemon=True) for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self.source.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+    
+    def _capture(self):
+        """Source stage: decode frames (paced for files) and keep the queue fresh"""
+        start = time.perf_counter()
+        frames = iter(self.source.frames())
+        sequence = 0
+        try:
+            while not self._stop.is_set():
+                if self.source.paced:
+                    delay = start + sequence * self.frame_interval - time.perf_counter()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+                
+                decode_start = time.perf_counter()
+                try:
+                    frame = next(frames)
+                except StopIteration:
+                    break
+                captured = time.perf_counter()
+                self._timings.record("decode", captured - decode_start)
+                
+                item = (sequence, captured, frame)
+                while True:
+                    try:
+                        self._queue.put_nowait(item)
+                        break
+                    except queue.Full:
+                        try:
+                            self._queue.get_nowait()
+                            self.dropped_queue += 1
+                        except queue.Empty:
+                            pass
+                self.frames_captured += 1
+                self._captured_sequence = sequence
+                sequence += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self._source_done = True
+    
+    def _convert(self):
+        """Converter stage: turn queued frames into text and publish the newest"""
+        while not self._stop.is_set():
+            try:
+                sequence, captured, frame = self._queue.get(timeout=0.05)
+            except queue.Empty:
+                if self._source_done:
+                    return
+                continue
+            
+            dequeued = time.perf_counter()
+            self._timings.record("queue", dequeued - captured)
+            try:
+                text = self.engine.convert_frame_to_ascii(frame)
+            except Exception as e:
+                self.error = e
+                self._stop.set()
+                return
+            self._timings.record("convert", time.perf_counter() - dequeued)
+            
+            with self._lock:
+                self.frames_converted += 1
+                if sequence > self._latest_sequence:
+                    if self._latest is not None:
+                        self.dropped_stale += 1  # Never shown, superseded
+                    self._latest = (sequence, captured, text)
+                    self._latest_sequence = sequence
+                else:
+                    self.dropped_stale += 1  # Finished after a newer frame
+    
+    def poll(self):
+        """Renderer stage: the newest undisplayed text, or None if there is nothing fresh"""
+        with self._lock:
+            latest, self._latest = self._latest, None
+        if latest is None:
+            return None
+        
+        sequence, captured, text = latest
+        now = time.perf_counter()
+        if now - captured > self.frame_interval and sequence < self._captured_sequence:
+            with self._lock:  # The converter threads update the same counter
+                self.dropped_stale += 1
+            return None
+        
+        self._timings.record("latency", now - captured)
+        self._displayed_at.append(now)
+        self.frames_displayed += 1
+        return text
+    
+    def stage_latency(self, stage):
+        """Mean latency of a stage over the recent history, in milliseconds"""
+        return self._timings.mean(stage)
+    
+    def stats(self):
+        stats = {
+            "queue_depth": self.queue_depth,
+            "queue_size": self.queue_size,
+            "captured": self.frames_captured,
+            "converted": self.frames_converted,
+            "displayed": self.frames_displayed,
+            "dropped_queue": self.dropped_queue,
+            "dropped_stale": self.dropped_stale,
+            "fps": self.fps,
+        }
+        stats.update({f"{stage}_ms": self.stage_latency(stage) for stage in STREAM_STAGES})
+        return stats
+    
+    def format_stats(self):
+        stats = self.stats()
+        return (f"Queue: {stats['queue_depth']}/{stats['queue_size']} | {stats['fps']:.1f} fps"
+                f" | Dropped: {stats['dropped_queue']} queued, {stats['dropped_stale']} stale"
+                f" | Decode {stats['decode_ms']:.1f} ms, queue {stats['queue_ms']:.1f} ms,"
+                f" convert {stats['convert_ms']:.1f} ms, latency {stats['latency_ms']:.1f} ms")
+
+
+class TerminalRenderer:
+    """Draw ASCII frames in an ANSI terminal, rewriting only what changed
+    
+    Each frame is one buffered write: cursor-home, then a cursor move and the
+    changed span of every line that differs from the previous frame. When
+    that is longer than redrawing the whole frame (e.g. most lines changed),
+    the whole frame is written instead.
+    """
+    
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.frames_rendered = 0
+        self.chars_written = 0
+        self.last_chars_written = 0
+        self.size = (0, 0)
+        self._lines = []
+        self._started = None
+        self._finished = None
+    
+    @property
+    def elapsed(self):
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.perf_counter()) - self._started
+    
+    @property
+    def fps(self):
+        """Sustained frames per second since begin()"""
+        return self.frames_rendered / self.elapsed if self.elapsed else 0.0
+    
+    def begin(self):
+        """Hide the cursor and clear the screen"""
+        self._lines = []
+        self.frames_rendered = 0
+        self.chars_written = 0
+        self._started = time.perf_counter()
+        self._finished = None
+        self.stream.write("\x1b[?25l\x1b[H\x1b[2J")
+        self.stream.flush()
+    
+    def end(self):
+        """Park the cursor below the last frame and show it again"""
+        self._finished = time.perf_counter()
+        self.stream.write(f"\x1b[{len(self._lines) + 1};1H\x1b[?25h")
+        self.stream.flush()
+    
+    @staticmethod
+    def _changed_span(old, new):
+        """(start, end) columns of new that differ from old; end is None when the tail must be erased"""
+        a = np.frombuffer(old.encode('utf-32-le'), dtype='<u4')
+        b = np.frombuffer(new.encode('utf-32-le'), dtype='<u4')
+        common = min(len(a), len(b))
+        changed = np.flatnonzero(a[:common] != b[:common])
+        start = int(changed[0]) if len(changed) else common
+        if len(a) != len(b):
+            return start, None
+        return start, int(changed[-1]) + 1
+    
+    @staticmethod
+    def _full_frame(old_lines, new_lines):
+        """Cursor-home and every line, erasing only what the previous frame leaves behind"""
+        parts = ["\x1b[H"]
+        for row, line in enumerate(new_lines):
+            if row:
+                parts.append("\r\n")
+            parts.append(line)
+            if row < len(old_lines) and len(old_lines[row]) > len(line):
+                parts.append("\x1b[K")
+        if len(old_lines) > len(new_lines):
+            parts.append("\r\n\x1b[J")
+        return "".join(parts)
+    
+    def render(self, text):
+        lines = text.split('\n')
+        previous = self._lines
+        parts = ["\x1b[H"]
+        for row, line in enumerate(lines):
+            old = previous[row] if row < len(previous) else ""
+            if line == old:
+                continue
+            start, end = self._changed_span(old, line)
+            if end is None:
+                parts.append(f"\x1b[{row + 1};{start + 1}H{line[start:]}\x1b[K")
+            else:
+                parts.append(f"\x1b[{row + 1};{start + 1}H{line[start:end]}")
+        for row in range(len(lines), len(previous)):
+            parts.append(f"\x1b[{row + 1};1H\x1b[K")
+        
+        data = "".join(parts)
+        full = self._full_frame(previous, lines)
+        if len(full) < len(data):
+            data = full
+        self.stream.write(data)
+        self.stream.flush()
+        
+        self._lines = lines
+        self.size = (max(map(len, lines)), len(lines))
+        self.frames_rendered += 1
+        self.last_chars_written = len(data)
+        self.chars_written += len(data)
+    
+    def summary(self):
+        width, height = self.size
+        per_frame = self.chars_written / self.frames_rendered if self.frames_rendered else 0
+        return (f"{self.frames_rendered} frames of {width}x{height} characters in {self.elapsed:.2f} s: "
+                f"{self.fps:.1f} fps sustained, {per_frame:.0f} chars written per frame "
+                f"(full frame {(width + 1) * height})")
+
+
+def play_in_terminal(frames, renderer=None):
+    """Render (text, seconds) pairs on absolute deadlines until exhausted or Ctrl+C"""
+    renderer = renderer or TerminalRenderer()
+    renderer.begin()
+    deadline = time.perf_counter()
+    try:
+        for text, duration in frames:
+            renderer.render(text)
+            deadline += duration
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -1.0:
+                deadline = time.perf_counter()  # Resynchronise after a long stall
+    except KeyboardInterrupt:
+        pass
+    finally:
+        renderer.end()
+    return renderer
+
+
+def terminal_frames(source, engine, effect=None, intensity=0.5, fps=None, loop=False, seed=None, loop_frames=120):
+    """(text, seconds) pairs for playing a GIF, .asca animation, video or procedural effect
+    
+    With a seed, a procedural effect plays a deterministic ProceduralLoop of
+    loop_frames frames.
+    """
+    lower = source.lower()
+    if lower.endswith(VIDEO_EXTENSIONS) or source == 'synthetic' or source.startswith('webcam'):
+        stream = VideoStream(open_video_source(source), engine)
+        stream.start()
+        try:
+            while not stream.finished:
+                text = stream.poll()
+                if text is not None:
+                    yield text, 0.0
+                else:
+                    time.sleep(stream.frame_interval / 4)
+        finally:
+            stream.stop()
+        return
+    
+    if lower.endswith('.asca'):
+        frames = MappedAnimation(source)
+        durations = frames.durations
+    else:
+        with Image.open(source) as image:
+            animated = getattr(image, "is_animated", False)
+        if animated:
+            frames, durations = engine.convert_animated_to_ascii(source)
+        elif effect and seed is not None:
+            frames = ProceduralLoop(engine.convert_file_to_ascii(source), effect, intensity, loop_frames, seed,
+                                    engine.ascii_chars, engine.alt_ascii_chars)
+            durations = [1000.0 / (fps or 30.0)] * loop_frames
+        else:
+            base_ascii = engine.convert_file_to_ascii(source)
+            frame = 0
+            while True:
+                yield (engine.generate_procedural_frame(base_ascii, effect, intensity, frame) if effect
+                       else base_ascii), 1.0 / (fps or 30.0)
+                frame += 1
+                if not effect and not loop:
+                    return
+    
+    while True:
+        for number in range(len(frames)):
+            duration = 1.0 / fps if fps else (durations[number] or 100) / 1000.0
+            yield frames[number], duration
+        if not loop:
+            return
+
+
+def gray_to_ascii_per_pixel(gray_image, ascii_chars, black_as_space=False):
+    """Reference per-pixel conversion, kept for benchmarking the vectorized path"""
+    width, height = gray_image.size
+    ascii_lines = []
+    for y in range(height):
+        line = ""
+        for x in range(width):
+            pixel_value = gray_image.getpixel((x, y))
+            line += map_pixel_to_ascii(pixel_value, ascii_chars, black_as_space)
+        ascii_lines.append(line)
+    return "\n".join(ascii_lines)
+
+
+def make_synthetic_image(size=(3840, 2160), seed=0):
+    """Build a gradient-plus-noise RGB test image"""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    gradient = (x + y) / 2
+    channels = [
+        np.clip(gradient + rng.normal(0, 24, (height, width)), 0, 255).astype(np.uint8)
+        for _ in range(3)
+    ]
+    return Image.fromarray(np.dstack(channels), 'RGB')
+
+
+def benchmark_conversion(width=300, size=(3840, 2160), repeats=3):
+    """Compare the per-pixel and vectorized ASCII mapping on a synthetic 4K frame"""
+    ascii_chars = DEFAULT_ASCII_CHARS
+    source = make_synthetic_image(size)
+    height = int(width * (source.height / source.width) * 0.5)
+    gray_image = source.resize((width, height), Image.Resampling.LANCZOS).convert('L')
+    
+    print(f"Benchmark: {size[0]}x{size[1]} source -> {width}x{height} characters, best of {repeats}")
+    for black_as_space in (False, True):
+        lut = build_ascii_lut(ascii_chars, black_as_space)
+        
+        slow_times, fast_times = [], []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            slow = gray_to_ascii_per_pixel(gray_image, ascii_chars, black_as_space)
+            slow_times.append(time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            fast = gray_to_ascii(gray_image, lut)
+            fast_times.append(time.perf_counter() - start)
+        
+        if slow != fast:
+            raise AssertionError("Vectorized output differs from per-pixel output")
+        
+        slow_ms, fast_ms = min(slow_times) * 1000, min(fast_times) * 1000
+        print(f"  black_as_space={black_as_space!s:5}  per-pixel {slow_ms:8.2f} ms  "
+              f"vectorized {fast_ms:6.2f} ms  speedup {slow_ms / fast_ms:6.1f}x  (output identical)")
+
+
+def benchmark_resampling(width=300, size=(6000, 4000), repeats=3):
+    """Compare final (LANCZOS) and preview (draft + reduce + bilinear) conversion latency"""
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_path = os.path.join(temp_dir, "benchmark.jpg")
+        make_synthetic_image(size).save(image_path, quality=90)
+        
+        print(f"Resampling: {size[0]}x{size[1]} JPEG ({size[0] * size[1] / 1e6:.0f} MP) -> width {width}, best of {repeats}")
+        for quality in RESAMPLING_QUALITIES:
+            engine = ASCIIEngine(width, quality=quality)
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                engine.convert_file_to_ascii(image_path)
+                times.append(time.perf_counter() - start)
+            print(f"  {quality:8} {min(times) * 1000:8.1f} ms")
+
+
+def benchmark_procedural(width=300, frames=120, intensity=0.5):
+    """Measure procedural effect frame rates at the given width (target: 60 fps)"""
+    engine = ASCIIEngine(width)
+    base_ascii = engine.convert_frame_to_ascii(make_synthetic_image((1920, 1080)))
+    height = base_ascii.count('\n') + 1
+    
+    print(f"Procedural effects: {width}x{height} characters, {frames} frames each")
+    for effect in PROCEDURAL_EFFECTS:
+        start = time.perf_counter()
+        for frame in range(frames):
+            engine.generate_procedural_frame(base_ascii, effect, intensity, frame)
+        fps = frames / (time.perf_counter() - start)
+        print(f"  {effect:8} {fps:8.1f} fps  {'ok' if fps >= 60 else 'below 60 fps target'}")
+
+
+def benchmark_edges(width=300, size=(1920, 1080), repeats=5):
+    """Measure the cost of density-ordered ramps and the Sobel edge pass at the given width"""
+    import tempfile
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        ramps = [density_ramp(chars, cache_dir) for chars in [DEFAULT_ASCII_CHARS] + ALT_ASCII_CHARS]
+        measured = time.perf_counter() - start
+        _glyph_density_tables.clear()
+        start = time.perf_counter()
+        [density_ramp(chars, cache_dir) for chars in [DEFAULT_ASCII_CHARS] + ALT_ASCII_CHARS]
+        reloaded = time.perf_counter() - start
+    print(f"Glyph density ramps: measured in {measured * 1000:.1f} ms, reloaded from disk in {reloaded * 1000:.1f} ms")
+    print(f"  {DEFAULT_ASCII_CHARS!r} -> {ramps[0]!r}")
+    
+    source = make_synthetic_image(size)
+    print(f"Edge pass: {size[0]}x{size[1]} source -> width {width}, best of {repeats}")
+    for edge_threshold in (None, 0.35):
+        engine = ASCIIEngine(width, edge_threshold=edge_threshold)
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine.convert_frame_to_ascii(source)
+            times.append(time.perf_counter() - start)
+        label = "edges" if edge_threshold is not None else "plain"
+        print(f"  {label:8} {min(times) * 1000:8.2f} ms  {1 / min(times):8.1f} fps")
+
+
+def benchmark_terminal(width=300, frames=240):
+    """Measure sustained terminal frame rates (output discarded) and the diff size per frame"""
+    engine = ASCIIEngine(width)
+    base_ascii = engine.convert_frame_to_ascii(make_synthetic_image((1920, 1080)))
+    
+    print(f"Terminal renderer: {frames} frames per effect, output discarded")
+    with open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for effect, intensity in (("wave", 0.5), ("flicker", 0.1), ("rain", 0.5)):
+            sequence = ((engine.generate_procedural_frame(base_ascii, effect, intensity, frame), 0.0)
+                        for frame in range(frames))
+            renderer = play_in_terminal(sequence, TerminalRenderer(devnull))
+            print(f"  {effect:8} {renderer.summary()}")
+
+
+def benchmark_streaming(width=160, size=(1280, 720), fps=30.0, seconds=3.0, workers=2):
+    """Run a synthetic video through the streaming pipeline and report its statistics"""
+    source = SyntheticVideoSource(size, fps, frame_count=int(fps * seconds))
+    stream = VideoStream(source, ASCIIEngine(width, quality="preview"), workers=workers)
+    
+    print(f"Streaming: {size[0]}x{size[1]} synthetic video at {fps:.0f} fps -> width {width}, {workers} workers")
+    stream.start()
+    while not stream.finished:
+        stream.poll()
+        time.sleep(stream.frame_interval / 4)
+    stream.stop()
+    
+    stats = stream.stats()
+    print(f"  displayed {stats['displayed']}/{stats['captured']} frames at {stats['fps']:.1f} fps, "
+          f"dropped {stats['dropped_queue']} queued + {stats['dropped_stale']} stale")
+    print(f"  decode {stats['decode_ms']:.2f} ms  queue {stats['queue_ms']:.2f} ms  "
+          f"convert {stats['convert_ms']:.2f} ms  end-to-end {stats['latency_ms']:.2f} ms "
+          f"(frame interval {stream.frame_interval * 1000:.1f} ms)")
+
+
+class StageTimer:
+    """Wall time of named pipeline stages: running totals plus the last `history` samples of each
+    
+    Thread-safe, so converter threads and the Tk thread can share one instance.
+    """
+    
+    def __init__(self, history=120):
+        self.history = history
+        self.totals = {}
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def record(self, name, seconds):
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0.0) + seconds
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.history)
+            samples.append(seconds)
+    
+    def clear(self):
+        with self._lock:
+            self.totals.clear()
+            self._samples.clear()
+    
+    def milliseconds(self):
+        """Accumulated time per stage, in milliseconds"""
+        with self._lock:
+            return {name: total * 1000.0 for name, total in self.totals.items()}
+    
+    def mean(self, name):
+        """Mean of a stage's recent samples in milliseconds, 0.0 before the first"""
+        with self._lock:
+            samples = self._samples.get(name)
+            return 1000.0 * sum(samples) / len(samples) if samples else 0.0
+    
+    def summary(self):
+        """{stage: (last, mean, max)} in milliseconds, in first-seen order"""
+        with self._lock:
+            return {
+                name: (samples[-1] * 1000, sum(samples) * 1000 / len(samples), max(samples) * 1000)
+                for name, samples in self._samples.items()
+            }
+    
+    def format(self):
+        lines = [f"{'stage':10} {'last':>8} {'avg':>8} {'max':>8}  ms"]
+        for name, (last, mean, peak) in self.summary().items():
+            lines.append(f"{name:10} {last:8.2f} {mean:8.2f} {peak:8.2f}")
+        return "\n".join(lines)
+
+
+def write_profile(profile, path, limit=40):
+    """Save cProfile results: pstats data for .prof, otherwise a text report by cumulative time"""
+    if path.lower().endswith('.prof'):
+        profile.dump_stats(path)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        pstats.Stats(profile, stream=f).sort_stats('cumulative').print_stats(limit)
+
+
+def make_synthetic_gif(path, size=(480, 270), frames=24, seed=0):
+    """Write a scrolling synthetic animation to path as a GIF"""
+    width, height = size
+    texture = np.asarray(make_synthetic_image((width * 2, height), seed))
+    step = max(1, width // frames)
+    images = [Image.fromarray(np.ascontiguousarray(texture[:, i * step:i * step + width])) for i in range(frames)]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=40, loop=0)
+
+
+def _benchmark_still_stages(engine, image_path, renderer):
+    """One pass through ASCIIEngine.convert_file_to_ascii, then a render; returns (StageTimer, text)"""
+    timer = engine.profiler = StageTimer()
+    try:
+        text = engine.convert_file_to_ascii(image_path)
+    finally:
+        engine.profiler = None
+    with timer.stage("render"):
+        renderer.render(text)
+    return timer, text
+
+
+def _benchmark_gif_stages(engine, image_path, renderer):
+    """One pass over the GIF pipeline (convert, then play every frame); returns (StageTimer, FrameStore)"""
+    timer = StageTimer()
+    edged = engine.edge_threshold is not None
+    charset, index_lut = build_index_lut(engine.ascii_chars, engine.black_as_space, edged)
+    edges = (engine.edge_threshold, edge_index_values(charset)) if edged else None
+    frames = FrameStore(charset)
+    with Image.open(image_path) as image:
+        for index, duration, indices in _convert_gif_frames(
+                image, range(getattr(image, 'n_frames', 1)), engine.width, index_lut, edges, timer):
+            with timer.stage("store"):
+                frames.append(indices)
+    for index in range(len(frames)):
+        with timer.stage("join"):
+            text = frames[index]
+        with timer.stage("render"):
+            renderer.render(text)
+    return timer, frames
+
+
+def _run_measured(connection, function, args):
+    import resource
+    start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    function(*args)
+    connection.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start)
+
+
+def _peak_memory(function, *args):
+    """Peak resident memory (bytes) that function(*args) adds, or None where it cannot be measured
+    
+    The call runs in a forked child, whose high-water RSS starts at its size
+    at fork time, so Pillow's and NumPy's C buffers are counted too.
+    """
+    import ctypes
+    import multiprocessing
+    try:
+        import resource  # Unix only
+        context = multiprocessing.get_context('fork')
+    except (ImportError, ValueError):
+        return None
+    try:
+        # Hand freed heap pages back (glibc) so the child cannot reuse them without raising its peak
+        ctypes.CDLL(None).malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    
+    receiver, sender = context.Pipe(duplex=False)
+    child = context.Process(target=_run_measured, args=(sender, function, args))
+    child.start()
+    sender.close()
+    try:
+        growth = receiver.recv()
+    except EOFError:
+        growth = None  # The child failed
+    child.join()
+    if growth is None:
+        return None
+    # ru_maxrss is in kilobytes, except on macOS
+    return growth * (1 if sys.platform == 'darwin' else 1024)
+
+
+def run_benchmark_suite(width=200, still_sizes=((640, 480), (1920, 1080), (3840, 2160)),
+                        gif_cases=(((480, 270), 24), ((960, 540), 48)), repeats=3, procedural_frames=120):
+    """Headless benchmark of the still, GIF and procedural paths
+    
+    Still images go through ASCIIEngine.convert_file_to_ascii at final and
+    preview quality and with the edge pass; GIFs through _convert_gif_frames.
+    Each case reports the best-of-repeats time per stage and frame, end-to-end
+    frames/s through ASCIIEngine, and peak resident memory added by one
+    conversion (see _peak_memory). Stage times include playing the frames in
+    a TerminalRenderer ("join" and "render"), which frames/s leaves out in
+    every case. Returns a JSON-ready dict.
+    """
+    import tempfile
+    import PIL
+    
+    engine = ASCIIEngine(width)
+    variants = (("", ASCIIEngine(width)), (" preview", ASCIIEngine(width, quality="preview")),
+                (" edges", ASCIIEngine(width, edge_threshold=0.35)))
+    cases = []
+    
+    def best_stages(run, frames):
+        """Best-of-repeats milliseconds per frame of each stage"""
+        best = {}
+        for _ in range(repeats):
+            for name, ms in run().milliseconds().items():
+                best[name] = min(best.get(name, ms), ms)
+        return {name: ms / frames for name, ms in best.items()}
+    
+    def best_time(function, *args):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function(*args)
+            times.append(time.perf_counter() - start)
+        return min(times)
+    
+    def megabytes(size):
+        return None if size is None else size / 1e6
+    
+    with tempfile.TemporaryDirectory() as temp_dir, open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for size in still_sizes:
+            image_path = os.path.join(temp_dir, f"still_{size[0]}x{size[1]}.png")
+            make_synthetic_image(size).save(image_path)
+            
+            for suffix, variant in variants:
+                def run_stages():
+                    timer, text = _benchmark_still_stages(variant, image_path, TerminalRenderer(devnull))
+                    return timer
+                
+                elapsed = best_time(variant.convert_file_to_ascii, image_path)
+                cases.append({
+                    "name": f"still {size[0]}x{size[1]}{suffix}",
+                    "kind": "still",
+                    "size": list(size),
+                    "frames": 1,
+                    "stages_ms_per_frame": best_stages(run_stages, 1),
+                    "total_ms": elapsed * 1000.0,
+                    "frames_per_s": 1.0 / elapsed,
+                    "peak_memory_mb": megabytes(_peak_memory(variant.convert_file_to_ascii, image_path)),
+                })
+        
+        for size, frame_count in gif_cases:
+            image_path = os.path.join(temp_dir, f"anim_{size[0]}x{size[1]}_{frame_count}.gif")
+            make_synthetic_gif(image_path, size, frame_count)
+            
+            def run_stages():
+                timer, frames = _benchmark_gif_stages(engine, image_path, TerminalRenderer(devnull))
+                return timer
+            
+            elapsed = best_time(engine.convert_animated_to_ascii, image_path, 1)
+            cases.append({
+                "name": f"gif {size[0]}x{size[1]} x{frame_count}",
+                "kind": "gif",
+                "size": list(size),
+                "frames": frame_count,
+                "stages_ms_per_frame": best_stages(run_stages, frame_count),
+                "total_ms": elapsed * 1000.0,
+                "frames_per_s": frame_count / elapsed,
+                "peak_memory_mb": megabytes(_peak_memory(engine.convert_animated_to_ascii, image_path, 1)),
+            })
+        
+        base_ascii = engine.convert_frame_to_ascii(make_synthetic_image((1920, 1080)))
+        for effect in PROCEDURAL_EFFECTS:
+            # A fresh engine per effect, so each case starts from an empty effect cache
+            effect_engine = ASCIIEngine(width)
+            
+            def run_stages():
+                timer = StageTimer()
+                renderer = TerminalRenderer(devnull)
+                for frame in range(procedural_frames):
+                    with timer.stage("effect"):
+                        text = effect_engine.generate_procedural_frame(base_ascii, effect, 0.5, frame)
+                    with timer.stage("render"):
+                        renderer.render(text)
+                return timer
+            
+            def run_effect():
+                for frame in range(procedural_frames):
+                    effect_engine.generate_procedural_frame(base_ascii, effect, 0.5, frame)
+            
+            elapsed = best_time(run_effect)
+            cases.append({
+                "name": f"procedural {effect}",
+                "kind": "procedural",
+                "size": [width, base_ascii.count('\n') + 1],
+                "frames": procedural_frames,
+                "stages_ms_per_frame": best_stages(run_stages, procedural_frames),
+                "total_ms": elapsed * 1000.0,
+                "frames_per_s": procedural_frames / elapsed,
+                "peak_memory_mb": megabytes(_peak_memory(run_effect)),
+            })
+    
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "width": width,
+        "repeats": repeats,
+        "cases": cases,
+    }
+
+
+def print_benchmark_suite(results):
+    """Table of a run_benchmark_suite result"""
+    print(f"Benchmark suite: width {results['width']}, best of {results['repeats']}, {results['machine']}")
+    for case in results['cases']:
+        stages = "  ".join(f"{name} {ms:.2f}" for name, ms in case['stages_ms_per_frame'].items())
+        memory = "    n/a" if case['peak_memory_mb'] is None else f"{case['peak_memory_mb']:7.1f}"
+        print(f"  {case['name']:24} {case['frames_per_s']:9.1f} frames/s  {memory} MB peak  "
+              f"[ms/frame: {stages}]")
+
+
+def compare_benchmark_suites(results, baseline, tolerance=0.20):
+    """Print frames/s and peak memory changes against a baseline run; returns the regression count"""
+    previous = {case['name']: case for case in baseline['cases']}
+    regressions = 0
+    print(f"Compared with the run from {baseline['created']} (tolerance {tolerance:.0%}):")
+    for case in results['cases']:
+        old = previous.get(case['name'])
+        if old is None:
+            print(f"  {case['name']:24} new case")
+            continue
+        speed = case['frames_per_s'] / old['frames_per_s'] - 1
+        memory = (case['peak_memory_mb'] / old['peak_memory_mb'] - 1
+                  if old['peak_memory_mb'] and case['peak_memory_mb'] is not None else 0.0)
+        slower = speed < -tolerance or memory > tolerance
+        regressions += slower
+        print(f"  {case['name']:24} speed {speed:+7.1%}  memory {memory:+7.1%}  {'REGRESSION' if slower else 'ok'}")
+    return regressions
+
+
+class ColorTagPool:
+    """Text widget color tags, created on first use and shared by every frame
+    
+    There is one tag per distinct color, so with a fixed palette the number
+    of tags stays bounded no matter how many characters or frames are shown.
+    """
+    
+    def __init__(self, text_widget):
+        self.text_widget = text_widget
+        self._tags = {}
+    
+    def tag(self, hex_color):
+        """Tag name for a foreground color"""
+        name = self._tags.get(hex_color)
+        if name is None:
+            name = f"color{hex_color[1:]}"
+            self.text_widget.tag_configure(name, foreground=hex_color)
+            self._tags[hex_color] = name
+        return name
+
+
+class IncrementalTextRenderer:
+    """Updates a Text widget by rewriting only the lines that changed
+    
+    The lines on screen are remembered and each new frame is diffed against
+    them; runs of changed lines are replaced in place. A full redraw is used
+    when the line count changes, when more than `full_redraw_ratio` of the
+    lines changed, or when the widget was edited by someone else.
+    """
+    
+    def __init__(self, text_widget, full_redraw_ratio=0.5):
+        self.text_widget = text_widget
+        self.full_redraw_ratio = full_redraw_ratio
+        self.lines = None
+        self.last_chars_updated = 0
+        self.last_full_redraw = False
+    
+    def invalidate(self):
+        """Forget what is on screen; the next render redraws everything"""
+        self.lines = None
+    
+    def render(self, text):
+        """Show text, returning the number of characters written"""
+        lines = text.split('\n')
+        if (self.lines is None or len(lines) != len(self.lines)
+                or self.text_widget.edit_modified()):
+            return self._redraw(text, lines)
+        
+        changed = [i for i, (old, new) in enumerate(zip(self.lines, lines)) if old != new]
+        if len(changed) > self.full_redraw_ratio * len(lines):
+            return self._redraw(text, lines)
+        
+        # Group changed lines into contiguous runs and replace each run in one go
+        widget = self.text_widget
+        chars = 0
+        run_start = 0
+        for position, line_index in enumerate(changed):
+            if position + 1 < len(changed) and changed[position + 1] == line_index + 1:
+                continue
+            start, stop = changed[run_start], line_index + 1
+            widget.delete(f"{start + 1}.0", f"{stop}.end")
+            widget.insert(f"{start + 1}.0", '\n'.join(lines[start:stop]))
+            chars += sum(len(line) for line in lines[start:stop])
+            run_start = position + 1
+        
+        widget.edit_modified(False)
+        self.lines = lines
+        self.last_chars_updated = chars
+        self.last_full_redraw = False
+        return chars
+    
+    def render_color(self, color_art, tag_pool, text=None):
+        """Show colored art (or text of the same shape) with one tagged insert call"""
+        text = color_art.text if text is None else text
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.insert(1.0, *color_art.tk_insert_args(tag_pool, text))
+        self.text_widget.edit_modified(False)
+        self.lines = text.split('\n')
+        self.last_chars_updated = len(text)
+        self.last_full_redraw = True
+        return self.last_chars_updated
+    
+    def _redraw(self, text, lines):
+        self.text_widget.delete(1.0, tk.END)
+        self.text_widget.insert(1.0, text)
+        self.text_widget.edit_modified(False)
+        self.lines = lines
+        self.last_chars_updated = len(text)
+        self.last_full_redraw = True
+        return self.last_chars_updated
+
+
+class FrameScheduler:
+    """Drives animation playback from the Tk event loop on absolute deadlines
+    
+    Every frame is due at the previous deadline plus the previous frame's
+    duration, so render time does not accumulate as drift. If playback falls
+    behind, overdue frames are skipped (counted as dropped) instead of being
+    queued, and only one callback is ever pending.
+    
+    advance() moves to the next frame, duration() returns the current frame's
+    display time in seconds and render() draws the current frame.
+    """
+    
+    def __init__(self, root, advance, duration, render, min_duration=0.02,
+                 late_tolerance=0.005, resync_after=1.0):
+        self.root = root
+        self.advance = advance
+        self.duration = duration
+        self.render = render
+        self.min_duration = min_duration
+        self.late_tolerance = late_tolerance
+        self.resync_after = resync_after
+        
+        self.running = False
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self._deadline = 0.0
+        self._after_id = None
+        self._frame_times = deque(maxlen=60)
+    
+    @property
+    def fps(self):
+        """Frames actually shown per second, over the last 60 frames"""
+        if len(self._frame_times) < 2:
+            return 0.0
+        elapsed = self._frame_times[-1] - self._frame_times[0]
+        return (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+    
+    def start(self):
+        """Start playback; the current frame stays up for its own duration"""
+        if self.running:
+            return
+        self.running = True
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self._frame_times.clear()
+        self._deadline = time.perf_counter() + self._current_duration()
+        self._schedule()
+    
+    def stop(self):
+        """Stop playback and cancel the pending callback"""
+        self.running = False
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def _current_duration(self):
+        return max(self.min_duration, self.duration())
+    
+    def _schedule(self):
+        delay = max(0, round((self._deadline - time.perf_counter()) * 1000))
+        self._after_id = self.root.after(delay, self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        if not self.running:
+            return
+        
+        now = time.perf_counter()
+        if now - self._deadline > self.late_tolerance:
+            self.late_frames += 1
+        if now - self._deadline > self.resync_after:
+            # After a long stall (e.g. a modal dialog), restart the clock
+            # instead of racing through everything that was missed
+            self._deadline = now
+        
+        # Move to the frame whose slot contains now, skipping overdue ones
+        self.advance()
+        duration = self._current_duration()
+        while self._deadline + duration <= now:
+            self._deadline += duration
+            self.dropped_frames += 1
+            self.advance()
+            duration = self._current_duration()
+        self._deadline += duration
+        
+        self.render()
+        self._frame_times.append(now)
+        self._schedule()
+
 
 class ASCIIArtConverter:
     def __init__(self, root):
@@ -30,15 +2898,9 @@ class ASCIIArtConverter:
         self.root.configure(bg=self.colors['bg'])
         
         # ASCII characters from darkest to lightest
-        self.ascii_chars = "@%#*+=-:. "
-        self.alt_ascii_chars = [
-            "█▓▒░·",           # Block style
-            "●◐◑◒◓○",         # Circle style  
-            "♠♣♥♦·",          # Card suits
-            "▀▄█░·",          # Half blocks
-            "≡≣≢≡·",          # Line style
-            "※○◦°·"           # Star style
-        ]
+        self.ascii_chars = DEFAULT_ASCII_CHARS
+        self.alt_ascii_chars = list(ALT_ASCII_CHARS)
+        self.engine = ASCIIEngine(ascii_chars=self.ascii_chars, alt_ascii_chars=self.alt_ascii_chars)
         
         # Variables
         self.image_path = None
@@ -51,19 +2913,79 @@ class ASCIIArtConverter:
         self.is_animated = False
         self.ascii_frames = []
         self.current_frame = 0
-        self.animation_running = False
         self.animation_speed = tk.DoubleVar(value=100)
-        self.animation_thread = None
+        self.use_gif_timing = tk.BooleanVar(value=True)
         self.frame_durations = []
         
+        # Background conversion variables
+        self.conversion_thread = None
+        self.conversion_cancelled = False
+        self.conversion_jobs = os.cpu_count() or 1
+        
+        # Streaming (lazy) GIF playback settings
+        self.stream_frames = tk.BooleanVar(value=False)
+        self.stream_lookahead = 16
+        self.stream_cache_size = 64
+        
+        # Conversion cache (memory, plus an optional disk tier)
+        self.use_disk_cache = tk.BooleanVar(value=False)
+        self.cache_dir = os.path.join(os.path.expanduser("~"), ".ascii_art_cache")
+        self.conversion_cache = ConversionCache()
+        self.source_fingerprint = None
+        self.preview_source = None
+        
+        # Background frame export
+        self.export_thread = None
+        
+        # Live video streaming
+        self.video_stream = None
+        self.video_poll_id = None
+        self.video_stats_at = 0.0
+        
+        # Color output
+        self.color_mode = tk.BooleanVar(value=False)
+        self.color_levels = 4
+        self.color_art = None
+        self.showing_color = False
+        
+        # Character mapping: glyph-density ordered ramps and the Sobel edge pass
+        self.use_density_ramps = tk.BooleanVar(value=False)
+        self.use_edges = tk.BooleanVar(value=False)
+        self.edge_threshold = 0.35
+        
+        # Per-stage profiling
+        self.profiler = StageTimer()
+        self.show_profile = tk.BooleanVar(value=False)
+        self.profile_overlay_id = None
+        threading.Thread(
+            target=glyph_densities,
+            args=("".join([self.ascii_chars] + self.alt_ascii_chars), self.cache_dir),
+            daemon=True
+        ).start()
+        
         # Procedural animation variables
         self.base_ascii = ""  # Original static ASCII
         self.animation_type = tk.StringVar(value="wave")
         self.animation_intensity = tk.DoubleVar(value=50)
         self.procedural_frame = 0
+        self.procedural_text = ""  # Procedural frame currently on screen
+        
+        # Pre-rendered procedural loops
+        self.prerender_loop = tk.BooleanVar(value=False)
+        self.procedural_seed = tk.StringVar(value="0")
+        self.loop_frame_count = 120
+        self.procedural_loop = None
         
         self.setup_styles()
         self.setup_ui()
+        
+        # Playback runs on the Tk event loop
+        self.scheduler = FrameScheduler(
+            self.root,
+            advance=self._advance_frame,
+            duration=self._current_frame_duration,
+            render=self._render_playback_frame
+        )
     
     def setup_styles(self):
         """Configure custom styles for ttk widgets"""
@@ -161,6 +3083,15 @@ class ASCIIArtConverter:
         )
         load_btn.pack(side=tk.LEFT, padx=(0, 15))
         
+        # Webcam button
+        webcam_btn = ttk.Button(
+            control_row1, 
+            text="📹 Webcam", 
+            command=self.start_webcam,
+            style='Accent.TButton'
+        )
+        webcam_btn.pack(side=tk.LEFT, padx=(0, 15))
+        
         # Width control
         width_frame = tk.Frame(control_row1, bg=self.colors['frame_bg'])
         width_frame.pack(side=tk.LEFT, padx=(0, 15))
@@ -169,6 +3100,8 @@ class ASCIIArtConverter:
         self.width_var = tk.StringVar(value="80")
         width_entry = ttk.Entry(width_frame, textvariable=self.width_var, width=8, style='Custom.TEntry')
         width_entry.pack(side=tk.LEFT)
+        self.preview_after_id = None
+        self.width_var.trace_add('write', self.schedule_preview)
         
         # Convert button
         convert_btn = ttk.Button(
@@ -179,6 +3112,34 @@ class ASCIIArtConverter:
         )
         convert_btn.pack(side=tk.LEFT, padx=(0, 15))
         
+        # Cancel button for background GIF conversion
+        self.cancel_btn = ttk.Button(
+            control_row1, 
+            text="⛔ Cancel", 
+            command=self.cancel_conversion,
+            style='Danger.TButton',
+            state=tk.DISABLED
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 15))
+        
+        # Glyph density ramp option
+        density_cb = ttk.Checkbutton(
+            control_row1,
+            text="🔤 Density-ordered ramps",
+            variable=self.use_density_ramps,
+            style='Custom.TCheckbutton'
+        )
+        density_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # Edge characters option
+        edges_cb = ttk.Checkbutton(
+            control_row1,
+            text="📐 Edge characters",
+            variable=self.use_edges,
+            style='Custom.TCheckbutton'
+        )
+        edges_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
         # Second row of controls
         control_row2 = tk.Frame(self.control_frame, bg=self.colors['frame_bg'])
         control_row2.pack(fill=tk.X, pady=(0, 10))
@@ -201,6 +3162,43 @@ class ASCIIArtConverter:
         )
         procedural_cb.pack(side=tk.LEFT, padx=(0, 20))
         
+        # Streaming GIF option
+        stream_cb = ttk.Checkbutton(
+            control_row2,
+            text="🌊 Stream GIF frames",
+            variable=self.stream_frames,
+            style='Custom.TCheckbutton'
+        )
+        stream_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # Disk cache option
+        disk_cache_cb = ttk.Checkbutton(
+            control_row2,
+            text="💽 Cache on disk",
+            variable=self.use_disk_cache,
+            style='Custom.TCheckbutton'
+        )
+        disk_cache_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # Color output option
+        color_cb = ttk.Checkbutton(
+            control_row2,
+            text="🌈 Color",
+            variable=self.color_mode,
+            style='Custom.TCheckbutton'
+        )
+        color_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # Stage timing overlay option
+        profile_cb = ttk.Checkbutton(
+            control_row2,
+            text="⏱️ Stage timings",
+            variable=self.show_profile,
+            command=self.toggle_profile_overlay,
+            style='Custom.TCheckbutton'
+        )
+        profile_cb.pack(side=tk.LEFT, padx=(0, 20))
+        
         # Save button
         save_btn = ttk.Button(
             control_row2, 
@@ -217,7 +3215,16 @@ class ASCIIArtConverter:
             command=self.copy_to_clipboard,
             style='Accent.TButton'
         )
-        copy_btn.pack(side=tk.LEFT)
+        copy_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # cProfile button
+        profile_btn = ttk.Button(
+            control_row2, 
+            text="🧪 Profile Conversion", 
+            command=self.profile_conversion,
+            style='Accent.TButton'
+        )
+        profile_btn.pack(side=tk.LEFT)
         
         # Animation controls (initially hidden)
         self.animation_frame = ttk.LabelFrame(
@@ -291,6 +3298,14 @@ class ASCIIArtConverter:
         self.speed_label.pack(side=tk.LEFT)
         speed_scale.configure(command=self.update_speed_label)
         
+        gif_timing_cb = ttk.Checkbutton(
+            speed_frame,
+            text="⏱️ Use GIF timing",
+            variable=self.use_gif_timing,
+            style='Custom.TCheckbutton'
+        )
+        gif_timing_cb.pack(side=tk.LEFT, padx=(10, 0))
+        
         # Procedural animation controls
         procedural_frame = tk.Frame(self.animation_frame, bg=self.colors['frame_bg'])
         procedural_frame.pack(fill=tk.X, pady=(10, 0))
@@ -300,7 +3315,7 @@ class ASCIIArtConverter:
         effect_combo = ttk.Combobox(
             procedural_frame, 
             textvariable=self.animation_type,
-            values=["wave", "flicker", "cycle", "glitch", "rain", "morph"],
+            values=list(PROCEDURAL_EFFECTS),
             state="readonly",
             width=10
         )
@@ -321,6 +3336,19 @@ class ASCIIArtConverter:
         self.intensity_label.pack(side=tk.LEFT)
         intensity_scale.configure(command=self.update_intensity_label)
         
+        # Pre-rendered loop option and its seed
+        loop_cb = ttk.Checkbutton(
+            procedural_frame,
+            text="🔁 Pre-render loop",
+            variable=self.prerender_loop,
+            style='Custom.TCheckbutton'
+        )
+        loop_cb.pack(side=tk.LEFT, padx=(20, 10))
+        
+        ttk.Label(procedural_frame, text="🎲 Seed:", style='Custom.TLabel').pack(side=tk.LEFT, padx=(0, 5))
+        seed_entry = ttk.Entry(procedural_frame, textvariable=self.procedural_seed, width=8, style='Custom.TEntry')
+        seed_entry.pack(side=tk.LEFT)
+        
         # Frame counter
         self.frame_info = ttk.Label(
             self.animation_frame,
@@ -385,6 +3413,19 @@ class ASCIIArtConverter:
             bd=2
         )
         self.ascii_text.pack(fill=tk.BOTH, expand=True)
+        self.text_renderer = IncrementalTextRenderer(self.ascii_text)
+        self.color_tags = ColorTagPool(self.ascii_text)
+        
+        # Stage timing overlay, placed over the output's top-right corner when enabled
+        self.profile_overlay = tk.Label(
+            text_frame,
+            font=('Consolas', 9),
+            bg='#000000',
+            fg=self.colors['warning'],
+            justify=tk.LEFT,
+            padx=8,
+            pady=4
+        )
         
         # Status bar
         self.status_bar = tk.Label(
@@ -415,9 +3456,12 @@ class ASCIIArtConverter:
     def load_image(self):
         """Load an image or GIF file"""
         file_types = [
-            ("All supported", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff"),
+            ("All supported", "*.jpg *.jpeg *.png *.bmp *.gif *.tiff *.asca "
+                              + " ".join(f"*{ext}" for ext in VIDEO_EXTENSIONS)),
             ("Image files", "*.jpg *.jpeg *.png *.bmp *.tiff"),
             ("GIF files", "*.gif"),
+            ("ASCII animations", "*.asca"),
+            ("Video files", " ".join(f"*{ext}" for ext in VIDEO_EXTENSIONS)),
             ("All files", "*.*")
         ]
         
@@ -427,8 +3471,19 @@ class ASCIIArtConverter:
         )
         
         if self.image_path:
+            self.stop_video_stream()
+        
+        if self.image_path and self.image_path.lower().endswith(VIDEO_EXTENSIONS):
+            self.start_video_stream(self.image_path)
+        elif self.image_path and self.image_path.lower().endswith('.asca'):
+            self.load_animation_file(self.image_path)
+        elif self.image_path:
             try:
-                self.original_image = Image.open(self.image_path)
+                self.release_frame_source()
+                self.original_image = open_large_image(self.image_path)
+                self.source_fingerprint = None
+                self.preview_source = None
+                self.color_art = None
                 
                 # Check if it's an animated GIF
                 self.is_animated = getattr(self.original_image, "is_animated", False)
@@ -450,9 +3505,117 @@ class ASCIIArtConverter:
                 self.update_status(f"❌ Failed to load image: {str(e)}", self.colors['warning'])
                 messagebox.showerror("Error", f"Failed to load image: {str(e)}")
     
+    def load_animation_file(self, file_path):
+        """Open a saved .asca animation for playback without re-converting anything"""
+        try:
+            animation = MappedAnimation(file_path)
+        except Exception as e:
+            self.update_status(f"❌ Failed to open animation: {str(e)}", self.colors['warning'])
+            messagebox.showerror("Error", f"Failed to open animation: {str(e)}")
+            return
+        
+        self.scheduler.stop()
+        self.release_frame_source()
+        self.original_image = None
+        self.source_fingerprint = None
+        self.preview_source = None
+        self.color_art = None
+        self.ascii_art = ""
+        self.base_ascii = ""
+        
+        self.is_animated = True
+        self.ascii_frames = animation
+        self.frame_durations = animation.durations
+        self.current_frame = 0
+        
+        height, width = animation.shape
+        self.image_label.configure(image='', text=f"🎞️\nASCII animation\n{len(animation)} frames, {width}x{height} characters")
+        self.image_label.image = None
+        self.animation_frame.pack(fill=tk.X, pady=(0, 15), after=self.control_frame)
+        
+        self.display_current_frame()
+        self.update_frame_info()
+        self.update_status(f"🎞️ ASCII animation opened: {len(animation)} frames", self.colors['success'])
+    
+    def start_webcam(self):
+        """Stream the default camera"""
+        self.stop_video_stream()
+        self.start_video_stream('webcam')
+    
+    def start_video_stream(self, spec):
+        """Play a video file or camera as live ASCII art"""
+        try:
+            engine = self.current_engine(quality="preview")
+            source = open_video_source(spec)
+        except Exception as e:
+            self.update_status(f"❌ Failed to open video: {str(e)}", self.colors['warning'])
+            messagebox.showerror("Error", f"Failed to open video: {str(e)}")
+            return
+        
+        self.scheduler.stop()
+        self.release_frame_source()
+        self.original_image = None
+        self.source_fingerprint = None
+        self.preview_source = None
+        self.color_art = None
+        self.is_animated = False
+        self.ascii_frames = []
+        self.animation_frame.pack(fill=tk.X, pady=(0, 15), after=self.control_frame)  # For the stop button
+        
+        name = "Webcam" if spec.startswith('webcam') else os.path.basename(spec)
+        self.image_label.configure(image='', text=f"📹\n{name}\n{source.size[0]}x{source.size[1]} @ {source.fps:.0f} fps")
+        self.image_label.image = None
+        
+        workers = max(1, min(4, self.conversion_jobs - 1))
+        self.video_stream = VideoStream(source, engine, workers=workers)
+        self.video_stream.start()
+        self.update_status(f"📹 Streaming {name}...", self.colors['success'])
+        self._poll_video_stream()
+    
+    def _poll_video_stream(self):
+        """Render the newest converted video frame and refresh the stream statistics"""
+        stream = self.video_stream
+        if stream is None:
+            return
+        
+        text = stream.poll()
+        if text is not None:
+            self.show_text(text)
+        
+        now = time.perf_counter()
+        if now - self.video_stats_at >= 0.5:
+            self.video_stats_at = now
+            self.frame_info.config(text=stream.format_stats())
+        
+        if stream.error is not None:
+            self.stop_video_stream()
+            self.update_status(f"❌ Stream failed: {str(stream.error)}", self.colors['warning'])
+        elif stream.finished:
+            self.stop_video_stream()
+            self.frame_info.config(text=stream.format_stats())
+            self.update_status(f"⏹️ Stream ended: {stream.frames_displayed} frames shown", self.colors['accent'])
+        else:
+            # Poll twice per frame interval so a fresh frame waits at most half an interval
+            delay = max(1, int(stream.frame_interval * 500))
+            self.video_poll_id = self.root.after(delay, self._poll_video_stream)
+    
+    def stop_video_stream(self):
+        """Stop the live video stream, if one is running"""
+        if self.video_poll_id is not None:
+            self.root.after_cancel(self.video_poll_id)
+            self.video_poll_id = None
+        if self.video_stream is not None:
+            self.video_stream.stop()
+            self.video_stream = None
+    
     def display_image_preview(self):
         """Display a preview of the loaded image"""
-        if self.original_image:
+        if self.original_image and is_large_image(self.original_image):
+            # Never decode a huge image just for a thumbnail
+            width, height = self.original_image.size
+            self.image_label.configure(image='', text=f"🗺️\nLarge image\n{width}x{height} pixels\nconverted in strips")
+            self.image_label.image = None
+        elif self.original_image:
             # Create a thumbnail for preview
             preview_image = self.original_image.copy()
             
@@ -469,53 +3632,66 @@ class ASCIIArtConverter:
             self.image_label.configure(image=photo, text="")
             self.image_label.image = photo  # Keep a reference
     
+    def current_engine(self, quality="final"):
+        """Conversion engine configured from the current width and character settings"""
+        ascii_chars, alt_ascii_chars = self.ascii_chars, self.alt_ascii_chars
+        if self.use_density_ramps.get():
+            ascii_chars = density_ramp(ascii_chars, self.cache_dir)
+            alt_ascii_chars = [density_ramp(chars, self.cache_dir) for chars in alt_ascii_chars]
+        engine = ASCIIEngine(
+            int(self.width_var.get()),
+            self.black_as_space.get(),
+            ascii_chars,
+            alt_ascii_chars,
+            quality=quality,
+            edge_threshold=self.edge_threshold if self.use_edges.get() else None
+        )
+        if self.show_profile.get():
+            engine.profiler = self.profiler
+        return engine
+    
+    def schedule_preview(self, *args):
+        """Debounce width edits into a fast preview render"""
+        if self.preview_after_id is not None:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(150, self.render_preview)
+    
+    def render_preview(self):
+        """Re-render the loaded still image at preview quality for the current width"""
+        self.preview_after_id = None
+        if (not self.original_image or self.is_animated or self.scheduler.running
+                or is_large_image(self.original_image)):
+            return
+        try:
+            engine = self.current_engine(quality="preview")
+        except ValueError:
+            return  # Width is still being typed
+        width, height = engine.output_size(self.original_image)
+        if height < 1:
+            return  # Too narrow to give a single row, e.g. "1" on the way to "120"
+        
+        start = time.perf_counter()
+        try:
+            if self.preview_source is None:
+                self.preview_source = open_preview_source(self.image_path)
+            text = engine.convert_frame_to_ascii(self.preview_source)
+        except (OSError, ValueError) as e:
+            # Runs from an after() callback: report it rather than raise into Tk
+            self.update_status(f"⚠️ Preview failed: {str(e)}", self.colors['warning'])
+            return
+        with self.profile_stage("render"):
+            self.text_renderer.render(text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        self.update_status(f"👀 Preview {width}x{height} in {elapsed_ms:.0f} ms - click Convert for full quality", self.colors['accent'])
+    
     def pixel_to_ascii(self, pixel_value):
         """Convert a pixel brightness value to ASCII character"""
-        if self.black_as_space.get():
-            # If black as space is enabled, very dark pixels become spaces
-            if pixel_value < 25:  # Very dark pixels (threshold can be adjusted)
-                return " "
-            # Use remaining characters for other brightness levels
-            chars = self.ascii_chars[1:]  # Skip the @ character
-            index = int((pixel_value - 25) * (len(chars) - 1) / (255 - 25))
-            index = max(0, min(index, len(chars) - 1))
-            return chars[index]
-        else:
-            # Standard conversion
-            index = int(pixel_value * (len(self.ascii_chars) - 1) / 255)
-            return self.ascii_chars[index]
+        return map_pixel_to_ascii(pixel_value, self.ascii_chars, self.black_as_space.get())
     
     def convert_frame_to_ascii(self, frame):
         """Convert a single frame to ASCII art"""
-        try:
-            # Get desired width
-            width = int(self.width_var.get())
-            if width <= 0:
-                raise ValueError("Width must be positive")
-            
-            # Calculate height maintaining aspect ratio
-            aspect_ratio = frame.height / frame.width
-            height = int(width * aspect_ratio * 0.5)  # 0.5 to account for character height/width ratio
-            
-            # Resize image
-            resized_image = frame.resize((width, height), Image.Resampling.LANCZOS)
-            
-            # Convert to grayscale
-            gray_image = resized_image.convert('L')
-            
-            # Convert to ASCII
-            ascii_lines = []
-            for y in range(height):
-                line = ""
-                for x in range(width):
-                    pixel_value = gray_image.getpixel((x, y))
-                    line += self.pixel_to_ascii(pixel_value)
-                ascii_lines.append(line)
-            
-            return "\n".join(ascii_lines)
-            
-        except Exception as e:
-            raise e
+        return self.current_engine().convert_frame_to_ascii(frame)
     
     def convert_to_ascii(self):
         """Convert the loaded image to ASCII art"""
@@ -548,170 +3724,334 @@ class ASCIIArtConverter:
             self.update_status(error_msg, self.colors['warning'])
             messagebox.showerror("Error", f"Conversion failed: {str(e)}")
     
+    def conversion_cache_key(self, engine, color_levels=None):
+        """Cache key for converting the loaded image with an engine's settings (and palette, for color)"""
+        self.conversion_cache.cache_dir = self.cache_dir if self.use_disk_cache.get() else None
+        if self.source_fingerprint is None:
+            self.source_fingerprint = fingerprint_image(self.original_image, self.image_path)
+        return ConversionCache.make_key(
+            self.source_fingerprint,
+            width=engine.width,
+            ascii_chars=engine.ascii_chars,
+            black_as_space=engine.black_as_space,
+            edge_threshold=engine.edge_threshold,
+            quality=engine.quality,
+            color_levels=color_levels
+        )
+    
     def convert_static_to_ascii(self):
         """Convert a static image to ASCII art"""
-        self.ascii_art = self.convert_frame_to_ascii(self.original_image)
+        engine = self.current_engine()
+        
+        if is_large_image(self.original_image):
+            self.color_art = None
+            cache_key = self.conversion_cache_key(engine)
+            self.ascii_art = self.conversion_cache.get(cache_key)
+            if self.ascii_art is None:
+                self.ascii_art = engine.convert_file_tiled(self.image_path)
+                self.conversion_cache.put(cache_key, self.ascii_art)
+        elif self.color_mode.get():
+            cache_key = self.conversion_cache_key(engine, self.color_levels)
+            self.color_art = self.conversion_cache.get(cache_key)
+            if self.color_art is None:
+                self.color_art = engine.convert_frame_to_color(self.original_image, self.color_levels)
+                self.conversion_cache.put(cache_key, self.color_art)
+            self.ascii_art = self.color_art.text
+        else:
+            self.color_art = None
+            cache_key = self.conversion_cache_key(engine)
+            self.ascii_art = self.conversion_cache.get(cache_key)
+            if self.ascii_art is None:
+                self.ascii_art = engine.convert_frame_to_ascii(self.original_image)
+                self.conversion_cache.put(cache_key, self.ascii_art)
         self.base_ascii = self.ascii_art  # Store for procedural animation
         
         # Display ASCII art
-        self.ascii_text.delete(1.0, tk.END)
-        self.ascii_text.insert(1.0, self.ascii_art)
+        self.show_text(self.ascii_art)
         
-        width = int(self.width_var.get())
-        height = int(width * (self.original_image.height / self.original_image.width) * 0.5)
+        width, height = engine.output_size(self.original_image)
         self.update_status(f"✨ ASCII art created! ({width}x{height} characters)", self.colors['success'])
     
     def convert_animated_to_ascii(self):
-        """Convert an animated GIF to ASCII art frames"""
-        self.ascii_frames = []
-        self.frame_durations = []
+        """Convert an animated GIF to ASCII art frames on a background worker pool"""
+        if self.conversion_thread and self.conversion_thread.is_alive():
+            self.update_status("⚠️ A conversion is already running", self.colors['warning'])
+            return
+        
+        engine = self.current_engine()
+        width = engine.width
+        
+        if self.stream_frames.get():
+            self.start_streaming_playback(engine)
+            return
+        
+        cache_key = self.conversion_cache_key(engine)
+        cached = self.conversion_cache.get(cache_key)
+        if cached is not None:
+            frames, durations = cached
+            self._finish_animated_conversion(self.image_path, width, frames, durations, None)
+            return
+        
+        self.conversion_cancelled = False
+        self.cancel_btn.config(state=tk.NORMAL)
+        
+        self.conversion_thread = threading.Thread(
+            target=self._run_animated_conversion,
+            args=(engine, self.image_path, cache_key),
+            daemon=True
+        )
+        self.conversion_thread.start()
+    
+    def start_streaming_playback(self, engine):
+        """Play the GIF straight away, converting frames lazily as they are reached"""
+        self.release_frame_source()
+        frames = engine.open_frame_stream(
+            self.image_path,
+            lookahead=self.stream_lookahead,
+            cache_size=self.stream_cache_size
+        )
+        self.ascii_frames = frames
+        self.frame_durations = frames.durations
+        
+        self.current_frame = 0
+        self.display_current_frame()
+        self.update_frame_info()
         
+        width, height = engine.output_size(self.original_image)
+        self.update_status(f"🌊 Streaming {len(frames)} frames ({width}x{height} characters each)", self.colors['success'])
+    
+    def release_frame_source(self):
+        """Close a lazy or memory-mapped frame source, if one is active"""
+        if isinstance(self.ascii_frames, (LazyGifFrames, MappedAnimation)):
+            self.ascii_frames.close()
+            self.ascii_frames = []
+            self.frame_durations = []
+    
+    def _run_animated_conversion(self, engine, image_path, cache_key):
+        """Conversion thread: run the process pool, cache the result and hand it to the UI thread"""
+        width = engine.width
         try:
-            frame_count = self.original_image.n_frames
-            
-            for i in range(frame_count):
-                self.original_image.seek(i)
-                frame = self.original_image.copy()
-                
-                # Get frame duration (in milliseconds)
-                duration = self.original_image.info.get('duration', 100)
-                self.frame_durations.append(duration)
-                
-                # Convert frame to ASCII
-                ascii_frame = self.convert_frame_to_ascii(frame)
-                self.ascii_frames.append(ascii_frame)
-                
-                # Update progress
-                progress = int((i + 1) / frame_count * 100)
-                self.update_status(f"🔄 Processing frame {i + 1}/{frame_count} ({progress}%)", self.colors['accent'])
-                self.root.update_idletasks()
-            
-            # Reset to first frame
-            self.current_frame = 0
-            self.display_current_frame()
-            self.update_frame_info()
-            
-            width = int(self.width_var.get())
-            height = int(width * (self.original_image.height / self.original_image.width) * 0.5)
-            self.update_status(f"✨ Animated ASCII art created! {frame_count} frames ({width}x{height} characters each)", self.colors['success'])
-            
+            # Worker thread: use the engine's profiler rather than reading Tk variables
+            with engine.profiler.stage("gif") if engine.profiler is not None else nullcontext():
+                frames, durations = engine.convert_animated_to_ascii(
+                    image_path,
+                    jobs=self.conversion_jobs,
+                    progress=self._report_conversion_progress
+                )
+        except ConversionCancelled:
+            self.root.after(0, self._finish_animated_conversion, image_path, width, None, None, None)
         except Exception as e:
-            raise e
+            self.root.after(0, self._finish_animated_conversion, image_path, width, None, None, e)
+        else:
+            # Cached here, off the Tk thread: the disk tier compresses every frame
+            self.conversion_cache.put(cache_key, (frames, durations))
+            self.root.after(0, self._finish_animated_conversion, image_path, width, frames, durations, None)
     
-    def generate_procedural_frame(self):
-        """Generate a procedural animation frame"""
-        if not self.base_ascii:
-            return self.base_ascii
+    def _report_conversion_progress(self, done, total):
+        """Post conversion progress to the UI thread; returning False cancels"""
+        progress = int(done / total * 100)
+        self.root.after(0, self.update_status, f"🔄 Processing frame {done}/{total} ({progress}%)", self.colors['accent'])
+        return not self.conversion_cancelled
+    
+    def cancel_conversion(self):
+        """Ask the running GIF conversion to stop"""
+        if self.conversion_thread and self.conversion_thread.is_alive():
+            self.conversion_cancelled = True
+            self.update_status("⛔ Cancelling conversion...", self.colors['warning'])
+    
+    def _finish_animated_conversion(self, image_path, width, frames, durations, error):
+        """Install converted GIF frames once the background conversion ends"""
+        self.cancel_btn.config(state=tk.DISABLED)
+        
+        if image_path != self.image_path:
+            # A different image was loaded while this one was converting
+            return
+        
+        if error is not None:
+            self.update_status(f"❌ Conversion failed: {str(error)}", self.colors['warning'])
+            messagebox.showerror("Error", f"Conversion failed: {str(error)}")
+            return
+        
+        if frames is None:
+            self.update_status("⛔ Conversion cancelled", self.colors['warning'])
+            return
+        
+        self.release_frame_source()
+        self.ascii_frames = frames
+        self.frame_durations = durations
+        
+        # Reset to first frame
+        self.current_frame = 0
+        self.display_current_frame()
+        self.update_frame_info()
         
-        lines = self.base_ascii.split('\n')
-        animated_lines = []
+        height = int(width * (self.original_image.height / self.original_image.width) * 0.5)
+        self.update_status(f"✨ Animated ASCII art created! {len(frames)} frames ({width}x{height} characters each, {frames.nbytes // 1024} KB)", self.colors['success'])
+    
+    def generate_procedural_frame(self):
+        """Generate a procedural animation frame, from the pre-rendered loop when enabled"""
+        loop = self.active_procedural_loop()
+        with self.profile_stage("effect"):
+            if loop is not None:
+                return loop[self.procedural_frame % len(loop)]
+            return self.engine.generate_procedural_frame(
+                self.base_ascii,
+                self.animation_type.get(),
+                self.animation_intensity.get() / 100.0,
+                self.procedural_frame
+            )
+    
+    def active_procedural_loop(self):
+        """Pre-rendered loop for the current effect settings, rendered in the background on first use"""
+        if not (self.prerender_loop.get() and self.base_ascii):
+            return None
+        try:
+            seed = int(self.procedural_seed.get())
+        except ValueError:
+            seed = 0
         
         effect = self.animation_type.get()
         intensity = self.animation_intensity.get() / 100.0
-        frame = self.procedural_frame
+        loop = self.procedural_loop
+        if loop is not None and loop.key == (self.base_ascii, effect, intensity, seed):
+            return loop
         
-        if effect == "wave":
-            # Wave effect - characters move in waves
-            for y, line in enumerate(lines):
-                new_line = ""
-                for x, char in enumerate(line):
-                    if char != ' ':
-                        wave_offset = math.sin((x + frame) * 0.2) * intensity
-                        if wave_offset > 0.3:
-                            char_set = self.alt_ascii_chars[0]
-                            new_char = char_set[min(len(char_set)-1, int(wave_offset * len(char_set)))]
-                        else:
-                            new_char = char
-                    else:
-                        new_char = char
-                    new_line += new_char
-                animated_lines.append(new_line)
+        if loop is not None:
+            loop.cancel()
+        try:
+            loop = ProceduralLoop(self.base_ascii, effect, intensity, self.loop_frame_count, seed,
+                                  self.engine.ascii_chars, self.engine.alt_ascii_chars)
+        except ValueError as e:
+            self.update_status(f"⚠️ {str(e)}", self.colors['warning'])
+            self.procedural_loop = None
+            return None
         
-        elif effect == "flicker":
-            # Flicker effect - randomly change some characters
-            for line in lines:
-                new_line = ""
-                for char in line:
-                    if char != ' ' and random.random() < intensity * 0.3:
-                        char_set = random.choice(self.alt_ascii_chars)
-                        new_line += random.choice(char_set)
-                    else:
-                        new_line += char
-                animated_lines.append(new_line)
+        self.procedural_loop = loop
+        threading.Thread(target=self._run_loop_render, args=(loop,), daemon=True).start()
+        return loop
+    
+    def _run_loop_render(self, loop):
+        """Loop render thread: fill the loop's frame store and report progress to the UI thread"""
+        def progress(done, total):
+            if done % 20 == 0:
+                self.root.after(0, self.update_status, f"🔁 Pre-rendering loop {done}/{total}...", self.colors['accent'])
         
-        elif effect == "cycle":
-            # Cycle through different character sets
-            char_set_index = (frame // 10) % len(self.alt_ascii_chars)
-            char_set = self.alt_ascii_chars[char_set_index]
-            
-            for line in lines:
-                new_line = ""
-                for char in line:
-                    if char != ' ' and random.random() < intensity:
-                        new_line += random.choice(char_set)
-                    else:
-                        new_line += char
-                animated_lines.append(new_line)
+        loop.render_all(progress)
+        self.root.after(0, self._finish_loop_render, loop)
+    
+    def _finish_loop_render(self, loop):
+        """Report a finished loop, unless the settings changed while it rendered"""
+        if loop is self.procedural_loop and loop.complete:
+            self.update_status(
+                f"🔁 Loop ready: {len(loop)} frames, seed {loop.seed} ({loop.frames.nbytes / 1024:.0f} KB)",
+                self.colors['success']
+            )
+    
+    def profile_stage(self, name):
+        """Context manager timing a stage into the profiler while stage timings are shown"""
+        return self.profiler.stage(name) if self.show_profile.get() else nullcontext()
+    
+    def toggle_profile_overlay(self):
+        """Show or hide the stage timing overlay"""
+        if self.show_profile.get():
+            self.profiler.clear()
+            self.profile_overlay.config(text="Waiting for a conversion...")
+            self.profile_overlay.place(relx=1.0, rely=0.0, x=-24, y=8, anchor='ne')
+            self._refresh_profile_overlay()
+        else:
+            if self.profile_overlay_id is not None:
+                self.root.after_cancel(self.profile_overlay_id)
+                self.profile_overlay_id = None
+            self.profile_overlay.place_forget()
+    
+    def _refresh_profile_overlay(self):
+        """Redraw the overlay from the rolling stats a few times a second"""
+        if self.profiler.summary():
+            self.profile_overlay.config(text=self.profiler.format())
+        self.profile_overlay_id = self.root.after(250, self._refresh_profile_overlay)
+    
+    def profile_conversion(self):
+        """Run one conversion with the current settings under cProfile and save the results"""
+        if not self.original_image:
+            messagebox.showwarning("Warning", "Please load an image first!")
+            return
         
-        elif effect == "glitch":
-            # Glitch effect - random corruption
-            for line in lines:
-                new_line = ""
-                for x, char in enumerate(line):
-                    if char != ' ' and random.random() < intensity * 0.2:
-                        if random.random() < 0.5:
-                            new_line += random.choice("!@#$%^&*")
-                        else:
-                            new_line += random.choice(self.ascii_chars)
-                    else:
-                        new_line += char
-                animated_lines.append(new_line)
+        try:
+            engine = self.current_engine()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid width value: {str(e)}")
+            return
         
-        elif effect == "rain":
-            # Rain effect - add falling characters
-            animated_lines = lines.copy()
-            for _ in range(int(len(lines) * len(lines[0] if lines else "") * intensity * 0.1)):
-                if lines:
-                    x = random.randint(0, len(lines[0]) - 1) if lines[0] else 0
-                    y = (frame + random.randint(0, 20)) % len(lines)
-                    if y < len(animated_lines) and x < len(animated_lines[y]):
-                        line_chars = list(animated_lines[y])
-                        if x < len(line_chars):
-                            line_chars[x] = random.choice(".,':;")
-                            animated_lines[y] = ''.join(line_chars)
+        self.update_status("🧪 Profiling conversion...", self.colors['accent'])
+        self.root.update_idletasks()
         
-        elif effect == "morph":
-            # Morph effect - gradually change character mapping
-            morph_stage = (frame % 100) / 100.0
-            char_set = self.alt_ascii_chars[int(morph_stage * len(self.alt_ascii_chars)) % len(self.alt_ascii_chars)]
-            
-            for line in lines:
-                new_line = ""
-                for char in line:
-                    if char != ' ' and random.random() < intensity * morph_stage:
-                        new_line += random.choice(char_set)
-                    else:
-                        new_line += char
-                animated_lines.append(new_line)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            if self.is_animated:
+                # In-process, so the profile sees the per-frame work
+                frames, _ = engine.convert_animated_to_ascii(self.image_path, jobs=1)
+                text = frames[0]
+            else:
+                text = engine.convert_frame_to_ascii(self.original_image)
+            self.show_text(text)
+            self.root.update_idletasks()
+        finally:
+            profile.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
         
-        return '\n'.join(animated_lines)
+        file_path = filedialog.asksaveasfilename(
+            title="Save profile",
+            defaultextension=".prof",
+            initialfile="conversion.prof",
+            filetypes=[("cProfile data", "*.prof"), ("Text report", "*.txt")]
+        )
+        if not file_path:
+            self.update_status(f"🧪 Conversion took {elapsed_ms:.0f} ms (profile not saved)", self.colors['accent'])
+            return
+        
+        try:
+            write_profile(profile, file_path)
+            self.update_status(f"🧪 Conversion took {elapsed_ms:.0f} ms - profile saved to {os.path.basename(file_path)}", self.colors['success'])
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save profile: {str(e)}")
+    
+    def show_text(self, text):
+        """Show text in the output widget, colored when color art of the same image is active"""
+        with self.profile_stage("render"):
+            self._show_text(text)
+    
+    def _show_text(self, text):
+        """show_text without the timing"""
+        if self.color_art is not None and self.color_mode.get():
+            self.text_renderer.render_color(self.color_art, self.color_tags, text)
+            self.showing_color = True
+        else:
+            if self.showing_color:
+                # Redraw from scratch so no colored runs are left behind
+                self.text_renderer.invalidate()
+                self.showing_color = False
+            self.text_renderer.render(text)
     
     def display_current_frame(self):
         """Display the current ASCII frame"""
         if self.is_animated and self.ascii_frames and 0 <= self.current_frame < len(self.ascii_frames):
-            self.ascii_text.delete(1.0, tk.END)
-            self.ascii_text.insert(1.0, self.ascii_frames[self.current_frame])
+            self.show_text(self.ascii_frames[self.current_frame])
         elif self.enable_procedural_animation.get() and self.base_ascii:
-            animated_frame = self.generate_procedural_frame()
-            self.ascii_text.delete(1.0, tk.END)
-            self.ascii_text.insert(1.0, animated_frame)
+            self.procedural_text = self.generate_procedural_frame()
+            self.show_text(self.procedural_text)
     
     def update_frame_info(self):
         """Update the frame counter display"""
+        updated = f"Updated: {self.text_renderer.last_chars_updated} chars"
+        if self.scheduler.running:
+            updated += (f" | {self.scheduler.fps:.1f} fps | Late: {self.scheduler.late_frames}"
+                        f" | Dropped: {self.scheduler.dropped_frames}")
         if self.is_animated and self.ascii_frames:
-            self.frame_info.config(text=f"Frame: {self.current_frame + 1} / {len(self.ascii_frames)}")
+            self.frame_info.config(text=f"Frame: {self.current_frame + 1} / {len(self.ascii_frames)} | {updated}")
         elif self.enable_procedural_animation.get():
-            self.frame_info.config(text=f"Effect: {self.animation_type.get()} | Frame: {self.procedural_frame}")
+            self.frame_info.config(text=f"Effect: {self.animation_type.get()} | Frame: {self.procedural_frame} | {updated}")
         else:
             self.frame_info.config(text="Frame: 0 / 0")
     
@@ -721,20 +4061,22 @@ class ASCIIArtConverter:
             messagebox.showwarning("Warning", "No animation to play! Please convert an image/GIF first.")
             return
         
-        if not self.animation_running:
-            self.animation_running = True
-            self.animation_thread = threading.Thread(target=self._animation_loop, daemon=True)
-            self.animation_thread.start()
+        if not self.scheduler.running:
+            self.scheduler.start()
             self.update_status("▶️ Animation playing...", self.colors['success'])
     
     def pause_animation(self):
         """Pause the ASCII animation"""
-        self.animation_running = False
+        self.scheduler.stop()
         self.update_status("⏸️ Animation paused", self.colors['warning'])
     
     def stop_animation(self):
         """Stop the ASCII animation and reset to first frame"""
-        self.animation_running = False
+        if self.video_stream is not None:
+            self.stop_video_stream()
+            self.update_status("⏹️ Stream stopped", self.colors['danger'])
+            return
+        self.scheduler.stop()
         if self.is_animated:
             self.current_frame = 0
         else:
@@ -757,23 +4099,26 @@ class ASCIIArtConverter:
             self.display_current_frame()
             self.update_frame_info()
     
-    def _animation_loop(self):
-        """Animation loop running in a separate thread"""
-        while self.animation_running:
-            delay = self.animation_speed.get() / 1000.0  # Convert to seconds
-            time.sleep(delay)
-            
-            if self.animation_running:  # Check again after sleep
-                if self.is_animated and self.ascii_frames:
-                    # GIF animation
-                    self.current_frame = (self.current_frame + 1) % len(self.ascii_frames)
-                elif self.enable_procedural_animation.get() and self.base_ascii:
-                    # Procedural animation
-                    self.procedural_frame += 1
-                
-                # Update UI in main thread
-                self.root.after(0, self.display_current_frame)
-                self.root.after(0, self.update_frame_info)
+    def _advance_frame(self):
+        """Scheduler callback: step to the next frame without drawing it"""
+        if self.is_animated and self.ascii_frames:
+            # GIF animation
+            self.current_frame = (self.current_frame + 1) % len(self.ascii_frames)
+        elif self.enable_procedural_animation.get() and self.base_ascii:
+            # Procedural animation
+            self.procedural_frame += 1
+    
+    def _current_frame_duration(self):
+        """Scheduler callback: display time of the current frame in seconds"""
+        if (self.is_animated and self.use_gif_timing.get()
+                and 0 <= self.current_frame < len(self.frame_durations)):
+            return self.frame_durations[self.current_frame] / 1000.0
+        return self.animation_speed.get() / 1000.0  # Convert to seconds
+    
+    def _render_playback_frame(self):
+        """Scheduler callback: draw the current frame"""
+        self.display_current_frame()
+        self.update_frame_info()
     
     def save_ascii(self):
         """Save ASCII art to a text file"""
@@ -782,11 +4127,11 @@ class ASCIIArtConverter:
             messagebox.showwarning("Warning", "No ASCII art to save!")
             return
         
-        if self.ascii_frames:
+        if self.ascii_frames or (self.enable_procedural_animation.get() and self.active_procedural_loop()):
             # For animated ASCII, ask user what to save
             choice = messagebox.askyesnocancel(
                 "Save Options",
-                "Save all frames as separate files?\n\nYes: Save all frames\nNo: Save current frame only\nCancel: Cancel"
+                "Save all frames?\n\nYes: Save all frames (archive or frame files)\nNo: Save current frame only\nCancel: Cancel"
             )
             
             if choice is None:  # Cancel
@@ -801,16 +4146,27 @@ class ASCIIArtConverter:
     
     def save_single_ascii(self):
         """Save single ASCII art"""
+        file_types = [("Text files", "*.txt"), ("All files", "*.*")]
+        if self.color_art is not None:
+            file_types[1:1] = [("HTML files", "*.html"), ("ANSI color text", "*.ans")]
+        
         file_path = filedialog.asksaveasfilename(
             title="Save ASCII art",
             defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=file_types
         )
         
         if file_path:
             try:
+                extension = os.path.splitext(file_path)[1].lower()
+                if self.color_art is not None and extension in ('.html', '.htm'):
+                    content = self.color_art.to_html()
+                elif self.color_art is not None and extension == '.ans':
+                    content = self.color_art.to_ansi()
+                else:
+                    content = self.ascii_art
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.ascii_art)
+                    f.write(content)
                 filename = os.path.basename(file_path)
                 self.update_status(f"💾 ASCII art saved as: {filename}", self.colors['success'])
                 messagebox.showinfo("Success", f"ASCII art saved to {file_path}")
@@ -824,7 +4180,8 @@ class ASCIIArtConverter:
         if self.ascii_frames and 0 <= self.current_frame < len(self.ascii_frames):
             content = self.ascii_frames[self.current_frame]
         elif self.enable_procedural_animation.get():
-            content = self.generate_procedural_frame()
+            # The frame on screen; regenerating it would give different random output
+            content = self.procedural_text or self.generate_procedural_frame()
         else:
             return
         
@@ -847,27 +4204,71 @@ class ASCIIArtConverter:
                 messagebox.showerror("Error", f"Failed to save file: {str(e)}")
     
     def save_all_frames(self):
-        """Save all frames of animated ASCII"""
-        if not self.ascii_frames:
+        """Save all frames of animated ASCII to an archive or frame files, in the background"""
+        frames, durations = self.ascii_frames, self.frame_durations
+        base_name = os.path.splitext(os.path.basename(self.image_path or "animation"))[0]
+        if not frames and self.enable_procedural_animation.get():
+            frames = self.active_procedural_loop()
+            if frames is not None:
+                durations = [int(self.animation_speed.get())] * len(frames)
+                base_name = f"{base_name}_{frames.effect}_seed{frames.seed}"
+        if not frames:
+            return
+        if self.export_thread and self.export_thread.is_alive():
+            self.update_status("⚠️ An export is already running", self.colors['warning'])
             return
         
-        folder_path = filedialog.askdirectory(title="Select folder to save all frames")
+        file_path = filedialog.asksaveasfilename(
+            title="Save all frames",
+            initialfile=f"{base_name}.zip",
+            defaultextension=".zip",
+            filetypes=[
+                ("ZIP archive", "*.zip"),
+                ("Compressed tar archive", "*.tar.gz"),
+                ("Indexed frames file", "*.frames"),
+                ("ASCII animation", "*.asca"),
+                ("Text files (one per frame)", "*.txt"),
+            ]
+        )
         
-        if folder_path:
-            try:
-                base_name = os.path.splitext(os.path.basename(self.image_path or "animation"))[0]
-                
-                for i, frame in enumerate(self.ascii_frames):
-                    file_path = os.path.join(folder_path, f"{base_name}_frame_{i+1:03d}.txt")
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(frame)
-                
-                self.update_status(f"💾 All {len(self.ascii_frames)} frames saved!", self.colors['success'])
-                messagebox.showinfo("Success", f"All {len(self.ascii_frames)} frames saved to {folder_path}")
-            except Exception as e:
-                error_msg = f"❌ Failed to save frames: {str(e)}"
-                self.update_status(error_msg, self.colors['warning'])
-                messagebox.showerror("Error", f"Failed to save frames: {str(e)}")
+        if file_path:
+            self.export_thread = threading.Thread(
+                target=self._run_export,
+                args=(frames, durations, file_path, base_name),
+                daemon=True
+            )
+            self.export_thread.start()
+    
+    def _run_export(self, frames, durations, file_path, base_name):
+        """Export thread: stream frames to the writer and report back to the UI thread"""
+        def progress(done, total):
+            if done % 25 == 0 or done == total:
+                self.root.after(0, self.update_status, f"💾 Saving frame {done}/{total}...", self.colors['accent'])
+        
+        try:
+            start = time.perf_counter()
+            if file_path.lower().endswith('.asca'):
+                write_animation(file_path, frames, durations)
+                frames_written = len(frames)
+                fps = frames_written / max(time.perf_counter() - start, 1e-9)
+            else:
+                writer = export_frames(frames, file_path, base_name, progress)
+                frames_written, fps = writer.frames_written, writer.fps
+        except Exception as e:
+            self.root.after(0, self._finish_export, file_path, 0, 0.0, e)
+        else:
+            self.root.after(0, self._finish_export, file_path, frames_written, fps, None)
+    
+    def _finish_export(self, file_path, frames_written, fps, error):
+        """Report the result of a background export"""
+        if error is not None:
+            error_msg = f"❌ Failed to save frames: {str(error)}"
+            self.update_status(error_msg, self.colors['warning'])
+            messagebox.showerror("Error", f"Failed to save frames: {str(error)}")
+            return
+        
+        self.update_status(f"💾 All {frames_written} frames saved! ({fps:.0f} frames/s)", self.colors['success'])
+        messagebox.showinfo("Success", f"All {frames_written} frames saved to {file_path}")
     
     def copy_to_clipboard(self):
         """Copy ASCII art to clipboard"""
@@ -879,8 +4280,8 @@ class ASCIIArtConverter:
             self.update_status("📋 Current ASCII frame copied to clipboard!", self.colors['success'])
             messagebox.showinfo("Success", "Current ASCII frame copied to clipboard!")
         elif self.enable_procedural_animation.get() and self.base_ascii:
-            # Copy current procedural frame
-            current_ascii = self.generate_procedural_frame()
+            # Copy the procedural frame on screen
+            current_ascii = self.procedural_text or self.generate_procedural_frame()
             self.root.clipboard_clear()
             self.root.clipboard_append(current_ascii)
             self.update_status("📋 Current animated frame copied to clipboard!", self.colors['success'])
@@ -895,7 +4296,111 @@ class ASCIIArtConverter:
             self.update_status("⚠️ No ASCII art to copy!", self.colors['warning'])
             messagebox.showwarning("Warning", "No ASCII art to copy!")
 
+def parse_args(argv):
+    """Command-line options; with no inputs the GUI is started"""
+    parser = argparse.ArgumentParser(
+        description="Convert images and GIFs to ASCII art. Starts the GUI when no inputs are given."
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help="image/GIF files, directories or glob patterns to convert headlessly")
+    parser.add_argument('-o', '--output', default='ascii_output',
+                        help="directory for the text output (default: ascii_output)")
+    parser.add_argument('-w', '--width', type=int, default=80,
+                        help="output width in characters (default: 80)")
+    parser.add_argument('--black-as-space', action='store_true',
+                        help="use spaces for black pixels")
+    parser.add_argument('--color', choices=('ansi', 'html'),
+                        help="write still images as colored ANSI (.ans) or HTML output")
+    parser.add_argument('--archive', choices=('zip', 'tar.gz', 'frames', 'asca'),
+                        help="write each GIF's frames into one archive or .asca animation "
+                             "instead of one .txt per frame")
+    parser.add_argument('--density-order', action='store_true',
+                        help="order the character ramp by measured glyph ink coverage")
+    parser.add_argument('--edges', type=float, nargs='?', const=0.35, default=None, metavar='THRESHOLD',
+                        help="draw strong edges with / \\ | - characters (threshold 0-1, default 0.35)")
+    parser.add_argument('--fast', action='store_true',
+                        help="preview quality: reduced-size decoding and bilinear resampling")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="worker processes (default: one per CPU core)")
+    parser.add_argument('--play', action='store_true',
+                        help="play the first input in this terminal: a GIF, .asca animation, video file, "
+                             "'webcam[:N]', 'synthetic', or a still image with --effect")
+    parser.add_argument('--effect', choices=PROCEDURAL_EFFECTS,
+                        help="procedural effect for --play with a still image")
+    parser.add_argument('--intensity', type=float, default=0.5,
+                        help="procedural effect intensity from 0 to 1 (default: 0.5)")
+    parser.add_argument('--fps', type=float, default=None,
+                        help="playback rate for --play (default: the GIF timing, or 30 fps for effects)")
+    parser.add_argument('--loop', action='store_true',
+                        help="repeat --play animations until interrupted")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="play --effect as a deterministic loop rendered from this seed")
+    parser.add_argument('--loop-frames', type=int, default=120,
+                        help="frames in a seeded --effect loop (default: 120)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="convert the inputs in-process under cProfile and save the profile "
+                             "(.prof for pstats/snakeviz, anything else for a text report)")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="benchmark conversion and procedural effects, then exit")
+    parser.add_argument('--benchmark-suite', metavar='RESULTS_JSON', nargs='?', const='benchmark_results.json',
+                        help="run the staged benchmark suite and save its results as JSON, then exit")
+    parser.add_argument('--baseline', metavar='RESULTS_JSON',
+                        help="compare --benchmark-suite results with an earlier run; exits 1 on regressions")
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args(sys.argv[1:])
+    if args.benchmark_suite:
+        results = run_benchmark_suite()
+        print_benchmark_suite(results)
+        with open(args.benchmark_suite, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.benchmark_suite}")
+        if args.baseline:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+            sys.exit(1 if compare_benchmark_suites(results, baseline) else 0)
+        return
+    if args.benchmark:
+        benchmark_conversion()
+        benchmark_resampling()
+        benchmark_procedural()
+        benchmark_edges()
+        benchmark_terminal()
+        benchmark_streaming()
+        return
+    ascii_chars = DEFAULT_ASCII_CHARS
+    if args.density_order:
+        ascii_chars = density_ramp(ascii_chars, os.path.join(os.path.expanduser("~"), ".ascii_art_cache"))
+    if args.play:
+        if not args.inputs:
+            sys.exit("--play needs an input")
+        engine = ASCIIEngine(args.width, args.black_as_space, ascii_chars,
+                             quality="preview" if args.fast else "final", edge_threshold=args.edges)
+        frames = terminal_frames(args.inputs[0], engine, args.effect, args.intensity, args.fps, args.loop,
+                                 args.seed, args.loop_frames)
+        renderer = play_in_terminal(frames)
+        print(renderer.summary())
+        return
+    if args.profile:
+        os.makedirs(args.output, exist_ok=True)
+        profile = cProfile.Profile()
+        profile.enable()
+        for path in collect_input_paths(args.inputs):
+            _convert_file_job(path, args.output, args.width, args.black_as_space,
+                              "preview" if args.fast else "final", args.color, args.archive,
+                              ascii_chars, args.edges)
+        profile.disable()
+        write_profile(profile, args.profile)
+        print(f"Profile saved to {args.profile}")
+        return
+    if args.inputs:
+        failures = run_batch(args.inputs, args.output, args.width, args.black_as_space, args.jobs,
+                             quality="preview" if args.fast else "final", color=args.color,
+                             archive=args.archive, ascii_chars=ascii_chars, edge_threshold=args.edges)
+        sys.exit(1 if failures else 0)
+    
     root = tk.Tk()
     
     # Set window icon (if you have an icon file)
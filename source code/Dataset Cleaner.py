@@ -4,12 +4,608 @@ import pandas as pd
 import numpy as np
 import os
 import json
+import pickle
 from pathlib import Path
 import threading
 import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import requests
 
+# Streaming (out-of-core) cleaning
+CHUNK_ROWS = 100_000
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024  # Larger CSV/TSV files are always streamed
+STREAMABLE_EXTENSIONS = ('.csv', '.tsv')
+EXACT_STATS_LIMIT = 200_000  # Values kept exactly per column before switching to sketches
+FINGERPRINT_MEMORY_BYTES = 256 * 1024 * 1024  # Row fingerprints held in RAM before spilling to disk
+PARALLEL_MIN_ROWS = 50_000  # Smaller frames are cleaned inline; half a chunk, so deduplicated chunks still qualify
+OFFLOAD_SAMPLE_ROWS = 20_000  # Rows timed to decide whether a text column is worth sending to a process
+OUTLIER_FLAG_COLUMN = 'is_outlier'
+
+
+def read_chunks(file_path, chunk_rows=CHUNK_ROWS, dtype=None):
+    """Read a CSV/TSV file as an iterator of DataFrame chunks"""
+    sep = '\t' if Path(file_path).suffix.lower() == '.tsv' else ','
+    return pd.read_csv(file_path, sep=sep, chunksize=chunk_rows, dtype=dtype)
+
+
+def is_numeric_column(dtype):
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def is_text_column(dtype):
+    return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+
+
+FINGERPRINT_128 = np.dtype([('high', '<u8'), ('low', '<u8')])
+
+
+def _canonical_value(value):
+    """Key under which object-column values compare like pandas' duplicated(): 1 == 1.0 == True, but 1 != '1'"""
+    if isinstance(value, str):
+        return 's' + value
+    if value is None or value is pd.NA or value is pd.NaT:
+        return f"null:{value!r}"  # On a single column duplicated() tells None, NA and NaT apart, and from NaN
+    if isinstance(value, (bool, int, np.bool_, np.integer)):
+        return 'n' + str(int(value))
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return 'nan'
+        if value.is_integer():
+            return 'n' + str(int(value))
+        return 'n' + repr(float(value) + 0.0)
+    return f"o{type(value).__name__}:{value!r}"
+
+
+def canonical_rows(df):
+    """Columns rewritten so that equal rows (as duplicated() sees them) hash equally, even across chunks
+    
+    hash_pandas_object alone hashes object values by their str() (1 and '1'
+    collide), tells -0.0 from 0.0, and depends on the dtype a chunk happened
+    to be read with (5 vs 5.0).
+    """
+    # With several columns duplicated() factorizes each one, which puts every kind of missing value in one group
+    merge_missing = len(df.columns) > 1
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            columns[column] = series
+        elif pd.api.types.is_integer_dtype(series.dtype) and (len(series) == 0 or series.abs().max() < 2 ** 53):
+            columns[column] = series.astype(float) + 0.0  # Lossless, and matches the same column read as float
+        elif pd.api.types.is_float_dtype(series.dtype):
+            columns[column] = series + 0.0  # -0.0 + 0.0 == 0.0
+        elif pd.api.types.is_object_dtype(series.dtype):
+            keys = series.map(_canonical_value)
+            columns[column] = keys.where(series.notna(), 'null') if merge_missing else keys
+        else:
+            columns[column] = series
+            if is_text_column(series.dtype):
+                columns[(column, 'missing')] = series.isna()  # A missing value and the text 'nan' differ
+    return pd.DataFrame(columns, index=df.index)
+
+
+def row_hashes(df, bits=64):
+    """Fingerprint of every row: uint64, or for bits=128 two independent hashes (slower to sort)"""
+    rows = canonical_rows(df)
+    high = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    if bits == 64:
+        return high
+    hashes = np.empty(len(high), dtype=FINGERPRINT_128)
+    hashes['high'] = high
+    hashes['low'] = pd.util.hash_pandas_object(rows, index=False, hash_key="mrcleandata_128b").to_numpy()
+    return hashes
+
+
+class FingerprintSet:
+    """Set of row fingerprints stored as sorted NumPy runs
+    
+    Costs 8 (or 16) bytes per distinct row rather than a Python object each.
+    New fingerprints are appended as a run and runs of similar length are
+    merged, so a lookup only binary-searches a logarithmic number of arrays.
+    With a memory_limit, a run that reaches it is written to a temporary .npy
+    file and searched memory-mapped from then on, so the set can outgrow RAM;
+    one set can be shared by several files to deduplicate across them. Call
+    close() (or use it as a context manager) to remove the spilled runs.
+    """
+    
+    def __init__(self, memory_limit=None, spill_dir=None):
+        self.memory_limit = memory_limit
+        self.spill_dir = spill_dir
+        self._runs = []
+        self._temp_dir = None
+        
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        self.close()
+        
+    @property
+    def spilled(self):
+        return sum(isinstance(run, np.memmap) for run in self._runs)
+        
+    def _spill(self, run):
+        if self._temp_dir is None:
+            self._temp_dir = tempfile.mkdtemp(prefix="fingerprints_", dir=self.spill_dir)
+        path = os.path.join(self._temp_dir, f"run_{len(self._runs)}.npy")
+        np.save(path, run)
+        return np.load(path, mmap_mode='r')
+        
+    def close(self):
+        self._runs = []
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+        
+    def first_occurrences(self, hashes):
+        """Mask of rows not seen before (in the set or earlier in hashes); adds their fingerprints"""
+        unique, first = np.unique(hashes, return_index=True)
+        new = np.ones(len(unique), dtype=bool)
+        for run in self._runs:
+            positions = np.minimum(np.searchsorted(run, unique), len(run) - 1)
+            new &= run[positions] != unique
+            
+        fresh = unique[new]
+        if len(fresh):
+            self._runs.append(fresh)
+            while (len(self._runs) > 1 and not isinstance(self._runs[-2], np.memmap)
+                   and len(self._runs[-2]) <= 2 * len(self._runs[-1])):
+                last = self._runs.pop()
+                self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]))
+            if self.memory_limit is not None and self._runs[-1].nbytes >= self.memory_limit:
+                self._runs[-1] = self._spill(self._runs[-1])
+                
+        mask = np.zeros(len(hashes), dtype=bool)
+        mask[first[new]] = True
+        return mask
+
+
+class KLLSketch:
+    """Quantile sketch (Karnin, Lang & Liberty)
+    
+    Level h holds values of weight 2**h. When a level outgrows its capacity it
+    is sorted and every other value, from a random offset, is promoted to the
+    next level. Memory is O(k) and the rank error about 1.7 / k.
+    """
+    
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+        
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+        
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        
+    def _compress(self):
+        while True:
+            full = [level for level, items in enumerate(self.levels) if len(items) > self._capacity(level)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+                
+            items = np.sort(self.levels[level])
+            paired = len(items) - len(items) % 2
+            promoted = items[self._rng.integers(2):paired:2]
+            self.levels[level] = items[paired:]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            
+    def quantiles(self, qs):
+        """Linearly interpolated quantiles, like np.quantile (exact while no level was compacted)"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        values, weights = values[order], weights[order]
+        centers = np.cumsum(weights) - (weights + 1) / 2
+        return np.interp(np.asarray(qs) * (weights.sum() - 1), centers, values)
+
+
+class MisraGries:
+    """Heavy-hitters summary with at most k counters
+    
+    Each count is under-estimated by at most n / (k + 1), so any value more
+    frequent than that is kept, which is what finding the mode needs.
+    """
+    
+    def __init__(self, k=1000):
+        self.k = k
+        self.counters = {}
+        
+    def update(self, counts):
+        for value, count in counts:
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        if len(self.counters) > self.k:
+            cut = sorted(self.counters.values(), reverse=True)[self.k]
+            self.counters = {value: count - cut for value, count in self.counters.items() if count > cut}
+
+
+def most_frequent(counts):
+    """Most frequent value of a {value: count} dict; ties go to the smallest value, like Series.mode()"""
+    if not counts:
+        return None
+    top = max(counts.values())
+    candidates = [value for value, count in counts.items() if count == top]
+    try:
+        return min(candidates)
+    except TypeError:
+        return candidates[0]
+
+
+class ColumnStats:
+    """Median, IQR bounds and mode of one column, gathered in a single pass
+    
+    Values and counts are kept exactly while the column is small (up to
+    exact_limit numeric values or distinct text values; None for no limit).
+    Past that, quantiles move to a KLLSketch and counts to a MisraGries
+    summary, both of bounded size, so streamed chunks can be fed in one after
+    another. Results are cached until the next update, so several actions on
+    a column share one computation.
+    """
+    
+    def __init__(self, exact_limit=EXACT_STATS_LIMIT):
+        self.exact_limit = exact_limit
+        self.seen = 0
+        self._values = []
+        self._counts = {}
+        self._kll = None
+        self._frequent = None
+        self._cache = {}
+        
+    @property
+    def exact(self):
+        return self._kll is None and self._frequent is None
+        
+    def _over_limit(self, size):
+        return self.exact_limit is not None and size > self.exact_limit
+        
+    def update(self, series):
+        self._cache.clear()
+        values = series.dropna()
+        if is_numeric_column(series.dtype):
+            self._add_values(values.to_numpy(dtype=float))
+        else:
+            self._add_counts(values.value_counts().items())
+            
+    def _add_values(self, values):
+        self.seen += len(values)
+        if self._kll is not None:
+            self._kll.update(values)
+            return
+        self._values.append(values)
+        if self._over_limit(self.seen):
+            self._kll = KLLSketch()
+            self._kll.update(np.concatenate(self._values))
+            self._values = []
+            
+    def _add_counts(self, counts):
+        if self._frequent is not None:
+            self._frequent.update(counts)
+            return
+        for value, count in counts:
+            self._counts[value] = self._counts.get(value, 0) + int(count)
+        if self._over_limit(len(self._counts)):
+            self._frequent = MisraGries()
+            self._frequent.update(self._counts.items())
+            self._counts = {}
+            
+    def quartiles(self):
+        """Q1, median and Q3, from one quantile computation"""
+        if "quartiles" not in self._cache:
+            if not self.seen:
+                self._cache["quartiles"] = np.full(3, np.nan)
+            elif self._kll is not None:
+                self._cache["quartiles"] = self._kll.quantiles([0.25, 0.5, 0.75])
+            else:
+                self._cache["quartiles"] = np.quantile(np.concatenate(self._values), [0.25, 0.5, 0.75])
+        return self._cache["quartiles"]
+        
+    def median(self):
+        return float(self.quartiles()[1])
+        
+    def iqr_bounds(self):
+        q1, _, q3 = self.quartiles()
+        iqr = q3 - q1
+        return float(q1 - 1.5 * iqr), float(q3 + 1.5 * iqr)
+        
+    def mode(self):
+        if "mode" not in self._cache:
+            counts = self._frequent.counters if self._frequent is not None else self._counts
+            self._cache["mode"] = most_frequent(counts)
+        return self._cache["mode"]
+
+
+class DatasetSketch:
+    """Everything the analysis and cleaning need from a file, gathered in one streamed pass
+    
+    Shape, dtypes, missing values, whitespace and the duplicate count are taken
+    over all rows; the per-column statistics over the deduplicated rows, which
+    is what clean_dataset computes them on. read_dtype is the dtype override
+    the chunks were read with; mixed_columns collects the columns that came
+    out as numbers in some chunks and as text in others.
+    """
+    
+    def __init__(self, read_dtype=None):
+        self.read_dtype = read_dtype
+        self.mixed_columns = set()
+        self.rows = 0
+        self.columns = None
+        self.dtypes = {}
+        self.missing = {}
+        self.whitespace = {}
+        self.duplicates = 0
+        self.head = None
+        self.columns_stats = {}
+        self._checked = {}
+        self._seen = FingerprintSet(FINGERPRINT_MEMORY_BYTES)
+        self._unique_chunks = []  # Bit-packed first-occurrence mask of every chunk
+        
+    def update(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            self.head = chunk.head(3)
+            for col in self.columns:
+                self.dtypes[col] = chunk.dtypes[col]
+                self.missing[col] = 0
+                self.whitespace[col] = False
+                self._checked[col] = 0
+                self.columns_stats[col] = ColumnStats()
+                
+        self.rows += len(chunk)
+        for col in self.columns:
+            series = chunk[col]
+            if is_text_column(series.dtype) != is_text_column(self.dtypes[col]):
+                self.mixed_columns.add(col)
+            if series.dtype != self.dtypes[col]:
+                try:
+                    self.dtypes[col] = np.promote_types(self.dtypes[col], series.dtype)
+                except TypeError:
+                    self.dtypes[col] = np.dtype(object)
+            self.missing[col] += int(series.isnull().sum())
+            
+            # Same whitespace check as basic_analysis: the first 100 non-missing values
+            if is_text_column(series.dtype) and self._checked[col] < 100:
+                sample_values = series.dropna().astype(str).head(100 - self._checked[col])
+                self._checked[col] += len(sample_values)
+                if any(val != val.strip() for val in sample_values):
+                    self.whitespace[col] = True
+                    
+        unique = self._seen.first_occurrences(row_hashes(chunk))
+        self._unique_chunks.append(np.packbits(unique))
+        self.duplicates += int(len(chunk) - unique.sum())
+        deduplicated = chunk[unique]
+        for col in self.columns:
+            self.columns_stats[col].update(deduplicated[col])
+            
+    def finish(self):
+        """Release the fingerprints; unique_rows() keeps answering from the stored masks"""
+        self._seen.close()
+        
+    def unique_rows(self, number, rows):
+        """First-occurrence mask of chunk number (of rows rows), as found by the sketch pass"""
+        return np.unpackbits(self._unique_chunks[number], count=rows).astype(bool)
+        
+    def summary(self):
+        summary = []
+        summary.append(f"Shape: {(self.rows, len(self.columns))}")
+        summary.append(f"Columns: {self.columns}")
+        summary.append(f"Data types: {self.dtypes}")
+        summary.append(f"Missing values: {self.missing}")
+        summary.append(f"Duplicate rows: {self.duplicates}")
+        
+        # Sample data for first few rows
+        summary.append("Sample data:")
+        summary.append(str(self.head.to_dict()))
+        
+        return "\n".join(summary)
+
+
+def deduplicate_files(paths, output_path, bits=64, memory_limit=FINGERPRINT_MEMORY_BYTES, chunk_rows=CHUNK_ROWS):
+    """Write the distinct rows of several CSV/TSV files (same columns) to one CSV; returns (rows read, rows written)
+    
+    The files are streamed in chunks against one shared FingerprintSet, which
+    spills to disk past memory_limit, so the batch may be larger than RAM.
+    """
+    rows_in = rows_out = 0
+    columns = None
+    with FingerprintSet(memory_limit) as seen:
+        for path in paths:
+            for chunk in read_chunks(path, chunk_rows):
+                if columns is None:
+                    columns = list(chunk.columns)
+                elif list(chunk.columns) != columns:
+                    raise ValueError(f"{os.path.basename(path)} has different columns from the first file")
+                unique = seen.first_occurrences(row_hashes(chunk, bits))
+                chunk[unique].to_csv(output_path, index=False, mode='w' if rows_in == 0 else 'a', header=rows_in == 0)
+                rows_in += len(chunk)
+                rows_out += int(unique.sum())
+    return rows_in, rows_out
+
+
+def apply_column_plan(series, steps):
+    """Run one column's cleaning steps in order; returns the new column and its keep-mask (None without outlier steps)"""
+    keep = None
+    for kind, value in steps:
+        if kind == "fill":
+            series = series.fillna(value)
+        elif kind == "strip":
+            series = series.astype(str).str.strip()
+        else:
+            lower, upper = value
+            inside = ((series >= lower) & (series <= upper)).to_numpy()
+            keep = inside if keep is None else keep & inside
+    return series, keep
+
+
+def free_column_name(columns, name):
+    """name, or name_1, name_2... if the columns already use it"""
+    candidate, number = name, 0
+    while candidate in columns:
+        number += 1
+        candidate = f"{name}_{number}"
+    return candidate
+
+
+class OutlierEngine:
+    """IQR outlier handling for all flagged columns at once
+    
+    iqr_bounds() gets Q1 and Q3 of every column from one DataFrame.quantile
+    call. apply() combines the per-column keep-masks into a single mask and
+    either filters the rows once or, with a flag_column, keeps every row and
+    marks outliers in that added boolean column. It also tallies what the
+    old column-by-column filtering would have copied, for summary().
+    """
+    
+    def __init__(self, flag_column=None):
+        self.flag_column = flag_column
+        self.rows = 0
+        self.outliers = 0
+        self.copy_bytes_saved = 0
+        self.copies_avoided = 0
+        
+    @staticmethod
+    def iqr_bounds(df, columns):
+        """{column: (lower, upper)} at 1.5 IQR around the quartiles"""
+        if not columns:
+            return {}
+        quartiles = df[columns].quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+        iqr = q3 - q1
+        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        return {column: (float(lower[column]), float(upper[column])) for column in columns}
+        
+    def apply(self, df, masks):
+        """Drop (or flag) the rows any mask rejects; df must be a frame the caller owns"""
+        if self.flag_column and self.flag_column in df.columns:
+            raise ValueError(f"Column '{self.flag_column}' already exists; not overwriting it with outlier flags")
+        # One running mask; after each AND it holds the rows the per-column filter would have copied
+        combined = None
+        sequential_rows = 0
+        for mask in masks:
+            combined = mask.copy() if combined is None else np.logical_and(combined, mask, out=combined)
+            sequential_rows += int(combined.sum())
+            
+        # Deep, so text columns count their strings, not just the pointers
+        row_bytes = df.memory_usage(index=True, deep=True).sum() / max(len(df), 1)
+        kept = int(combined.sum())
+        self.rows += len(df)
+        self.outliers += len(df) - kept
+        self.copies_avoided += len(masks) - (0 if self.flag_column else 1)
+        self.copy_bytes_saved += int(row_bytes * (sequential_rows - (0 if self.flag_column else kept)))
+        
+        if self.flag_column:
+            df[self.flag_column] = ~combined
+            return df
+        return df.take(np.flatnonzero(combined))
+        
+    def summary(self, seconds):
+        rate = self.rows / seconds if seconds > 0 else float('inf')
+        return (f"Column cleaning pass: {self.rows:,} rows in {seconds * 1000:.0f} ms ({rate:,.0f} rows/s), "
+                f"{self.copies_avoided} frame copies (~{self.copy_bytes_saved / 1024 ** 2:.1f} MB) "
+                f"saved versus filtering column by column")
+
+
+class ColumnPlanExecutor:
+    """Applies per-column cleaning plans concurrently, then filters the rows once
+    
+    A plan maps a column to its ("fill", value), ("strip", None) and
+    ("outlier", (lower, upper)) steps. Columns are independent, so each is
+    transformed on its own: NumPy-backed ones in a thread pool, and text
+    columns in a process pool (string operations hold the GIL) when that pays
+    off. Pickling a text column there and back often costs more than
+    stripping it, so this is measured per column on a sample first. The
+    outlier steps only produce keep-masks, which are combined into one mask
+    so the frame is reindexed a single time (see OutlierEngine). With one CPU,
+    small frames or a single column, everything runs inline. Pools start on
+    first use and are reused across calls (e.g. chunks); use as a context
+    manager to shut them down.
+    """
+    
+    def __init__(self, workers=None, min_rows=PARALLEL_MIN_ROWS):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_rows = min_rows
+        self._threads = None
+        self._processes = None
+        self._offload = {}  # Column -> whether a process pays for its pickling
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        self.shutdown()
+        
+    def shutdown(self):
+        for pool in (self._threads, self._processes):
+            if pool is not None:
+                pool.shutdown()
+        self._threads = self._processes = None
+        
+    def _pool(self, process):
+        if process:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(self.workers)
+            return self._processes
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.workers)
+        return self._threads
+        
+    def _worth_offloading(self, column, series, steps):
+        """Whether a text column's steps clearly outweigh pickling it to a process and back (timed once)"""
+        if column not in self._offload:
+            sample = series.iloc[:OFFLOAD_SAMPLE_ROWS]
+            compute = transfer = float('inf')
+            for _ in range(3):  # Best of three, to keep one-off stalls out of the decision
+                start = time.perf_counter()
+                result, _ = apply_column_plan(sample, steps)
+                compute = min(compute, time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                pickle.loads(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL))
+                pickle.loads(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+                transfer = min(transfer, time.perf_counter() - start)
+            # Margin: pickling grows faster than linearly with column size, and the worker pays it again
+            self._offload[column] = compute > 2 * transfer
+        return self._offload[column]
+        
+    def run(self, df, plans, outliers=None):
+        """Return the cleaned frame and the number of rows each column's outlier steps flagged"""
+        if self.workers <= 1 or len(df) < self.min_rows or len(plans) < 2:
+            results = {column: apply_column_plan(df[column], steps) for column, steps in plans.items()}
+        else:
+            # Decide before submitting anything, so running workers do not skew the timings
+            offload = {column: is_text_column(df[column].dtype) and self._worth_offloading(column, df[column], steps)
+                       for column, steps in plans.items()}
+            futures = {column: self._pool(offload[column]).submit(apply_column_plan, df[column], steps)
+                       for column, steps in plans.items()}
+            results = {column: future.result() for column, future in futures.items()}
+            
+        cleaned = df.copy(deep=False)
+        masks = []
+        flagged = {}
+        for column, (series, keep) in results.items():
+            cleaned[column] = series
+            if keep is not None:
+                masks.append(keep)
+                flagged[column] = int(len(keep) - keep.sum())
+                
+        if masks:
+            cleaned = (outliers or OutlierEngine()).apply(cleaned, masks)
+        return cleaned, flagged
+
+
 class DatasetCleaner:
     def __init__(self, root):
         self.root = root
@@ -36,6 +632,12 @@ class DatasetCleaner:
         self.file_path = tk.StringVar()
         self.df = None
         self.cleaned_df = None
+        self.stats_cache = {}  # Column name -> ColumnStats of the data being cleaned
+        self.unique_mask = None  # First occurrences in self.df, shared by the summary and cleaning
+        self.stream_mode = tk.BooleanVar(value=False)
+        self.flag_outliers = tk.BooleanVar(value=False)
+        self.sketch = None  # DatasetSketch of a streamed file
+        self.streamed_output = None
         
         self.setup_styles()
         self.create_widgets()
@@ -141,6 +743,28 @@ class DatasetCleaner:
                                     state='disabled')
         self.export_btn.pack(side='left')
         
+        self.dedup_btn = ttk.Button(control_frame, text="🧬 Deduplicate Files",
+                                   command=self.start_file_deduplication, style='Secondary.TButton')
+        self.dedup_btn.pack(side='left', padx=(10, 0))
+        
+        stream_check = tk.Checkbutton(control_frame, text="📦 Stream in chunks (large CSV/TSV)",
+                                      variable=self.stream_mode,
+                                      bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                                      selectcolor=self.colors['bg_tertiary'],
+                                      activebackground=self.colors['bg_primary'],
+                                      activeforeground=self.colors['text_primary'],
+                                      font=('Segoe UI', 10))
+        stream_check.pack(side='left', padx=(20, 0))
+        
+        flag_check = tk.Checkbutton(control_frame, text=f"🚩 Flag outliers in '{OUTLIER_FLAG_COLUMN}' instead of removing",
+                                    variable=self.flag_outliers,
+                                    bg=self.colors['bg_primary'], fg=self.colors['text_secondary'],
+                                    selectcolor=self.colors['bg_tertiary'],
+                                    activebackground=self.colors['bg_primary'],
+                                    activeforeground=self.colors['text_primary'],
+                                    font=('Segoe UI', 10))
+        flag_check.pack(side='left', padx=(20, 0))
+        
         # Progress Bar
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.pack(fill='x', pady=(0, 20))
@@ -223,8 +847,15 @@ class DatasetCleaner:
             # Load dataset
             file_path = self.file_path.get()
             file_ext = Path(file_path).suffix.lower()
+            self.sketch = None
+            self.streamed_output = None
             
-            if file_ext == '.csv':
+            if file_ext in STREAMABLE_EXTENSIONS and (
+                    self.stream_mode.get() or os.path.getsize(file_path) > STREAMING_THRESHOLD_BYTES):
+                self.df = None
+                self.cleaned_df = None
+                self.sketch = self.sketch_dataset(file_path)
+            elif file_ext == '.csv':
                 self.df = pd.read_csv(file_path)
             elif file_ext in ['.xlsx', '.xls']:
                 self.df = pd.read_excel(file_path)
@@ -234,8 +865,12 @@ class DatasetCleaner:
                 self.df = pd.read_csv(file_path, sep='\t')
             else:
                 raise ValueError(f"Unsupported file format: {file_ext}")
+            self.unique_mask = None
                 
-            self.log_message(f"Loaded dataset: {self.df.shape[0]} rows, {self.df.shape[1]} columns")
+            if self.sketch is not None:
+                self.log_message(f"Streamed dataset: {self.sketch.rows} rows, {len(self.sketch.columns)} columns")
+            else:
+                self.log_message(f"Loaded dataset: {self.df.shape[0]} rows, {self.df.shape[1]} columns")
             
             # Analyze with AI
             self.status_var.set("Analyzing with AI...")
@@ -243,7 +878,10 @@ class DatasetCleaner:
             
             # Perform cleaning
             self.status_var.set("Cleaning dataset...")
-            self.clean_dataset(analysis_result)
+            if self.sketch is not None:
+                self.clean_streaming(file_path, analysis_result)
+            else:
+                self.clean_dataset(analysis_result)
             
             self.log_message("Dataset cleaning completed successfully!", "SUCCESS")
             self.status_var.set("Analysis and cleaning completed")
@@ -331,12 +969,15 @@ class DatasetCleaner:
             return self.basic_analysis()
             
     def generate_dataset_summary(self):
+        if self.sketch is not None:
+            return self.sketch.summary()
+            
         summary = []
         summary.append(f"Shape: {self.df.shape}")
         summary.append(f"Columns: {list(self.df.columns)}")
         summary.append(f"Data types: {dict(self.df.dtypes)}")
         summary.append(f"Missing values: {dict(self.df.isnull().sum())}")
-        summary.append(f"Duplicate rows: {self.df.duplicated().sum()}")
+        summary.append(f"Duplicate rows: {int(len(self.df) - self.unique_rows().sum())}")
         
         # Sample data for first few rows
         summary.append("Sample data:")
@@ -347,18 +988,27 @@ class DatasetCleaner:
     def basic_analysis(self):
         """Fallback analysis if AI fails"""
         recommendations = []
+        columns = self.sketch.columns if self.sketch is not None else self.df.columns
         
-        for col in self.df.columns:
+        for col in columns:
             issues = []
             actions = []
             
             # Check for missing values
-            if self.df[col].isnull().sum() > 0:
+            if self.sketch is not None:
+                missing = self.sketch.missing[col]
+            else:
+                missing = self.df[col].isnull().sum()
+            if missing > 0:
                 issues.append("Missing values")
                 actions.append("Fill or remove missing values")
                 
             # Check for string columns with whitespace
-            if self.df[col].dtype == 'object':
+            if self.sketch is not None:
+                if self.sketch.whitespace[col]:
+                    issues.append("Leading/trailing whitespace")
+                    actions.append("Strip whitespace")
+            elif self.df[col].dtype == 'object':
                 sample_values = self.df[col].dropna().astype(str).head(100)
                 if any(val != val.strip() for val in sample_values):
                     issues.append("Leading/trailing whitespace")
@@ -379,67 +1029,247 @@ class DatasetCleaner:
         }
         
     def clean_dataset(self, analysis_result):
-        self.cleaned_df = self.df.copy()
-        
         self.log_message("Applying cleaning operations...")
         
-        # Apply general cleaning
-        initial_rows = len(self.cleaned_df)
-        self.cleaned_df = self.cleaned_df.drop_duplicates()
+        # Apply general cleaning (one copy: the deduplicated rows)
+        initial_rows = len(self.df)
+        self.cleaned_df = self.df.take(np.flatnonzero(self.unique_rows()))
         removed_duplicates = initial_rows - len(self.cleaned_df)
         if removed_duplicates > 0:
             self.log_message(f"Removed {removed_duplicates} duplicate rows")
             
-        # Apply column-specific cleaning
+        # Statistics are computed once per column, on the deduplicated data
+        self.stats_cache = {}
+        dtypes = dict(self.cleaned_df.dtypes)
+        outliers = self.outlier_engine(self.cleaned_df.columns)
+        bounds = outliers.iqr_bounds(self.cleaned_df, self.outlier_columns(analysis_result, dtypes))
+        plans = self.build_column_plans(analysis_result, dtypes, self.column_stats, bounds)
+        
+        # Apply column-specific cleaning, columns in parallel and outlier rows in one filter
+        start = time.perf_counter()
+        with ColumnPlanExecutor() as executor:
+            self.cleaned_df, flagged = executor.run(self.cleaned_df, plans, outliers)
+        self.log_outliers(flagged, outliers, time.perf_counter() - start)
+        
+        # Final summary
+        self.log_message(f"Cleaning summary:")
+        self.log_message(f"  Original shape: {self.df.shape}")
+        self.log_message(f"  Cleaned shape: {self.cleaned_df.shape}")
+        self.log_message(f"  Rows removed: {self.df.shape[0] - self.cleaned_df.shape[0]}")
+        
+    def outlier_columns(self, analysis_result, dtypes):
+        """Numeric columns with an outlier action"""
+        columns = []
         for rec in analysis_result.get("recommendations", []):
             column = rec["column"]
-            if column not in self.cleaned_df.columns:
+            if (column in dtypes and column not in columns and is_numeric_column(dtypes[column])
+                    and any("outlier" in action.lower() for action in rec["actions"])):
+                columns.append(column)
+        return columns
+        
+    def build_column_plans(self, analysis_result, dtypes, stats_for, bounds=None):
+        """Turn the recommendations into per-column steps, resolving fill values and outlier bounds up front"""
+        plans = {}
+        for rec in analysis_result.get("recommendations", []):
+            column = rec["column"]
+            if column not in dtypes:
                 continue
                 
             self.log_message(f"Cleaning column '{column}'...")
+            steps = plans.setdefault(column, [])
             
             for action in rec["actions"]:
                 if "missing" in action.lower():
-                    if self.cleaned_df[column].dtype in ['int64', 'float64']:
+                    if is_numeric_column(dtypes[column]):
                         # Fill numeric missing values with median
-                        median_val = self.cleaned_df[column].median()
-                        self.cleaned_df[column].fillna(median_val, inplace=True)
-                        self.log_message(f"  - Filled missing values with median: {median_val}")
+                        median_val = stats_for(column).median()
+                        steps.append(("fill", median_val))
+                        self.log_message(f"  - Filling missing values with median: {median_val}")
                     else:
                         # Fill categorical missing values with mode
-                        mode_val = self.cleaned_df[column].mode()
-                        if len(mode_val) > 0:
-                            self.cleaned_df[column].fillna(mode_val[0], inplace=True)
-                            self.log_message(f"  - Filled missing values with mode: {mode_val[0]}")
+                        mode_val = stats_for(column).mode()
+                        if mode_val is not None:
+                            steps.append(("fill", mode_val))
+                            self.log_message(f"  - Filling missing values with mode: {mode_val}")
                         
                 elif "whitespace" in action.lower():
-                    if self.cleaned_df[column].dtype == 'object':
-                        self.cleaned_df[column] = self.cleaned_df[column].astype(str).str.strip()
-                        self.log_message("  - Removed leading/trailing whitespace")
+                    if is_text_column(dtypes[column]):
+                        steps.append(("strip", None))
+                        self.log_message("  - Removing leading/trailing whitespace")
                         
                 elif "outlier" in action.lower():
-                    if self.cleaned_df[column].dtype in ['int64', 'float64']:
-                        Q1 = self.cleaned_df[column].quantile(0.25)
-                        Q3 = self.cleaned_df[column].quantile(0.75)
-                        IQR = Q3 - Q1
-                        lower = Q1 - 1.5 * IQR
-                        upper = Q3 + 1.5 * IQR
-                        outliers_before = len(self.cleaned_df)
-                        self.cleaned_df = self.cleaned_df[
-                            (self.cleaned_df[column] >= lower) & 
-                            (self.cleaned_df[column] <= upper)
-                        ]
-                        outliers_removed = outliers_before - len(self.cleaned_df)
-                        if outliers_removed > 0:
-                            self.log_message(f"  - Removed {outliers_removed} outlier rows")
-                            
+                    if bounds is not None and column in bounds:
+                        lower, upper = bounds[column]
+                    elif is_numeric_column(dtypes[column]) and stats_for(column).seen:
+                        lower, upper = stats_for(column).iqr_bounds()
+                    else:
+                        continue
+                    if not np.isnan(lower) and not np.isnan(upper):
+                        steps.append(("outlier", (lower, upper)))
+                        self.log_message(f"  - Outlier bounds (1.5 IQR): [{lower:.4g}, {upper:.4g}]")
+                        
+        return {column: steps for column, steps in plans.items() if steps}
+        
+    def outlier_engine(self, columns):
+        """OutlierEngine for this run, flagging (if enabled) in a column the data does not already have"""
+        if not self.flag_outliers.get():
+            return OutlierEngine()
+        flag_column = free_column_name(columns, OUTLIER_FLAG_COLUMN)
+        if flag_column != OUTLIER_FLAG_COLUMN:
+            self.log_message(f"The data already has a '{OUTLIER_FLAG_COLUMN}' column; "
+                             f"flagging outliers in '{flag_column}' instead", "WARNING")
+        return OutlierEngine(flag_column)
+        
+    def log_outliers(self, flagged, outliers, seconds):
+        for column, count in flagged.items():
+            if count > 0:
+                self.log_message(f"  - '{column}': {count} outlier rows")
+        if outliers.outliers > 0:
+            if outliers.flag_column:
+                self.log_message(f"Flagged {outliers.outliers} outlier rows in column '{outliers.flag_column}'")
+            else:
+                self.log_message(f"Removed {outliers.outliers} outlier rows")
+        if outliers.rows:
+            self.log_message(outliers.summary(seconds))
+            
+    def sketch_dataset(self, file_path):
+        """First streaming pass: shape, summary and cleaning statistics, one chunk in memory at a time"""
+        self.log_message(f"Streaming {os.path.basename(file_path)} in chunks of {CHUNK_ROWS} rows...")
+        sketch = self._sketch_pass(file_path)
+        if sketch.columns is None:
+            raise ValueError("Dataset is empty")
+        
+        if sketch.mixed_columns:
+            # Read whole, such a column is text throughout (5 and "5" are the same value), so
+            # hash and clean it as text in every chunk; only happens when chunks disagree
+            columns = sorted(sketch.mixed_columns, key=sketch.columns.index)
+            self.log_message(f"Columns read as numbers in some chunks and text in others: {columns}; "
+                             f"re-reading them as text", "WARNING")
+            sketch = self._sketch_pass(file_path, dict.fromkeys(columns, str))
+        return sketch
+        
+    def _sketch_pass(self, file_path, dtype=None):
+        sketch = DatasetSketch(dtype)
+        try:
+            for chunk in read_chunks(file_path, CHUNK_ROWS, dtype):
+                sketch.update(chunk)
+                self.status_var.set(f"Sketching dataset: {sketch.rows:,} rows read...")
+        finally:
+            sketch.finish()
+        return sketch
+        
+    def clean_streaming(self, file_path, analysis_result):
+        """Second streaming pass: clean each chunk with the sketched statistics and append it to the output"""
+        original_path = Path(file_path)
+        output_path = original_path.parent / f"{original_path.stem}_cleaned{original_path.suffix}"
+        sep = '\t' if original_path.suffix.lower() == '.tsv' else ','
+        
+        self.log_message("Applying cleaning operations chunk by chunk...")
+        self.log_message("  Statistics are computed once over the whole (deduplicated) file")
+        
+        plans = self.build_column_plans(analysis_result, self.sketch.dtypes,
+                                        lambda column: self.sketch.columns_stats[column])
+        
+        rows_out = 0
+        columns_out = len(self.sketch.columns)
+        removed_duplicates = 0
+        flagged = dict.fromkeys(plans, 0)
+        outliers = self.outlier_engine(self.sketch.columns)
+        outlier_seconds = 0.0
+        with ColumnPlanExecutor() as executor:
+            for number, chunk in enumerate(read_chunks(file_path, CHUNK_ROWS, self.sketch.read_dtype)):
+                # Duplicates were found by the sketch pass; the rows are not hashed again
+                unique = self.sketch.unique_rows(number, len(chunk))
+                removed_duplicates += int(len(chunk) - unique.sum())
+                chunk = chunk.take(np.flatnonzero(unique))
+                
+                start = time.perf_counter()
+                chunk, chunk_flagged = executor.run(chunk, plans, outliers)
+                outlier_seconds += time.perf_counter() - start
+                for column, count in chunk_flagged.items():
+                    flagged[column] += count
+                    
+                chunk.to_csv(output_path, sep=sep, index=False,
+                             mode='w' if number == 0 else 'a', header=number == 0)
+                rows_out += len(chunk)
+                columns_out = len(chunk.columns)
+                self.status_var.set(f"Cleaning dataset: {rows_out:,} rows written...")
+            
+        self.streamed_output = output_path
+        if removed_duplicates > 0:
+            self.log_message(f"Removed {removed_duplicates} duplicate rows")
+        self.log_outliers(flagged, outliers, outlier_seconds)
+            
         # Final summary
         self.log_message(f"Cleaning summary:")
-        self.log_message(f"  Original shape: {self.df.shape}")
-        self.log_message(f"  Cleaned shape: {self.cleaned_df.shape}")
-        self.log_message(f"  Rows removed: {self.df.shape[0] - self.cleaned_df.shape[0]}")
+        self.log_message(f"  Original shape: {(self.sketch.rows, len(self.sketch.columns))}")
+        self.log_message(f"  Cleaned shape: {(rows_out, columns_out)}")
+        self.log_message(f"  Rows removed: {self.sketch.rows - rows_out}")
+        self.log_message(f"Wrote cleaned dataset to: {output_path}", "SUCCESS")
+        
+    def unique_rows(self):
+        """First-occurrence mask of self.df, computed once (exactly, with duplicated()) for the summary and cleaning"""
+        if self.unique_mask is None:
+            self.unique_mask = ~self.df.duplicated().to_numpy()
+        return self.unique_mask
+        
+    def column_stats(self, column):
+        """Cached ColumnStats of a column of the in-memory data (exact, as it is already in RAM)"""
+        if column not in self.stats_cache:
+            stats = ColumnStats(exact_limit=None)
+            stats.update(self.cleaned_df[column])
+            self.stats_cache[column] = stats
+        return self.stats_cache[column]
+        
+    def start_file_deduplication(self):
+        paths = filedialog.askopenfilenames(
+            title="Select CSV/TSV files to deduplicate together",
+            filetypes=[("CSV/TSV files", "*.csv;*.tsv"), ("All files", "*.*")]
+        )
+        if not paths:
+            return
+            
+        output_path = filedialog.asksaveasfilename(
+            title="Save distinct rows as",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv")]
+        )
+        if not output_path:
+            return
+            
+        self.dedup_btn.config(state='disabled')
+        self.progress.start()
         
+        thread = threading.Thread(target=self.run_file_deduplication, args=(list(paths), output_path))
+        thread.daemon = True
+        thread.start()
+        
+    def run_file_deduplication(self, paths, output_path):
+        try:
+            self.log_message(f"Deduplicating {len(paths)} files into {os.path.basename(output_path)}...")
+            self.status_var.set("Deduplicating files...")
+            
+            # 128-bit fingerprints: a collision would silently drop a distinct row, and batches can be large
+            rows_in, rows_out = deduplicate_files(paths, output_path, bits=128)
+            
+            self.log_message(f"Read {rows_in} rows, wrote {rows_out} distinct rows "
+                             f"({rows_in - rows_out} duplicates removed) to: {output_path}", "SUCCESS")
+            self.status_var.set(f"Deduplicated into: {os.path.basename(output_path)}")
+            
+        except Exception as e:
+            self.log_message(f"Deduplication failed: {str(e)}", "ERROR")
+            self.status_var.set("Deduplication failed")
+            messagebox.showerror("Error", f"Deduplication failed: {str(e)}")
+            
+        finally:
+            self.progress.stop()
+            self.dedup_btn.config(state='normal')
+            
     def export_data(self):
+        if self.cleaned_df is None and self.streamed_output is not None:
+            messagebox.showinfo("Success", f"Cleaned dataset was written while streaming:\n{self.streamed_output}")
+            return
+            
         if self.cleaned_df is None:
             messagebox.showerror("Error", "No cleaned data to export")
             return
@@ -0,0 +1,27 @@
+"""Load the two scripts (their file names have spaces) as importable modules"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "source code")
+
+
+def load_script(module_name, file_name):
+    if module_name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(SOURCE_DIR, file_name))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module  # Worker processes unpickle functions by module name
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
+
+
+@pytest.fixture(scope="session")
+def art():
+    return load_script("ascii_art_generator", "ASCII Art Generator.py")
+
+
+@pytest.fixture(scope="session")
+def cleaner():
+    return load_script("dataset_cleaner", "Dataset Cleaner.py")
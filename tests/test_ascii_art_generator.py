@@ -0,0 +1,445 @@
+import io
+import os
+import re
+import tarfile
+import time
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+
+CHARSETS = ["@%#*+=-:. ", "█▓▒░·", "●◐◑◒◓○", "@#"]
+
+
+@pytest.mark.parametrize("ascii_chars", CHARSETS)
+@pytest.mark.parametrize("black_as_space", [False, True])
+def test_lut_matches_per_pixel_mapping(art, ascii_chars, black_as_space):
+    """Every brightness level maps to the character the per-pixel function picks"""
+    lut = art.build_ascii_lut(ascii_chars, black_as_space)
+    expected = [art.map_pixel_to_ascii(value, ascii_chars, black_as_space) for value in range(256)]
+    assert lut.dtype == np.dtype('<u4') and lut.shape == (256,)
+    assert [chr(code) for code in lut] == expected
+
+
+@pytest.mark.parametrize("ascii_chars", CHARSETS)
+@pytest.mark.parametrize("black_as_space", [False, True])
+def test_index_lut_points_into_compact_charset(art, ascii_chars, black_as_space):
+    charset, index_lut = art.build_index_lut(ascii_chars, black_as_space)
+    assert len(set(charset)) == len(charset)
+    assert [charset[i] for i in index_lut] == [art.map_pixel_to_ascii(v, ascii_chars, black_as_space)
+                                               for v in range(256)]
+
+
+@pytest.mark.parametrize("black_as_space", [False, True])
+def test_vectorized_conversion_matches_per_pixel_reference(art, black_as_space):
+    gray_image = art.make_synthetic_image((97, 61)).convert('L')
+    lut = art.build_ascii_lut(art.DEFAULT_ASCII_CHARS, black_as_space)
+    assert art.gray_to_ascii(gray_image, lut) == art.gray_to_ascii_per_pixel(
+        gray_image, art.DEFAULT_ASCII_CHARS, black_as_space)
+
+
+def test_text_has_one_line_per_row_and_no_trailing_newline(art):
+    lut = art.build_ascii_lut(art.ALT_ASCII_CHARS[0])
+    pixels = np.arange(5 * 7, dtype=np.uint8).reshape(5, 7) * 7
+    text = art.codepoints_to_ascii(lut[pixels])
+    assert text.split('\n') == ["".join(chr(lut[p]) for p in row) for row in pixels]
+
+
+def test_frame_to_ascii_full_range(art):
+    """Black and white pixels land on the first and last characters of the ramp"""
+    frame = Image.fromarray(np.repeat(np.array([[0] * 8 + [255] * 8], dtype=np.uint8), 8, axis=0))
+    lut = art.build_ascii_lut(art.DEFAULT_ASCII_CHARS)
+    lines = art.frame_to_ascii(frame, 16, lut).split('\n')
+    assert len(lines) == 4
+    assert all(line == "@" * 8 + " " * 8 for line in lines)
+
+
+def make_frames(art, charset, count=12, shape=(9, 13), seed=0):
+    """FrameStore of random keyframes, each followed by a few small edits (stored as deltas)"""
+    rng = np.random.default_rng(seed)
+    frames = art.FrameStore(charset)
+    expected = []
+    for number in range(count):
+        if number % 4 == 0:
+            indices = rng.integers(0, len(charset), size=shape, dtype=np.uint8)
+        else:
+            indices = expected[-1].copy()
+            indices[rng.integers(0, shape[0]), rng.integers(0, shape[1])] = rng.integers(0, len(charset))
+        frames.append(indices)
+        expected.append(indices)
+    return frames, expected
+
+
+@pytest.mark.parametrize("charset", ["@%#*+=-:. ", "█▓▒░·", "●◐◑◒◓○é"])
+def test_asca_round_trip(art, tmp_path, charset):
+    frames, expected = make_frames(art, charset)
+    durations = [40 + number for number in range(len(expected))]
+    path = str(tmp_path / "clip.asca")
+    art.write_animation(path, frames, durations)
+    
+    animation = art.MappedAnimation(path)
+    try:
+        assert len(animation) == len(expected)
+        assert animation.charset == charset
+        assert animation.shape == expected[0].shape
+        assert animation.durations == durations
+        for number, indices in enumerate(expected):
+            assert np.array_equal(animation.get_indices(number), indices)
+            assert animation[number] == frames[number]
+        assert np.array_equal(animation.get_indices(-1), expected[-1])
+    finally:
+        animation.close()
+
+
+def test_asca_stores_small_changes_as_deltas(art, tmp_path):
+    frames, expected = make_frames(art, "@%#*+=-:. ", count=8, shape=(40, 60))
+    full_path, delta_path = str(tmp_path / "full.asca"), str(tmp_path / "delta.asca")
+    art.write_animation(full_path, frames, [100] * 8, delta_threshold=0.0)
+    art.write_animation(delta_path, frames, [100] * 8)
+    assert (tmp_path / "delta.asca").stat().st_size < (tmp_path / "full.asca").stat().st_size / 2
+    
+    for path in (full_path, delta_path):
+        animation = art.MappedAnimation(path)
+        try:
+            assert [animation[n] for n in range(len(animation))] == list(frames)
+        finally:
+            animation.close()
+
+
+def test_asca_rejects_out_of_range_frames_and_other_files(art, tmp_path):
+    frames, _ = make_frames(art, "@. ", count=3)
+    path = str(tmp_path / "clip.asca")
+    art.write_animation(path, frames, [100] * 3)
+    animation = art.MappedAnimation(path)
+    try:
+        with pytest.raises(IndexError):
+            animation.get_indices(3)
+        with pytest.raises(IndexError):
+            animation.get_indices(-4)
+    finally:
+        animation.close()
+    
+    other = tmp_path / "not_an_animation.asca"
+    other.write_bytes(b"GIF89a" + bytes(64))
+    with pytest.raises(ValueError):
+        art.MappedAnimation(str(other))
+
+
+def test_disk_cache_round_trips_every_result_kind(art, tmp_path):
+    frames, _ = make_frames(art, "@%#*+=-:. ", count=10)
+    color_art = art.ASCIIEngine(40).convert_frame_to_color(art.make_synthetic_image((120, 90)), 5)
+    values = {"text": "ab\ncd", "color": color_art, "frames": (frames, [40] * 10)}
+    cache = art.ConversionCache(cache_dir=str(tmp_path))
+    for key, value in values.items():
+        cache.put(key, value)
+    cache.clear()
+    
+    inodes = {key: (tmp_path / f"{key}.npz").stat().st_ino for key in values}
+    assert cache.get("text") == "ab\ncd"
+    loaded = cache.get("color")
+    assert loaded.text == color_art.text and loaded.to_ansi() == color_art.to_ansi()
+    loaded_frames, durations = cache.get("frames")
+    assert list(loaded_frames) == list(frames) and durations == [40] * 10
+    assert cache.hits == 3 and cache.get("missing") is None and cache.misses == 1
+    # A hit only refreshes the entry's timestamp; the file is not written again
+    assert {key: (tmp_path / f"{key}.npz").stat().st_ino for key in values} == inodes
+
+
+def test_disk_cache_evicts_expired_then_least_recently_used_npz_files(art, tmp_path):
+    (tmp_path / "glyph_density.json").write_text("{}")
+    cache = art.ConversionCache(cache_dir=str(tmp_path))
+    for key in ("expired", "old", "used"):
+        cache.put(key, key * 50)
+    now = time.time()
+    os.utime(tmp_path / "expired.npz", (now - 40 * 86400,) * 2)
+    os.utime(tmp_path / "old.npz", (now - 200,) * 2)
+    os.utime(tmp_path / "used.npz", (now - 300,) * 2)
+    cache.clear()
+    assert cache.get("used") == "used" * 50  # Refreshes its timestamp
+    
+    # Room for two entries: the expired one goes, then the least recently used
+    cache.max_disk_bytes = 2 * (tmp_path / "used.npz").stat().st_size + 10
+    cache.put("new", "new" * 50)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["glyph_density.json", "new.npz", "used.npz"]
+
+
+@pytest.mark.parametrize("rate,fps", [("30000/1001", 30000 / 1001), ("25/1", 25.0), ("24", 24.0),
+                                      ("0/0", 30.0), ("25/0", 30.0), ("N/A", 30.0), ("", 30.0), ("-5/1", 30.0)])
+def test_parse_frame_rate(art, rate, fps):
+    assert art.parse_frame_rate(rate) == pytest.approx(fps)
+
+
+def box_filter_reference(art, image_path, width, lut):
+    """Mean brightness of each character cell, computed cell by cell from the fully decoded image"""
+    with Image.open(image_path) as image:
+        pixels = np.asarray(image.convert('L'), dtype=np.float64)
+    source_height, source_width = pixels.shape
+    height = max(1, int(width * (source_height / source_width) * 0.5))
+    row_of = np.arange(source_height) * height // source_height
+    column_edges = np.arange(width + 1) * source_width // width
+    cells = np.empty((height, width), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            cells[y, x] = np.rint(pixels[row_of == y, column_edges[x]:column_edges[x + 1]].mean())
+    return art.codepoints_to_ascii(lut[cells])
+
+
+@pytest.mark.parametrize("extension,method", [(".bmp", "strips"), (".tif", "strips"), (".ppm", "strips"),
+                                              (".png", "whole")])
+@pytest.mark.parametrize("mode", ["RGB", "L"])
+def test_tiled_conversion_matches_box_filter(art, tmp_path, extension, method, mode):
+    if extension == ".ppm" and mode == "L":
+        extension = ".pgm"
+    path = str(tmp_path / f"source{extension}")
+    art.make_synthetic_image((643, 401), seed=3).convert(mode).save(path)
+    assert art.GrayStripReader(path).method == method
+    
+    lut = art.build_ascii_lut(art.DEFAULT_ASCII_CHARS)
+    # A small strip size, so the raw formats are read in many strips
+    text = art.convert_tiled(path, 57, lut, max_strip_bytes=4096)
+    assert text == box_filter_reference(art, path, 57, lut)
+
+
+def test_oversized_images_open_only_when_they_can_be_streamed(art, tmp_path, monkeypatch):
+    image = art.make_synthetic_image((400, 300), seed=4)
+    for extension in (".bmp", ".png"):
+        image.save(tmp_path / f"big{extension}")
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 10_000)  # Both files are past twice this
+    lut = art.build_ascii_lut(art.DEFAULT_ASCII_CHARS)
+    
+    with art.open_large_image(str(tmp_path / "big.bmp")) as opened:
+        assert opened.size == (400, 300)
+    assert art.convert_tiled(str(tmp_path / "big.bmp"), 40, lut)
+    with pytest.raises(Image.DecompressionBombError):
+        art.open_large_image(str(tmp_path / "big.png"))
+    assert Image.MAX_IMAGE_PIXELS == 10_000
+
+
+def test_frame_store_keyframes_deltas_and_array_round_trip(art, tmp_path):
+    rng = np.random.default_rng(11)
+    charset = "@%#*+=-:. "
+    frames = art.FrameStore(charset)
+    expected = []
+    for number in range(60):
+        if number % 3 == 0:  # 20 keyframes: the keyframe array has to grow past its initial 8
+            indices = rng.integers(0, len(charset), size=(12, 17), dtype=np.uint8)
+        else:
+            indices = expected[-1].copy()
+            indices[rng.integers(0, 12, 5), rng.integers(0, 17, 5)] = rng.integers(0, len(charset), 5)
+        frames.append(indices)
+        expected.append(indices)
+    
+    assert frames._keyframe_count == 20 and len(frames) == 60
+    assert sum(positions is not None for _, positions, _ in frames._frames) == 40
+    for number, indices in enumerate(expected):
+        stored = frames.get_indices(number)
+        assert np.array_equal(stored, indices) and not stored.flags.writeable
+        assert frames[number] == art.indices_to_ascii(indices, art.charset_codes(charset))
+    
+    frames.trim()
+    np.savez(tmp_path / "frames.npz", **frames.to_arrays())
+    with np.load(tmp_path / "frames.npz") as arrays:
+        restored = art.FrameStore.from_arrays({name: arrays[name] for name in arrays.files})
+    assert restored.charset == charset and restored.shape == (12, 17)
+    assert list(restored) == list(frames)
+    
+    # A restored store keeps accepting frames
+    extra = rng.integers(0, len(charset), size=(12, 17), dtype=np.uint8)
+    restored.append(extra)
+    assert np.array_equal(restored.get_indices(-1), extra)
+    
+    with pytest.raises(ValueError):
+        frames.append(np.zeros((12, 18), dtype=np.uint8))
+
+
+def test_empty_frame_store_round_trips(art):
+    restored = art.FrameStore.from_arrays(art.FrameStore("@. ").to_arrays())
+    assert len(restored) == 0 and restored.charset == "@. "
+
+
+class VirtualTerminal:
+    """Just enough of a VT100 to replay TerminalRenderer output: cursor moves, CR/LF, text and erases"""
+    
+    TOKEN = re.compile(r"\x1b\[(?:\?25[lh]|H|2J|K|J|(\d+);(\d+)H)|\r|\n|[^\x1b\r\n]")
+    
+    def __init__(self):
+        self.rows = {}
+        self.row = self.column = 0
+    
+    def feed(self, data):
+        for match in self.TOKEN.finditer(data):
+            token = match.group(0)
+            if match.group(1):
+                self.row, self.column = int(match.group(1)) - 1, int(match.group(2)) - 1
+            elif token == "\x1b[H":
+                self.row = self.column = 0
+            elif token == "\x1b[2J":
+                self.rows.clear()
+            elif token == "\x1b[K":
+                self.rows[self.row] = self.rows.get(self.row, [])[:self.column]
+            elif token == "\x1b[J":
+                self.rows[self.row] = self.rows.get(self.row, [])[:self.column]
+                self.rows = {row: cells for row, cells in self.rows.items() if row <= self.row}
+            elif token == "\r":
+                self.column = 0
+            elif token == "\n":
+                self.row += 1
+            elif not token.startswith("\x1b"):
+                cells = self.rows.setdefault(self.row, [])
+                cells.extend([None] * (self.column + 1 - len(cells)))
+                cells[self.column] = token
+                self.column += 1
+        assert sum(len(match.group(0)) for match in self.TOKEN.finditer(data)) == len(data)
+    
+    def screen(self):
+        """Visible lines; a cell never written reads as NUL so gaps cannot pass for spaces"""
+        height = max((row + 1 for row, cells in self.rows.items() if cells), default=0)
+        return ["".join(cell or "\0" for cell in self.rows.get(row, [])) for row in range(height)]
+
+
+def random_frame(rng, previous):
+    """Either an unrelated frame or a few edits of the previous one (longer, shorter, fewer rows...)"""
+    if previous is None or rng.random() < 0.3:
+        return ["".join(rng.choice(list("ab· ")) for _ in range(rng.integers(0, 14)))
+                for _ in range(rng.integers(1, 9))]
+    lines = list(previous)
+    for _ in range(rng.integers(1, 4)):
+        row = rng.integers(0, len(lines))
+        edit = rng.integers(0, 5)
+        if edit == 0:
+            lines[row] = lines[row][:rng.integers(0, len(lines[row]) + 1)]
+        elif edit == 1:
+            lines[row] += "ab"[rng.integers(0, 2)] * rng.integers(1, 4)
+        elif edit == 2 and len(lines) > 1:
+            del lines[rng.integers(1, len(lines)):]
+        elif edit == 3 and len(lines) < 10:
+            lines.append("b" * rng.integers(0, 6))
+        elif lines[row]:
+            column = rng.integers(0, len(lines[row]))
+            lines[row] = lines[row][:column] + rng.choice(list("ab· ")) + lines[row][column + 1:]
+    return lines
+
+
+def test_terminal_renderer_output_reproduces_every_frame(art):
+    """Replaying the written bytes leaves exactly the current frame on screen"""
+    rng = np.random.default_rng(15)
+    full_frames = partial_frames = 0
+    for _ in range(60):
+        stream = io.StringIO()
+        renderer = art.TerminalRenderer(stream)
+        terminal = VirtualTerminal()
+        renderer.begin()
+        lines = None
+        for _ in range(25):
+            lines = random_frame(rng, lines)
+            position = len(stream.getvalue())
+            renderer.render("\n".join(lines))
+            written = stream.getvalue()[position:]
+            terminal.feed(written)
+            
+            expected = list(lines)
+            while expected and not expected[-1]:
+                expected.pop()
+            assert terminal.screen() == expected
+            if re.match(r"\x1b\[H(\x1b\[\d+;\d+H|$)", written):
+                partial_frames += 1
+            else:
+                full_frames += 1
+        renderer.end()
+    # Both the per-line updates and the whole-frame fallback were exercised
+    assert full_frames > 100 and partial_frames > 100
+
+
+@pytest.mark.parametrize("effect", ["wave", "flicker", "cycle", "glitch", "rain", "morph"])
+def test_procedural_loop_frames_do_not_depend_on_access_order(art, effect):
+    assert effect in art.PROCEDURAL_EFFECTS
+    base_ascii = art.ASCIIEngine(48).convert_frame_to_ascii(art.make_synthetic_image((160, 120), seed=5))
+    
+    def make_loop():
+        return art.ProceduralLoop(base_ascii, effect, 0.8, frame_count=24, seed=7)
+    
+    in_order = [make_loop()[number] for number in range(24)]
+    loop = make_loop()
+    backwards = {number: loop[number] for number in reversed(range(24))}
+    assert [backwards[number] for number in range(24)] == in_order
+    
+    # Random access with repeats, on one instance, before and after a partial background render
+    loop = make_loop()
+    order = np.random.default_rng(20).integers(0, 24, 60)
+    assert [loop[int(number)] for number in order] == [in_order[number] for number in order]
+    loop.render_all(progress=lambda done, total: done < 10)
+    assert loop.rendered == 10
+    assert [loop[int(number)] for number in order] == [in_order[number] for number in order]
+    loop.render_all()
+    assert loop.complete and list(loop) == in_order
+    assert loop[-1] == in_order[-1]
+    assert len(set(in_order)) > 1
+
+
+@pytest.mark.parametrize("count", [0, 1, 150])
+def test_frames_archive_round_trips_through_indexed_file(art, tmp_path, count):
+    texts = [f"frame {number}\n█▓▒░ é ●◐\n" + "·" * (number % 7) for number in range(count)]
+    path = str(tmp_path / "clip.frames")
+    with art.FrameArchiveWriter(path, queue_size=4) as writer:
+        for text in texts:
+            writer.write(text)
+    assert writer.frames_written == count
+    assert writer.bytes_written == sum(len(text.encode('utf-8')) for text in texts)
+    
+    frames = art.IndexedFrameFile(path)
+    try:
+        assert len(frames) == count
+        assert [frames[number] for number in reversed(range(count))] == texts[::-1]
+        if count:
+            assert frames[-1] == texts[-1]
+        with pytest.raises(IndexError):
+            frames[count]
+    finally:
+        frames.close()
+
+
+@pytest.mark.parametrize("name", ["clip.zip", "clip.tar.gz"])
+def test_frame_archives_hold_one_text_file_per_frame(art, tmp_path, name):
+    texts = ["ab\ncd", "é●\n◐", ""]
+    path = str(tmp_path / name)
+    with art.FrameArchiveWriter(path, base_name="clip") as writer:
+        for text in texts:
+            writer.write(text)
+    names = [f"clip_frame_{number:03d}.txt" for number in (1, 2, 3)]
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            assert archive.namelist() == names
+            assert [archive.read(member).decode('utf-8') for member in names] == texts
+    else:
+        with tarfile.open(path) as archive:
+            assert archive.getnames() == names
+            assert [archive.extractfile(member).read().decode('utf-8') for member in names] == texts
+
+
+def test_frame_archive_writer_closes_cleanly_without_start(art, tmp_path):
+    writer = art.FrameArchiveWriter(str(tmp_path / "clip.frames"))
+    writer.close()
+    assert writer.frames_written == 0 and not (tmp_path / "clip.frames").exists()
+    
+    other = tmp_path / "not_frames.frames"
+    other.write_bytes(b"PK\x03\x04" + bytes(32))
+    with pytest.raises(ValueError):
+        art.IndexedFrameFile(str(other))
+
+
+def test_benchmark_suite_reports_stage_times_per_frame(art):
+    results = art.run_benchmark_suite(width=24, still_sizes=((64, 48),), gif_cases=(((48, 32), 6),),
+                                      repeats=1, procedural_frames=20)
+    cases = {case['kind']: [] for case in results['cases']}
+    for case in results['cases']:
+        cases[case['kind']].append(case)
+    assert [len(cases[kind]) for kind in ("still", "gif", "procedural")] == [3, 1, len(art.PROCEDURAL_EFFECTS)]
+    
+    for case in results['cases']:
+        assert "render" in case['stages_ms_per_frame']
+        assert all(ms >= 0 for ms in case['stages_ms_per_frame'].values())
+    for case in cases['procedural']:
+        # Per frame, the effect stage is a small fraction of the whole run it was timed against
+        assert case['stages_ms_per_frame']['effect'] < case['total_ms'] / 2
@@ -0,0 +1,302 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def mixed_frame():
+    """Values that look alike but that duplicated() tells apart, and some it treats as equal"""
+    return pd.DataFrame({
+        'mixed': [1, '1', 1.0, True, None, np.nan, pd.NA, 'nan', 1, '1', None, np.nan, 2.5, 2.5, 'x'],
+        'zero': [0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, -0.0, 0.0, 0.0, 0.0, np.nan, np.nan, -0.0],
+        'count': [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 3],
+    })
+
+
+@pytest.mark.parametrize("bits", [64, 128])
+@pytest.mark.parametrize("columns", [['mixed', 'zero', 'count'], ['mixed'], ['zero']])
+def test_fingerprints_agree_with_duplicated(cleaner, bits, columns):
+    """One column goes through Series.duplicated, several through per-column factorize; both are matched"""
+    df = mixed_frame()[columns]
+    with cleaner.FingerprintSet() as seen:
+        unique = seen.first_occurrences(cleaner.row_hashes(df, bits))
+    assert np.array_equal(unique, ~df.duplicated().to_numpy())
+
+
+def test_missing_text_is_not_the_string_nan(cleaner):
+    df = pd.DataFrame({'name': pd.array(['a', None, 'nan', None, 'nan'], dtype='string')})
+    with cleaner.FingerprintSet() as seen:
+        unique = seen.first_occurrences(cleaner.row_hashes(df))
+    assert unique.tolist() == [True, True, True, False, False]
+
+
+def test_fingerprints_match_across_chunks_read_with_different_dtypes(cleaner):
+    """A column read as int64 in one chunk and float64 (with a gap) in the next still deduplicates"""
+    first = pd.DataFrame({'id': [5, 6], 'score': [-0.0, 1.5]})
+    second = pd.DataFrame({'id': [5.0, np.nan, 6.0], 'score': [0.0, 2.0, 1.5]})
+    with cleaner.FingerprintSet() as seen:
+        assert seen.first_occurrences(cleaner.row_hashes(first)).tolist() == [True, True]
+        assert seen.first_occurrences(cleaner.row_hashes(second)).tolist() == [False, True, False]
+
+
+def test_spilled_fingerprints_are_still_found(cleaner, tmp_path):
+    rng = np.random.default_rng(0)
+    hashes = rng.integers(0, 2 ** 63, size=5000, dtype=np.uint64)
+    with cleaner.FingerprintSet(memory_limit=1024, spill_dir=str(tmp_path)) as seen:
+        for chunk in np.array_split(hashes, 10):
+            assert seen.first_occurrences(chunk).all()
+        assert seen.spilled > 0
+        assert not seen.first_occurrences(hashes[::7]).any()
+        assert len(seen) == len(hashes)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("bits", [64, 128])
+def test_deduplicate_files_matches_drop_duplicates(cleaner, tmp_path, bits):
+    rng = np.random.default_rng(1)
+    paths = []
+    frames = []
+    for number in range(3):
+        df = pd.DataFrame({
+            'key': rng.integers(0, 40, size=300),
+            'label': rng.choice(['a', 'b', ' c', None], size=300),
+            'value': rng.integers(0, 3, size=300) / 2,
+        })
+        path = tmp_path / f"part{number}.csv"
+        df.to_csv(path, index=False)
+        paths.append(str(path))
+        frames.append(pd.read_csv(path))
+    
+    output = tmp_path / "distinct.csv"
+    rows_in, rows_out = cleaner.deduplicate_files(paths, str(output), bits=bits, chunk_rows=64)
+    expected = pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+    assert (rows_in, rows_out) == (900, len(expected))
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected)
+
+
+def test_deduplicate_files_rejects_different_columns(cleaner, tmp_path):
+    pd.DataFrame({'a': [1], 'b': [2]}).to_csv(tmp_path / "one.csv", index=False)
+    pd.DataFrame({'a': [1], 'c': [2]}).to_csv(tmp_path / "two.csv", index=False)
+    with pytest.raises(ValueError):
+        cleaner.deduplicate_files([str(tmp_path / "one.csv"), str(tmp_path / "two.csv")],
+                                  str(tmp_path / "out.csv"))
+
+
+def outlier_frame(rows=400, seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'a': rng.normal(0, 1, rows),
+        'b': rng.normal(10, 2, rows),
+        'c': rng.integers(0, 100, rows).astype(float),
+        'name': rng.choice([' x', 'y ', None], rows),
+    })
+    df.loc[rng.choice(rows, 12, replace=False), 'a'] = 25.0
+    df.loc[rng.choice(rows, 12, replace=False), 'b'] = -40.0
+    df.loc[rng.choice(rows, 5, replace=False), 'c'] = np.nan  # NaN is outside any bounds
+    return df
+
+
+def filter_column_by_column(df, bounds):
+    """The per-column filtering the combined mask replaces"""
+    for column, (lower, upper) in bounds.items():
+        df = df[(df[column] >= lower) & (df[column] <= upper)]
+    return df
+
+
+def test_iqr_bounds_match_per_column_quantiles(cleaner):
+    df = outlier_frame()
+    bounds = cleaner.OutlierEngine.iqr_bounds(df, ['a', 'b', 'c'])
+    for column, (lower, upper) in bounds.items():
+        q1, q3 = df[column].quantile(0.25), df[column].quantile(0.75)
+        assert (lower, upper) == pytest.approx((q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)))
+
+
+@pytest.mark.parametrize("workers,min_rows", [(1, 0), (2, 0)])
+def test_combined_outlier_mask_filters_like_column_by_column(cleaner, workers, min_rows):
+    df = outlier_frame()
+    bounds = cleaner.OutlierEngine.iqr_bounds(df, ['a', 'b', 'c'])
+    plans = {column: [("outlier", value)] for column, value in bounds.items()}
+    plans['name'] = [("fill", 'z'), ("strip", None)]
+    engine = cleaner.OutlierEngine()
+    
+    with cleaner.ColumnPlanExecutor(workers, min_rows) as executor:
+        cleaned, flagged = executor.run(df.copy(), plans, engine)
+    
+    expected = filter_column_by_column(df, bounds)
+    pd.testing.assert_frame_equal(cleaned.drop(columns='name'), expected.drop(columns='name'))
+    assert cleaned['name'].tolist() == expected['name'].fillna('z').str.strip().tolist()
+    assert flagged == {column: int((~df[column].between(*bounds[column])).sum()) for column in bounds}
+    assert (engine.rows, engine.outliers) == (len(df), len(df) - len(expected))
+    assert engine.copies_avoided == len(bounds) - 1
+
+
+def test_flag_column_keeps_every_row(cleaner):
+    df = outlier_frame()
+    bounds = cleaner.OutlierEngine.iqr_bounds(df, ['a', 'b', 'c'])
+    plans = {column: [("outlier", value)] for column, value in bounds.items()}
+    engine = cleaner.OutlierEngine(cleaner.OUTLIER_FLAG_COLUMN)
+    
+    with cleaner.ColumnPlanExecutor(workers=1) as executor:
+        flagged_df, _ = executor.run(df, plans, engine)
+    
+    assert cleaner.OUTLIER_FLAG_COLUMN not in df.columns
+    pd.testing.assert_frame_equal(flagged_df.drop(columns=cleaner.OUTLIER_FLAG_COLUMN), df)
+    kept = filter_column_by_column(df, bounds).index
+    assert flagged_df[cleaner.OUTLIER_FLAG_COLUMN].tolist() == (~df.index.isin(kept)).tolist()
+    assert engine.outliers == len(df) - len(kept)
+
+
+def test_flag_column_never_overwrites_existing_data(cleaner):
+    df = outlier_frame()
+    df[cleaner.OUTLIER_FLAG_COLUMN] = 'user data'
+    df[cleaner.OUTLIER_FLAG_COLUMN + '_1'] = 'more user data'
+    bounds = cleaner.OutlierEngine.iqr_bounds(df, ['a', 'b', 'c'])
+    plans = {column: [("outlier", value)] for column, value in bounds.items()}
+    
+    with cleaner.ColumnPlanExecutor(workers=1) as executor:
+        with pytest.raises(ValueError):
+            executor.run(df, plans, cleaner.OutlierEngine(cleaner.OUTLIER_FLAG_COLUMN))
+        
+        messages = []
+        app = headless_app(cleaner, flag_outliers=True)
+        app.log_message = lambda message, level="INFO": messages.append((level, message))
+        engine = app.outlier_engine(df.columns)
+        flagged_df, _ = executor.run(df, plans, engine)
+    
+    assert engine.flag_column == cleaner.OUTLIER_FLAG_COLUMN + '_2'
+    assert [level for level, _ in messages] == ["WARNING"]
+    pd.testing.assert_frame_equal(flagged_df.drop(columns=engine.flag_column), df)
+    assert int(flagged_df[engine.flag_column].sum()) == engine.outliers > 0
+    assert headless_app(cleaner, flag_outliers=False).outlier_engine(df.columns).flag_column is None
+
+
+def rank_errors(data, estimates, qs):
+    ordered = np.sort(data)
+    ranks = np.searchsorted(ordered, estimates) / len(ordered)
+    return np.abs(ranks - np.asarray(qs))
+
+
+@pytest.mark.parametrize("k", [100, 200])
+def test_kll_rank_error_within_bound(cleaner, k):
+    rng = np.random.default_rng(5)
+    data = rng.lognormal(0, 1.5, 600_000)
+    sketch = cleaner.KLLSketch(k=k, seed=1)
+    for chunk in np.array_split(data, 60):
+        sketch.update(chunk)
+    qs = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+    assert rank_errors(data, sketch.quantiles(qs), qs).max() <= 1.7 / k
+    assert sum(len(items) for items in sketch.levels) < 4 * k  # Bounded memory
+
+
+def test_kll_is_exact_before_compacting(cleaner):
+    data = np.random.default_rng(6).normal(size=150)
+    sketch = cleaner.KLLSketch(k=200)
+    sketch.update(data)
+    assert np.allclose(sketch.quantiles([0.1, 0.5, 0.9]), np.quantile(data, [0.1, 0.5, 0.9]))
+
+
+def test_column_stats_exact_up_to_limit(cleaner):
+    rng = np.random.default_rng(7)
+    numbers = pd.Series(rng.normal(50, 10, 1000))
+    labels = pd.Series(rng.choice([f"v{i}" for i in range(300)], 1000))
+    numeric, text = cleaner.ColumnStats(exact_limit=1000), cleaner.ColumnStats(exact_limit=300)
+    for start in range(0, 1000, 250):
+        numeric.update(numbers.iloc[start:start + 250])
+        text.update(labels.iloc[start:start + 250])
+    
+    assert numeric.exact and text.exact
+    assert numeric.median() == numbers.median()
+    q1, q3 = numbers.quantile(0.25), numbers.quantile(0.75)
+    assert numeric.iqr_bounds() == pytest.approx((q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)))
+    assert text.mode() == labels.mode()[0]
+    
+    numeric.update(pd.Series([1.0]))
+    assert not numeric.exact
+
+
+def test_column_stats_past_limit(cleaner):
+    rng = np.random.default_rng(8)
+    numbers = rng.exponential(3, 400_000)
+    labels = np.concatenate([rng.integers(0, 50_000, 90_000).astype(str), np.full(3_000, "top")])
+    rng.shuffle(labels)
+    numeric, text = cleaner.ColumnStats(exact_limit=10_000), cleaner.ColumnStats(exact_limit=10_000)
+    for start in range(0, len(numbers), 40_000):
+        numeric.update(pd.Series(numbers[start:start + 40_000]))
+    for start in range(0, len(labels), 10_000):
+        text.update(pd.Series(labels[start:start + 10_000]))
+    
+    assert not numeric.exact and not text.exact
+    assert rank_errors(numbers, [numeric.median()], [0.5])[0] <= 1.7 / 200
+    assert text.mode() == "top"
+
+
+def test_misra_gries_keeps_values_above_n_over_k_plus_one(cleaner):
+    rng = np.random.default_rng(9)
+    k = 40
+    stream = np.concatenate([rng.integers(100, 100_000, 20_000), np.full(1_000, 1), np.full(700, 2)])
+    rng.shuffle(stream)
+    summary = cleaner.MisraGries(k=k)
+    for chunk in np.array_split(stream, 50):
+        summary.update(pd.Series(chunk).value_counts().items())
+    
+    n = len(stream)
+    assert 700 > n / (k + 1)
+    true_counts = pd.Series(stream).value_counts()
+    assert {1, 2} <= set(summary.counters)
+    assert len(summary.counters) <= k
+    for value, count in summary.counters.items():
+        assert true_counts[value] - n / (k + 1) <= count <= true_counts[value]
+
+
+def headless_app(cleaner, flag_outliers=False):
+    """A DatasetCleaner without its Tk widgets, enough to run the cleaning passes"""
+    app = cleaner.DatasetCleaner.__new__(cleaner.DatasetCleaner)
+    app.log_message = lambda message, level="INFO": None
+    app.status_var = SimpleNamespace(set=lambda text: None)
+    app.flag_outliers = SimpleNamespace(get=lambda: flag_outliers)
+    app.unique_mask = None
+    return app
+
+
+def messy_csv(path, rows=20_000, seed=10):
+    rng = np.random.default_rng(seed)
+    score = rng.normal(50, 10, rows)
+    score[rng.choice(rows, 300, replace=False)] = rng.choice([-200.0, 400.0], 300)
+    score[rng.choice(rows, 500, replace=False)] = np.nan
+    name = rng.choice(['alice', ' bob', 'carol ', None], rows)
+    # Plain integers early on, codes with letters later: chunks read this column as int, then as text
+    code = np.where(np.arange(rows) < rows // 2, rng.integers(0, 50, rows).astype(str),
+                    np.char.add('C', rng.integers(0, 50, rows).astype(str)))
+    df = pd.DataFrame({'score': score, 'name': name, 'code': code, 'amount': rng.exponential(20, rows).round(1)})
+    df = pd.concat([df, df.sample(2_000, random_state=0)], ignore_index=True)  # Duplicates, spread out
+    df.to_csv(path, index=False)
+
+
+ANALYSIS = {"recommendations": [
+    {"column": "score", "actions": ["Fill missing values", "Remove outliers"]},
+    {"column": "name", "actions": ["Fill missing values", "Strip whitespace"]},
+    {"column": "amount", "actions": ["Handle outliers"]},
+    {"column": "code", "actions": ["Fill missing values"]},
+]}
+
+
+@pytest.mark.parametrize("flag_outliers", [False, True])
+def test_streamed_cleaning_matches_in_memory(cleaner, tmp_path, monkeypatch, flag_outliers):
+    path = tmp_path / "messy.csv"
+    messy_csv(path)
+    
+    in_memory = headless_app(cleaner, flag_outliers)
+    in_memory.df = pd.read_csv(path)
+    in_memory.clean_dataset(ANALYSIS)
+    
+    monkeypatch.setattr(cleaner, "CHUNK_ROWS", 1_500)  # 15 chunks
+    streamed = headless_app(cleaner, flag_outliers)
+    streamed.sketch = streamed.sketch_dataset(str(path))
+    assert len(streamed.sketch._unique_chunks) == 15
+    assert streamed.sketch.read_dtype == {'code': str}  # Re-read as text, as a whole-file read types it
+    streamed.clean_streaming(str(path), ANALYSIS)
+    
+    assert streamed.sketch.duplicates == int(in_memory.df.duplicated().sum())
+    with open(streamed.streamed_output, encoding='utf-8') as f:
+        assert f.read() == in_memory.cleaned_df.to_csv(index=False)